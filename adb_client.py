@@ -0,0 +1,482 @@
+"""
+adb_client.py - Minimal ADB host-protocol client.
+Purpose: Talk to the local adb server over its TCP socket (host services, transport selection, shell, sync push) so the upgrade flow can stream firmware with live progress instead of shelling out to adb.exe for every step.
+"""
+
+import os
+import socket
+import struct
+import subprocess
+import time
+from typing import Callable, List, Optional, Tuple
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 5037
+
+# adb sync 協定單一 DATA 封包上限（adbd 端固定 64KB）
+SYNC_DATA_MAX = 64 * 1024
+DEFAULT_CHUNK_SIZE = SYNC_DATA_MAX
+# 本機讀檔緩衝（一次讀多個 DATA 封包，減少 read 系統呼叫）
+DEFAULT_READ_SIZE = 1024 * 1024
+
+
+class AdbError(Exception):
+    """adb server / adbd 回覆 FAIL 或連線異常"""
+
+
+def server_address() -> Tuple[str, int]:
+    """與 adb.exe 相同規則：ANDROID_ADB_SERVER_ADDRESS / ANDROID_ADB_SERVER_PORT"""
+    host = os.environ.get("ANDROID_ADB_SERVER_ADDRESS") or DEFAULT_HOST
+    try:
+        port = int(os.environ.get("ANDROID_ADB_SERVER_PORT") or DEFAULT_PORT)
+    except ValueError:
+        port = DEFAULT_PORT
+    return host, port
+
+
+class AdbConnection:
+    """單一 adb server socket 連線（一條連線只能承載一個 service）"""
+
+    def __init__(self, host: Optional[str] = None, port: Optional[int] = None, timeout: Optional[float] = 10.0):
+        default_host, default_port = server_address()
+        self.host = host or default_host
+        self.port = port or default_port
+        self.timeout = timeout
+        self.sock: Optional[socket.socket] = None
+
+    def connect(self):
+        try:
+            self.sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        except OSError as e:
+            raise AdbError(f"cannot connect to adb server {self.host}:{self.port}: {e}")
+        try:
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except OSError:
+            pass
+        return self
+
+    def close(self):
+        if self.sock is not None:
+            try:
+                self.sock.close()
+            except OSError:
+                pass
+            self.sock = None
+
+    def __enter__(self):
+        if self.sock is None:
+            self.connect()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ---- 低階讀寫 ----
+    def send(self, data: bytes):
+        try:
+            self.sock.sendall(data)
+        except OSError as e:
+            raise AdbError(f"adb socket write failed: {e}")
+
+    def recv(self, n: int = 65536) -> bytes:
+        try:
+            return self.sock.recv(n)
+        except socket.timeout:
+            raise
+        except OSError as e:
+            raise AdbError(f"adb socket read failed: {e}")
+
+    def read_exact(self, n: int) -> bytes:
+        buf = bytearray()
+        while len(buf) < n:
+            chunk = self.recv(n - len(buf))
+            if not chunk:
+                raise AdbError("adb connection closed unexpectedly")
+            buf += chunk
+        return bytes(buf)
+
+    def read_all(self) -> bytes:
+        parts = []
+        while True:
+            chunk = self.recv()
+            if not chunk:
+                break
+            parts.append(chunk)
+        return b"".join(parts)
+
+    def _read_hex_len_string(self) -> str:
+        size = int(self.read_exact(4), 16)
+        return self.read_exact(size).decode(errors="ignore")
+
+    # ---- smart socket 協定 ----
+    def request(self, service: str):
+        """送出 service 請求並確認 OKAY，失敗時拋出 AdbError"""
+        payload = service.encode()
+        self.send(b"%04x" % len(payload) + payload)
+        status = self.read_exact(4)
+        if status == b"OKAY":
+            return
+        if status == b"FAIL":
+            raise AdbError(self._read_hex_len_string())
+        raise AdbError(f"unexpected adb status {status!r}")
+
+    def read_payload(self) -> str:
+        """讀取 host service 的 4 位十六進位長度 + 內容"""
+        return self._read_hex_len_string()
+
+
+def _connect() -> AdbConnection:
+    return AdbConnection().connect()
+
+
+def host_query(service: str) -> str:
+    """執行 host:* 查詢並回傳內容（例如 host:version、host:devices）"""
+    with _connect() as conn:
+        conn.request(service)
+        return conn.read_payload()
+
+
+def ensure_server(adb_cmd: str = "adb") -> bool:
+    """確認 adb server 已啟動；未啟動時呼叫 adb start-server 一次"""
+    try:
+        host_query("host:version")
+        return True
+    except AdbError:
+        pass
+    try:
+        subprocess.run([adb_cmd, "start-server"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=30)
+    except Exception:
+        return False
+    try:
+        host_query("host:version")
+        return True
+    except AdbError:
+        return False
+
+
+def parse_devices(text: str) -> List[Tuple[str, str]]:
+    """解析 host:devices 內容為 [(serial, state)]"""
+    devices = []
+    for line in text.splitlines():
+        parts = line.strip().split()
+        if len(parts) >= 2:
+            devices.append((parts[0], parts[1]))
+    return devices
+
+
+def list_devices() -> List[Tuple[str, str]]:
+    return parse_devices(host_query("host:devices"))
+
+
+class DeviceTracker:
+    """host:track-devices 長連線：adb server 在裝置增減時主動推送完整清單"""
+
+    def __init__(self):
+        self.conn = AdbConnection(timeout=None).connect()
+        self._buf = b""
+        try:
+            self.conn.request("host:track-devices")
+        except Exception:
+            self.conn.close()
+            raise
+
+    def poll(self, timeout: Optional[float] = None) -> Optional[List[Tuple[str, str]]]:
+        """等待下一份裝置清單；逾時回傳 None"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            if len(self._buf) >= 4:
+                size = int(self._buf[:4], 16)
+                if len(self._buf) >= 4 + size:
+                    payload = self._buf[4:4 + size].decode(errors="ignore")
+                    self._buf = self._buf[4 + size:]
+                    return parse_devices(payload)
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return None
+            self.conn.sock.settimeout(remaining)
+            try:
+                chunk = self.conn.recv()
+            except socket.timeout:
+                return None
+            if not chunk:
+                raise AdbError("adb server closed track-devices connection")
+            self._buf += chunk
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_service(service: str, serial: Optional[str] = None, timeout: Optional[float] = 10.0) -> AdbConnection:
+    """切換到指定裝置的 transport 後開啟裝置端 service，回傳可直接讀寫的連線"""
+    conn = AdbConnection(timeout=timeout).connect()
+    try:
+        conn.request(f"host:transport:{serial}" if serial else "host:transport-any")
+        conn.request(service)
+    except Exception:
+        conn.close()
+        raise
+    return conn
+
+
+def shell(command: str, serial: Optional[str] = None, timeout: Optional[float] = 30.0) -> str:
+    """執行 adb shell 指令並回傳輸出（不含結束碼）"""
+    with open_service(f"shell:{command}", serial=serial, timeout=timeout) as conn:
+        return conn.read_all().decode(errors="ignore")
+
+
+_RC_MARK = "__MU310_RC__"
+
+
+def shell_rc(command: str, serial: Optional[str] = None, timeout: Optional[float] = 30.0) -> Tuple[int, str]:
+    """執行 adb shell 指令並回傳 (結束碼, 輸出)；舊版 adbd 不回傳結束碼，故以標記行取得"""
+    out = shell(f"{command}; echo {_RC_MARK}$?", serial=serial, timeout=timeout)
+    text = out.replace("\r\n", "\n")
+    idx = text.rfind(_RC_MARK)
+    if idx == -1:
+        return -1, text
+    try:
+        code = int(text[idx + len(_RC_MARK):].strip().split()[0])
+    except (ValueError, IndexError):
+        code = -1
+    return code, text[:idx]
+
+
+# =============== sync push ===============
+class TransferStats:
+    """傳輸統計：累積位元組、瞬時/平均速率與 ETA"""
+
+    def __init__(self, total: int, smoothing: float = 0.3):
+        self.total = total
+        self.sent = 0
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None  # 傳輸完成時間；之後 elapsed 固定不再增加
+        self.smoothing = smoothing
+        self.rate = 0.0  # bytes/s（指數平滑）
+        self._last_t = self.started
+        self._last_sent = 0
+
+    def update(self, sent: int):
+        now = time.perf_counter()
+        dt = now - self._last_t
+        if dt >= 0.05:
+            inst = (sent - self._last_sent) / dt
+            self.rate = inst if self.rate == 0 else (self.smoothing * inst + (1 - self.smoothing) * self.rate)
+            self._last_t = now
+            self._last_sent = sent
+        self.sent = sent
+
+    def finish(self):
+        if self.finished is None:
+            self.finished = time.perf_counter()
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished or time.perf_counter()) - self.started
+
+    @property
+    def average_rate(self) -> float:
+        el = self.elapsed
+        return self.sent / el if el > 0 else 0.0
+
+    @property
+    def eta(self) -> Optional[float]:
+        rate = self.rate or self.average_rate
+        if rate <= 0:
+            return None
+        return max(0.0, (self.total - self.sent) / rate)
+
+    @property
+    def percent(self) -> float:
+        return 100.0 * self.sent / self.total if self.total else 100.0
+
+
+def format_rate(bps: float) -> str:
+    return f"{bps / (1024 * 1024):.2f} MB/s"
+
+
+def format_eta(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return "--:--"
+    seconds = int(seconds + 0.5)
+    return f"{seconds // 60:02d}:{seconds % 60:02d}"
+
+
+def push(
+    local_path: str,
+    remote_path: str,
+    serial: Optional[str] = None,
+    mode: int = 0o644,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    read_size: int = DEFAULT_READ_SIZE,
+    progress: Optional[Callable[[TransferStats], None]] = None,
+    progress_interval: float = 0.1,
+    timeout: Optional[float] = 60.0,
+) -> TransferStats:
+    """以 sync 協定（SEND/DATA/DONE）推送檔案，回傳最終傳輸統計
+
+    chunk_size：每個 DATA 封包大小（上限 64KB）
+    read_size：本機一次讀取大小（會切成多個 DATA 封包）
+    progress：每 progress_interval 秒回呼一次（於呼叫端執行緒）
+    """
+    chunk_size = max(1024, min(int(chunk_size), SYNC_DATA_MAX))
+    read_size = max(chunk_size, int(read_size))
+    total = os.path.getsize(local_path)
+    stats = TransferStats(total)
+
+    conn = open_service("sync:", serial=serial, timeout=timeout)
+    try:
+        spec = f"{remote_path},{mode}".encode()
+        conn.send(b"SEND" + struct.pack("<I", len(spec)) + spec)
+
+        last_report = 0.0
+        sent = 0
+        with open(local_path, "rb", buffering=0) as f:
+            while True:
+                block = f.read(read_size)
+                if not block:
+                    break
+                view = memoryview(block)
+                for off in range(0, len(view), chunk_size):
+                    piece = view[off:off + chunk_size]
+                    # 標頭與資料合併送出，避免 TCP_NODELAY 下產生 8 位元組小封包
+                    conn.send(b"DATA" + struct.pack("<I", len(piece)) + piece)
+                    sent += len(piece)
+                stats.update(sent)
+                if progress is not None:
+                    now = time.perf_counter()
+                    if now - last_report >= progress_interval:
+                        last_report = now
+                        progress(stats)
+
+        conn.send(b"DONE" + struct.pack("<I", int(time.time())))
+        status = conn.read_exact(8)
+        tag, size = status[:4], struct.unpack("<I", status[4:])[0]
+        if tag == b"FAIL":
+            raise AdbError(conn.read_exact(size).decode(errors="ignore"))
+        if tag != b"OKAY":
+            raise AdbError(f"unexpected sync status {tag!r}")
+        try:
+            conn.send(b"QUIT" + struct.pack("<I", 0))
+        except AdbError:
+            pass
+    finally:
+        conn.close()
+
+    stats.update(stats.total)
+    stats.finish()
+    if progress is not None:
+        progress(stats)
+    return stats
+
+
+# =============== persistent shell ===============
+class ShellResult:
+    def __init__(self, command: str, code: int, output: str, seconds: float):
+        self.command = command
+        self.code = code
+        self.output = output
+        self.seconds = seconds
+
+    @property
+    def ok(self) -> bool:
+        return self.code == 0
+
+
+class ShellSession:
+    """單一互動式 adb shell 連線，連續執行多個指令
+
+    每個指令後送出標記行 `__MU310_EOC_<n>__ <exit code>`，讀到標記即視為該指令結束，
+    因此可在同一個 shell process 內取得每個指令各自的結束碼與耗時。
+    """
+
+    _MARK = b"__MU310_EOC_"
+
+    def __init__(self, serial: Optional[str] = None, timeout: Optional[float] = 30.0):
+        self.serial = serial
+        self.timeout = timeout
+        self.conn: Optional[AdbConnection] = None
+        self._buf = b""
+        self._seq = 0
+
+    def open(self):
+        self.conn = open_service("shell:", serial=self.serial, timeout=self.timeout)
+        # 關閉回顯與提示字元（pty 模式的 adbd 會回顯輸入），再以標記同步丟棄開場輸出
+        self._send_line("stty -echo 2>/dev/null; PS1=''; PS2=''; export PS1 PS2")
+        self._frame()
+        self._read_until_mark(self._seq)
+        return self
+
+    def close(self):
+        if self.conn is not None:
+            try:
+                self._send_line("exit")
+            except AdbError:
+                pass
+            self.conn.close()
+            self.conn = None
+
+    def __enter__(self):
+        if self.conn is None:
+            self.open()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _send_line(self, line: str):
+        self.conn.send(line.encode() + b"\n")
+
+    def _frame(self):
+        """送出結束標記指令；$? 必須是緊接在使用者指令後的第一個展開"""
+        self._seq += 1
+        self._send_line(f"printf '\\n%s%s__ %d\\n' {self._MARK.decode()} {self._seq} $?")
+
+    def _read_until_mark(self, seq: int, timeout: Optional[float] = None) -> Tuple[int, str]:
+        token = self._MARK + str(seq).encode() + b"__ "
+        if timeout is not None:
+            self.conn.sock.settimeout(timeout)
+        try:
+            while True:
+                idx = self._buf.find(token)
+                if idx != -1:
+                    end = self._buf.find(b"\n", idx)
+                    if end != -1:
+                        break
+                try:
+                    chunk = self.conn.recv()
+                except socket.timeout:
+                    raise AdbError(f"shell command timed out (#{seq})")
+                if not chunk:
+                    raise AdbError("shell session closed unexpectedly")
+                self._buf += chunk
+        finally:
+            if timeout is not None:
+                self.conn.sock.settimeout(self.timeout)
+        tail = self._buf[idx + len(token):end].strip()
+        output = self._buf[:idx]
+        self._buf = self._buf[end + 1:]
+        try:
+            code = int(tail)
+        except ValueError:
+            code = -1
+        text = output.decode(errors="ignore").replace("\r\n", "\n")
+        # 去掉標記前為了換行而補上的 \n
+        if text.endswith("\n"):
+            text = text[:-1]
+        return code, text
+
+    def run(self, command: str, timeout: Optional[float] = None) -> ShellResult:
+        """執行單一指令，回傳結束碼、輸出與耗時"""
+        if self.conn is None:
+            self.open()
+        t0 = time.perf_counter()
+        self._send_line(command)
+        self._frame()
+        code, out = self._read_until_mark(self._seq, timeout)
+        return ShellResult(command, code, out, time.perf_counter() - t0)
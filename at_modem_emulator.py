@@ -0,0 +1,369 @@
+"""
+at_modem_emulator.py - Pty-backed scripted AT modem harness.
+Purpose: Create pseudo-terminals on Linux with a scripted MU310-like modem behind each one (configurable latency, usbcfg state, garbage output, no answer, rejected writes), which pyserial opens by path, and provide a benchmark and a regression runner for AT port discovery and the usbcfg fix without hardware.
+
+Usage:
+    python at_modem_emulator.py regress
+    python at_modem_emulator.py bench --ports 16 --repeat 5
+"""
+
+import argparse
+import os
+import random
+import selectors
+import sys
+import threading
+import time
+from typing import Callable, List, Optional
+
+TARGET_QCFG = "0x2c7c,0x0801,2,1,1,0,0,1,0"
+BAD_QCFG = "0x2c7c,0x0801,1,1,1,1,1,0,0"
+DEFAULT_VERSION = "MU310GLBAR01A01M4G"
+
+
+class ModemBehavior:
+    def __init__(self, **kw):
+        self.latency_s = 0.02  # 每個回應的延遲
+        self.echo = True  # ATE1 回顯
+        self.no_answer = False  # 完全不回應（非 AT 埠）
+        self.garbage_rate = 0.0  # 回應前夾帶亂碼的機率
+        self.garbage_only = False  # 只回亂碼、不回結果碼
+        self.reject_set = False  # AT+QCFG="usbcfg",... 回 ERROR
+        self.reboot_s = 1.0  # AT+CFUN=1,1 後不回應的時間
+        for k, v in kw.items():
+            if not hasattr(self, k):
+                raise TypeError(f"unknown modem behavior: {k}")
+            setattr(self, k, v)
+
+
+class ScriptedModem:
+    """一個 pty 與其背後的腳本化 AT 模組
+
+    handler(line) 回傳完整回應字串（含結果碼），回傳 None 表示不回應；未指定時使用內建的 MU310 腳本。
+    """
+
+    def __init__(
+        self,
+        behavior: Optional[ModemBehavior] = None,
+        usbcfg: str = TARGET_QCFG,
+        version: str = DEFAULT_VERSION,
+        handler: Optional[Callable[[str], Optional[str]]] = None,
+        seed: Optional[int] = None,
+    ):
+        import tty
+
+        self.behavior = behavior or ModemBehavior()
+        self.usbcfg = usbcfg
+        self.pending_usbcfg: Optional[str] = None
+        self.version = version
+        self.handler = handler or self.respond
+        self.rng = random.Random(seed)
+        self.rebooting = False
+        self.reboots = 0
+        self.commands: List[str] = []
+        self.master, self.slave = os.openpty()
+        tty.setraw(self.slave)  # 關閉 line discipline 的回顯與換行轉換
+        self.path = os.ttyname(self.slave)
+        self._buf = b""
+        os.set_blocking(self.master, False)
+
+    # ---- 內建腳本 ----
+    def respond(self, line: str) -> Optional[str]:
+        b = self.behavior
+        if b.no_answer or self.rebooting:
+            return None
+        if b.garbage_only:
+            return self._garbage()
+        cmd = line.strip()
+        up = cmd.upper()
+        if not up.startswith("AT"):
+            return None
+        if up in ("AT", "ATE0", "ATE1"):
+            if up == "ATE0":
+                b.echo = False
+            elif up == "ATE1":
+                b.echo = True
+            return "\r\nOK\r\n"
+        if up == "ATI":
+            return f"\r\nQuectel\r\nMU310\r\nRevision: {self.version}\r\n\r\nOK\r\n"
+        if up in ("AT+QGMR", "AT+GMR", "AT+CGMR"):
+            return f"\r\n{self.version}\r\n\r\nOK\r\n"
+        if up == 'AT+QCFG="USBCFG"':
+            return f'\r\n+QCFG: "usbcfg",{self.usbcfg}\r\n\r\nOK\r\n'
+        if up.startswith('AT+QCFG="USBCFG",'):
+            if b.reject_set:
+                return "\r\nERROR\r\n"
+            self.pending_usbcfg = cmd.split(",", 1)[1]
+            return "\r\nOK\r\n"
+        if up == "AT+CFUN=1,1":
+            self.reboot(b.reboot_s, delay_s=0.1)
+            return "\r\nOK\r\n"
+        return "\r\nERROR\r\n"
+
+    def reboot(self, offline_s: float, delay_s: float = 0.0):
+        def _down():
+            self.rebooting = True
+            self.reboots += 1
+            threading.Timer(offline_s, _up).start()
+
+        def _up():
+            if self.pending_usbcfg:
+                self.usbcfg, self.pending_usbcfg = self.pending_usbcfg, None
+            self.rebooting = False
+            self.emit("\r\nRDY\r\n")
+
+        threading.Timer(delay_s, _down).start()
+
+    def _garbage(self) -> str:
+        return "".join(chr(self.rng.randrange(0x21, 0x7F)) for _ in range(16)) + "\r\n"
+
+    # ---- pty I/O ----
+    def emit(self, text: str):
+        """主動送出資料（URC）"""
+        self._write(text.encode())
+
+    def on_readable(self):
+        try:
+            data = os.read(self.master, 4096)
+        except (BlockingIOError, OSError):
+            return
+        self._buf += data
+        while b"\r" in self._buf:
+            line, self._buf = self._buf.split(b"\r", 1)
+            self._buf = self._buf.lstrip(b"\n")
+            text = line.decode(errors="ignore")
+            if not text.strip():
+                continue
+            self.commands.append(text)
+            resp = self.handler(text)
+            if resp is None:
+                continue
+            b = self.behavior
+            if b.garbage_rate and self.rng.random() < b.garbage_rate:
+                resp = self._garbage() + resp
+            out = (text + "\r" if b.echo else "") + resp
+            if b.latency_s > 0:
+                threading.Timer(b.latency_s, self._write, (out.encode(),)).start()
+            else:
+                self._write(out.encode())
+
+    def _write(self, data: bytes):
+        try:
+            os.write(self.master, data)
+        except OSError:
+            pass
+
+    def close(self):
+        for fd in (self.master, self.slave):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+
+class ModemBank:
+    """管理多個 ScriptedModem，以單一 selector 執行緒服務所有 pty"""
+
+    def __init__(self):
+        self.modems: List[ScriptedModem] = []
+        self._sel = selectors.DefaultSelector()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, modem: Optional[ScriptedModem] = None, **kwargs) -> ScriptedModem:
+        modem = modem or ScriptedModem(**kwargs)
+        with self._lock:
+            self.modems.append(modem)
+            self._sel.register(modem.master, selectors.EVENT_READ, modem)
+        return modem
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="modem-bank", daemon=True)
+            self._thread.start()
+        return self
+
+    def _loop(self):
+        # Linux 的 epoll 允許 select 期間由其他執行緒註冊新的 fd
+        while not self._stop.is_set():
+            for key, _ in self._sel.select(timeout=0.05):
+                key.data.on_readable()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+        for m in self.modems:
+            m.close()
+        self._sel.close()
+
+    @property
+    def paths(self) -> List[str]:
+        return [m.path for m in self.modems]
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+# =============== regression / bench ===============
+def _ports(bank: ModemBank):
+    from fix_usbcfg import PathPort
+
+    return [PathPort(p) for p in bank.paths]
+
+
+def _quiet_log(message, level="INFO"):
+    pass
+
+
+def _case_single_good(bank):
+    from fix_usbcfg import find_at_port
+
+    for _ in range(7):
+        bank.add(behavior=ModemBehavior(no_answer=True))
+    good = bank.add()
+    port, res = find_at_port(_ports(bank), use_cache=False)
+    return port is not None and port.device == good.path, f"{len(res)} probes"
+
+
+def _case_slow_modem(bank):
+    from fix_usbcfg import find_at_port
+
+    bank.add(behavior=ModemBehavior(no_answer=True))
+    slow = bank.add(behavior=ModemBehavior(latency_s=0.4))
+    port, _ = find_at_port(_ports(bank), use_cache=False)
+    return port is not None and port.device == slow.path, "400 ms latency"
+
+
+def _case_garbage_then_ok(bank):
+    from fix_usbcfg import find_at_port
+
+    noisy = bank.add(behavior=ModemBehavior(garbage_rate=1.0), seed=1)
+    port, _ = find_at_port(_ports(bank), use_cache=False)
+    return port is not None and port.device == noisy.path, "noise before OK"
+
+
+def _case_garbage_only(bank):
+    from fix_usbcfg import find_at_port
+
+    bank.add(behavior=ModemBehavior(garbage_only=True), seed=2)
+    port, _ = find_at_port(_ports(bank), use_cache=False)
+    return port is None, "garbage is not an AT port"
+
+
+def _case_no_port(bank):
+    from fix_usbcfg import find_at_port
+
+    for _ in range(4):
+        bank.add(behavior=ModemBehavior(no_answer=True))
+    port, res = find_at_port(_ports(bank), use_cache=False)
+    return port is None and len(res) == 4, "all silent"
+
+
+def _case_fix_bad_usbcfg(bank):
+    from fix_usbcfg import PathPort, fix_usbcfg
+
+    m = bank.add(usbcfg=BAD_QCFG, behavior=ModemBehavior(reboot_s=0.3))
+    ok = fix_usbcfg(PathPort(m.path), _quiet_log)
+    time.sleep(0.6)
+    return ok and m.reboots == 1 and m.usbcfg == TARGET_QCFG, f"usbcfg={m.usbcfg}"
+
+
+def _case_fix_already_ok(bank):
+    from fix_usbcfg import PathPort, fix_usbcfg
+
+    m = bank.add()
+    ok = fix_usbcfg(PathPort(m.path), _quiet_log)
+    time.sleep(0.2)
+    return ok and m.reboots == 0, "no reboot"
+
+
+def _case_fix_rejected(bank):
+    from fix_usbcfg import PathPort, fix_usbcfg
+
+    m = bank.add(usbcfg=BAD_QCFG, behavior=ModemBehavior(reject_set=True))
+    ok = fix_usbcfg(PathPort(m.path), _quiet_log)
+    return not ok and m.reboots == 0, "set answered ERROR"
+
+
+CASES = [
+    ("single good port among silent ports", _case_single_good),
+    ("slow modem within deadline", _case_slow_modem),
+    ("garbage before OK", _case_garbage_then_ok),
+    ("garbage only", _case_garbage_only),
+    ("no AT port", _case_no_port),
+    ("fix wrong usbcfg", _case_fix_bad_usbcfg),
+    ("usbcfg already correct", _case_fix_already_ok),
+    ("usbcfg set rejected", _case_fix_rejected),
+]
+
+
+def run_regression() -> int:
+    failed = 0
+    for name, case in CASES:
+        with ModemBank() as bank:
+            t0 = time.perf_counter()
+            try:
+                ok, detail = case(bank)
+            except Exception as e:
+                ok, detail = False, f"exception: {e}"
+            ms = (time.perf_counter() - t0) * 1000
+        failed += 0 if ok else 1
+        print(f"[{'PASS' if ok else 'FAIL'}] {name:<40} {ms:7.0f} ms  {detail}")
+    print(f"{len(CASES) - failed}/{len(CASES)} passed")
+    return 1 if failed else 0
+
+
+def run_bench(ports: int, repeat: int, latency: float) -> int:
+    """N 個埠中最後一個為 AT 埠：比較逐一探測與平行探測的耗時"""
+    from fix_usbcfg import find_at_port, is_at_port
+
+    with ModemBank() as bank:
+        for _ in range(ports - 1):
+            bank.add(behavior=ModemBehavior(no_answer=True))
+        bank.add(behavior=ModemBehavior(latency_s=latency))
+        plist = _ports(bank)
+        rows = []
+        for label, fn in (
+            ("sequential", lambda: next((p for p in plist if is_at_port(p)), None)),
+            ("parallel", lambda: find_at_port(plist, use_cache=False)[0]),
+        ):
+            times = []
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                found = fn()
+                times.append(time.perf_counter() - t0)
+                if found is None:
+                    print(f"{label}: AT port not found")
+                    return 1
+            times.sort()
+            rows.append((label, times[0], times[len(times) // 2], times[-1]))
+    print(f"{ports} ports, AT port last, modem latency {latency * 1000:.0f} ms, {repeat} runs")
+    for label, lo, med, hi in rows:
+        print(f"  {label:<10} min {lo * 1000:7.0f} ms  median {med * 1000:7.0f} ms  max {hi * 1000:7.0f} ms")
+    return 0
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Pty AT modem emulator: regression and benchmark for AT port discovery / usbcfg fix")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("regress")
+    b = sub.add_parser("bench")
+    b.add_argument("--ports", type=int, default=16)
+    b.add_argument("--repeat", type=int, default=5)
+    b.add_argument("--latency", type=float, default=0.02)
+    a = ap.parse_args(argv)
+    if not hasattr(os, "openpty"):
+        print("pseudo-terminals are not available on this platform")
+        return 2
+    if a.cmd == "regress":
+        return run_regression()
+    return run_bench(a.ports, a.repeat, a.latency)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,410 @@
+"""
+at_session.py - Persistent AT session with a command queue.
+Purpose: Keep one AT channel open per module (a COM port, or /dev/smd7 reached through adb shell) and run commands from a FIFO queue with optional pipelined writes, matching each final result code to its command, dispatching unsolicited result codes to callbacks and reopening the channel after a disconnect.
+"""
+
+import socket
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Callable, Deque, List, Optional
+
+import adb_client
+from adb_client import AdbError
+from at_transport import FINAL_ERROR_RE, FINAL_OK, URC_PREFIXES, AtError, AtResponse, _response_prefix
+
+DEFAULT_TIMEOUT = 5.0
+READ_POLL = 0.05
+AT_CHANNEL = "/dev/smd7"
+# 開機後佔用 AT 通道的服務：經由 /dev/smd7 下指令前需先停止
+CHANNEL_SERVICES = ("pega-5GNR-init", "pega-framework-init", "pega-atcmder-init")
+# 指令逾時後的重新同步：送出 AT，收到結果碼後 SYNC_QUIET 秒內沒有其他輸出才恢復送出佇列
+SYNC_CMD = "AT"
+SYNC_TIMEOUT = 2.0
+SYNC_QUIET = 0.3
+SYNC_ATTEMPTS = 3
+
+
+class AtStreamClosed(AtError):
+    pass
+
+
+# =============== 通道 ===============
+class SerialStream:
+    """COM 埠通道（pyserial）"""
+
+    def __init__(self, device: str, baudrate: int = 115200):
+        self.device = device
+        self.baudrate = baudrate
+        self.ser = None
+
+    def open(self):
+        import serial
+
+        try:
+            self.ser = serial.Serial(self.device, self.baudrate, timeout=READ_POLL, write_timeout=2)
+        except (serial.SerialException, OSError, ValueError) as e:
+            raise AtStreamClosed(f"cannot open {self.device}: {e}") from e
+
+    def read(self) -> bytes:
+        try:
+            return self.ser.read(self.ser.in_waiting or 1)
+        except Exception as e:
+            raise AtStreamClosed(f"{self.device} read failed: {e}") from e
+
+    def write(self, data: bytes):
+        try:
+            self.ser.write(data)
+        except Exception as e:
+            raise AtStreamClosed(f"{self.device} write failed: {e}") from e
+
+    def close(self):
+        if self.ser is not None:
+            try:
+                self.ser.close()
+            except Exception:
+                pass
+            self.ser = None
+
+    def __str__(self):
+        return self.device
+
+
+class AdbShellAtStream:
+    """經由 adb shell 直接讀寫裝置上的 AT 通道（預設 /dev/smd7）
+
+    裝置端執行 `cat <ch> & ... cat > <ch>`：socket 寫入的資料進到 AT 通道，通道輸出回到 socket，
+    因此可以讀到回應，而不是以 printf 盲寫。背景的讀取 cat 於連線結束時一併結束，
+    否則它會留在裝置上，搶走下一個通道的第一個回應。
+    """
+
+    def __init__(self, serial: Optional[str] = None, channel: str = AT_CHANNEL):
+        self.serial = serial
+        self.channel = channel
+        self.conn: Optional[adb_client.AdbConnection] = None
+
+    def open(self):
+        cmd = (
+            f"stty raw -echo 2>/dev/null; cat {self.channel} & r=$!; "
+            f"trap 'kill $r 2>/dev/null' EXIT HUP INT TERM; cat > {self.channel}"
+        )
+        try:
+            self.conn = adb_client.open_service(f"shell:{cmd}", serial=self.serial, timeout=10)
+        except AdbError as e:
+            raise AtStreamClosed(f"cannot open {self.channel} on {self.serial or 'device'}: {e}") from e
+        self.conn.sock.settimeout(READ_POLL)
+
+    def read(self) -> bytes:
+        try:
+            data = self.conn.recv()
+        except socket.timeout:
+            return b""
+        except AdbError as e:
+            raise AtStreamClosed(str(e)) from e
+        if not data:
+            raise AtStreamClosed(f"{self.channel} stream closed")
+        return data
+
+    def write(self, data: bytes):
+        if self.conn is None:
+            raise AtStreamClosed(f"{self.channel} stream is not open")
+        try:
+            self.conn.send(data)
+        except AdbError as e:
+            raise AtStreamClosed(str(e)) from e
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def __str__(self):
+        return f"{self.serial or 'adb'}:{self.channel}"
+
+
+# =============== session ===============
+class _Pending:
+    def __init__(self, command: str, timeout: float):
+        self.command = command
+        self.timeout = timeout
+        self.response = AtResponse(command)
+        self.future: Future = Future()
+        self.prefix = _response_prefix(command)
+        self.t0 = 0.0
+        self.deadline = 0.0
+
+
+class AtSession:
+    """長駐 AT session：FIFO 佇列、最多 max_inflight 個已送出未完成的指令、URC 回呼、斷線重開
+
+    max_inflight 預設 1（送出 → 等結果碼 → 下一個）；大於 1 時連續寫入，回應依序對應（模組需依序回覆）。
+    指令逾時後其遲到的回應會錯配給下一個指令，因此逾時後先丟棄輸出並以 AT 重新同步，才送出佇列中的指令。
+    """
+
+    def __init__(
+        self,
+        stream,
+        max_inflight: int = 1,
+        on_urc: Optional[Callable[[str], None]] = None,
+        reopen: bool = True,
+        reopen_timeout: float = 10.0,
+        on_event: Optional[Callable[[str], None]] = None,
+    ):
+        self.stream = stream
+        self.max_inflight = max(1, max_inflight)
+        self.reopen = reopen
+        self.reopen_timeout = reopen_timeout
+        self.on_event = on_event
+        self.urc_listeners: List[Callable[[str], None]] = [on_urc] if on_urc else []
+        self.urcs: List[str] = []
+        self._queue: Deque[_Pending] = deque()
+        self._inflight: Deque[_Pending] = deque()
+        self._cond = threading.Condition()
+        self._buf = b""
+        self._closed = True
+        self._connected = False
+        self._thread: Optional[threading.Thread] = None
+        # 重新同步狀態（只在讀取執行緒變更）
+        self._syncing = False
+        self._sync_attempts = 0
+        self._sync_deadline = 0.0
+        self._sync_quiet_until: Optional[float] = None
+
+    # ---- 生命週期 ----
+    def open(self):
+        self.stream.open()
+        self._closed = False
+        self._connected = True
+        self._thread = threading.Thread(target=self._loop, name=f"at-session {self.stream}", daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2)
+        self.stream.close()
+        self._fail_all("session closed")
+
+    def __enter__(self):
+        if self._closed:
+            self.open()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def add_urc_listener(self, callback: Callable[[str], None]):
+        self.urc_listeners.append(callback)
+
+    # ---- 指令 ----
+    def submit(self, command: str, timeout: float = DEFAULT_TIMEOUT) -> Future:
+        """排入佇列並回傳 Future[AtResponse]；逾時的回應 final 為 None"""
+        p = _Pending(command, timeout)
+        with self._cond:
+            if self._closed:
+                p.future.set_exception(AtStreamClosed("session is closed"))
+                return p.future
+            self._queue.append(p)
+            self._send_ready()
+        return p.future
+
+    def command(self, command: str, timeout: float = DEFAULT_TIMEOUT) -> AtResponse:
+        # 佇列等待時間也計入，額外保留一點緩衝
+        return self.submit(command, timeout).result(timeout=timeout + self.reopen_timeout + 5)
+
+    # ---- 內部 ----
+    def _event(self, msg: str):
+        if self.on_event is not None:
+            self.on_event(msg)
+
+    def _fail_all(self, reason: str):
+        with self._cond:
+            items = list(self._inflight) + list(self._queue)
+            self._inflight.clear()
+            self._queue.clear()
+        for p in items:
+            if not p.future.done():
+                p.future.set_exception(AtStreamClosed(reason))
+
+    def _dispatch_urc(self, line: str):
+        self.urcs.append(line)
+        for cb in self.urc_listeners:
+            try:
+                cb(line)
+            except Exception:
+                pass
+
+    def _finish(self, p: _Pending, final: Optional[str]):
+        p.response.final = final
+        p.response.seconds = time.monotonic() - p.t0
+        if not p.future.done():
+            p.future.set_result(p.response)
+
+    def _send_ready(self):
+        """依 max_inflight 從佇列送出指令；寫入與加入 in-flight 在同一把鎖內，確保回應順序一致"""
+        with self._cond:
+            while self._queue and len(self._inflight) < self.max_inflight and self._connected and not self._closed and not self._syncing:
+                p = self._queue.popleft()
+                p.t0 = time.monotonic()
+                p.deadline = p.t0 + p.timeout
+                self._inflight.append(p)
+                try:
+                    self.stream.write(p.command.encode() + b"\r\n")
+                except AtStreamClosed:
+                    # 讀取執行緒會偵測到斷線並處理 in-flight 指令
+                    return
+
+    def _handle_line(self, line: str):
+        if self._syncing:
+            self._handle_sync_line(line)
+            return
+        head = self._inflight[0] if self._inflight else None
+        if head is not None and line == head.command:
+            return  # 回顯
+        if line in FINAL_OK or FINAL_ERROR_RE.match(line):
+            if head is None:
+                self._dispatch_urc(line)
+                return
+            with self._cond:
+                self._inflight.popleft()
+            self._finish(head, line)
+            self._send_ready()
+            return
+        if head is None or (line.startswith(URC_PREFIXES) and not (head.prefix and line.startswith(head.prefix))):
+            if head is not None:
+                head.response.urcs.append(line)
+            self._dispatch_urc(line)
+            return
+        head.response.lines.append(line)
+
+    def _expire(self):
+        """最前面的指令逾時：以 final=None 結束；其餘已送出的指令回應無法再對應，以錯誤結束，並開始重新同步"""
+        now = time.monotonic()
+        if self._syncing:
+            self._sync_tick(now)
+            return
+        if not self._inflight or now < self._inflight[0].deadline:
+            return
+        with self._cond:
+            p = self._inflight.popleft()
+            rest = list(self._inflight)
+            self._inflight.clear()
+        self._finish(p, None)
+        for q in rest:
+            if not q.future.done():
+                q.future.set_exception(AtError(f"{q.command}: response lost after {p.command} timed out"))
+        self._event(f"{p.command} timed out on {self.stream}, resynchronising...")
+        self._sync_attempts = 0
+        self._start_sync(now)
+
+    # ---- 重新同步 ----
+    def _start_sync(self, now: float):
+        self._syncing = True
+        self._sync_attempts += 1
+        self._sync_deadline = now + SYNC_TIMEOUT
+        self._sync_quiet_until = None
+        try:
+            with self._cond:
+                self.stream.write(SYNC_CMD.encode() + b"\r\n")
+        except AtStreamClosed:
+            pass  # 讀取執行緒會偵測到斷線並重開
+
+    def _handle_sync_line(self, line: str):
+        """同步期間丟棄所有回應（逾時指令遲到的回應、同步 AT 的回顯），URC 照常分派"""
+        if line in FINAL_OK or FINAL_ERROR_RE.match(line):
+            # 模組依序處理指令：最後一個結果碼之後安靜下來，代表同步 AT 的 OK 也已收到
+            self._sync_quiet_until = time.monotonic() + SYNC_QUIET
+        elif line.startswith(URC_PREFIXES):
+            self._dispatch_urc(line)
+        elif self._sync_quiet_until is not None:
+            self._sync_quiet_until = time.monotonic() + SYNC_QUIET
+
+    def _sync_tick(self, now: float):
+        if self._sync_quiet_until is not None:
+            if now >= self._sync_quiet_until:
+                self._syncing = False
+                self._sync_quiet_until = None
+                self._event(f"AT channel {self.stream} resynchronised")
+                self._send_ready()
+            return
+        if now < self._sync_deadline:
+            return
+        if self._sync_attempts >= SYNC_ATTEMPTS:
+            # 模組持續沒有回應：佇列中的指令以錯誤結束，之後繼續嘗試同步
+            with self._cond:
+                waiting = list(self._queue)
+                self._queue.clear()
+            for p in waiting:
+                if not p.future.done():
+                    p.future.set_exception(AtError(f"{p.command}: no response to {SYNC_CMD} on {self.stream}"))
+            self._sync_attempts = 0
+        self._start_sync(now)
+
+    def _reconnect(self) -> bool:
+        # 已送出的指令無法確認是否送達，直接以錯誤結束；尚未送出的保留到重開後
+        with self._cond:
+            self._connected = False
+            self.stream.close()
+            self._buf = b""
+            lost = list(self._inflight)
+            self._inflight.clear()
+        for p in lost:
+            if not p.future.done():
+                p.future.set_exception(AtStreamClosed(f"channel lost while waiting for {p.command}"))
+        if not self.reopen:
+            return False
+        self._event(f"AT channel {self.stream} lost, reopening...")
+        end = time.monotonic() + self.reopen_timeout
+        delay = 0.2
+        while not self._closed and time.monotonic() < end:
+            try:
+                with self._cond:
+                    self.stream.open()
+                    self._connected = True
+                self._event(f"AT channel {self.stream} reopened")
+                if self._syncing:
+                    self._sync_attempts = 0
+                    self._start_sync(time.monotonic())
+                return True
+            except AtStreamClosed:
+                time.sleep(delay)
+                delay = min(delay * 2, 2.0)
+        return False
+
+    def _loop(self):
+        while not self._closed:
+            try:
+                data = self.stream.read()
+            except AtStreamClosed as e:
+                if self._closed:
+                    break
+                if not self._reconnect():
+                    self._closed = True
+                    self.stream.close()
+                    self._fail_all(str(e))
+                    break
+                self._send_ready()
+                continue
+            if data:
+                self._buf += data
+                while True:
+                    ends = [i for i in (self._buf.find(b"\r"), self._buf.find(b"\n")) if i != -1]
+                    if not ends:
+                        break
+                    pos = min(ends)
+                    line, self._buf = self._buf[:pos].decode(errors="ignore").strip(), self._buf[pos + 1:]
+                    if line:
+                        self._handle_line(line)
+            self._expire()
+
+
+def open_adb_channel(serial: Optional[str] = None, channel: str = AT_CHANNEL, **kwargs) -> AtSession:
+    return AtSession(AdbShellAtStream(serial, channel), **kwargs).open()
+
+
+def open_serial(device: str, **kwargs) -> AtSession:
+    return AtSession(SerialStream(device), **kwargs).open()
@@ -0,0 +1,170 @@
+"""
+at_transport.py - Terminator-driven AT command transport.
+Purpose: Send one AT command over a serial port and read until its final result code (OK / ERROR / +CME ERROR / +CMS ERROR) or a per-command timeout, dropping the echo and separating unsolicited result codes, instead of sleeping a fixed time and calling read_all().
+"""
+
+import re
+import time
+from typing import Callable, List, Optional
+
+DEFAULT_BAUDRATE = 115200
+DEFAULT_TIMEOUT = 2.0
+# 單次 read 的阻塞上限；有資料時立即返回
+READ_POLL = 0.02
+
+FINAL_OK = ("OK", "CONNECT")
+FINAL_ERROR_RE = re.compile(r"^(ERROR|NO CARRIER|NO DIALTONE|BUSY|NO ANSWER|\+CM[ES] ERROR:.*)$")
+# 常見的主動回報（不屬於任何指令的回應）
+URC_PREFIXES = ("RDY", "+QIND:", "+QUSIM:", "+CPIN:", "+CFUN:", "POWERED DOWN", "+QSTAT:", "+CGEV:", "+CREG:", "+CEREG:")
+
+
+class AtError(Exception):
+    pass
+
+
+class AtResponse:
+    def __init__(self, command: str):
+        self.command = command
+        self.lines: List[str] = []  # 資訊行（不含回顯與結果碼）
+        self.final: Optional[str] = None  # OK / ERROR / +CME ERROR: n；逾時為 None
+        self.urcs: List[str] = []
+        self.seconds = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.final in FINAL_OK
+
+    @property
+    def timed_out(self) -> bool:
+        return self.final is None
+
+    @property
+    def text(self) -> str:
+        return "\n".join(self.lines)
+
+    def __repr__(self) -> str:
+        return f"AtResponse({self.command!r}, final={self.final!r}, lines={self.lines!r}, {self.seconds * 1000:.0f} ms)"
+
+
+def _response_prefix(command: str) -> Optional[str]:
+    """AT+QCFG="usbcfg" → "+QCFG:"，用來區分指令回應與 URC"""
+    m = re.match(r"AT([+$^][A-Z0-9]+)", command.upper())
+    return f"{m.group(1)}:" if m else None
+
+
+class AtTransport:
+    """包裝已開啟的序列埠（pyserial 或具 read/write/in_waiting 的物件）"""
+
+    def __init__(self, ser, on_urc: Optional[Callable[[str], None]] = None):
+        self.ser = ser
+        self.on_urc = on_urc
+        self.urcs: List[str] = []
+        self._buf = b""
+
+    @classmethod
+    def open(cls, device: str, baudrate: int = DEFAULT_BAUDRATE, write_timeout: float = 1.0, on_urc=None) -> "AtTransport":
+        import serial
+
+        try:
+            ser = serial.Serial(device, baudrate, timeout=READ_POLL, write_timeout=write_timeout)
+        except (serial.SerialException, OSError, ValueError) as e:
+            raise AtError(f"cannot open {device}: {e}") from e
+        return cls(ser, on_urc)
+
+    def close(self):
+        try:
+            self.ser.close()
+        except Exception:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ---- 讀取 ----
+    def _read_some(self) -> bytes:
+        try:
+            return self.ser.read(self.ser.in_waiting or 1)
+        except Exception as e:
+            raise AtError(f"read failed: {e}") from e
+
+    def _next_line(self, deadline: float) -> Optional[str]:
+        """回傳下一個非空行；期限內沒有完整行則回傳 None"""
+        while True:
+            # \r 與 \n 皆視為行尾，\r\n 產生的空行直接略過
+            ends = [p for p in (self._buf.find(b"\r"), self._buf.find(b"\n")) if p != -1]
+            if ends:
+                pos = min(ends)
+                raw, self._buf = self._buf[:pos], self._buf[pos + 1:]
+                line = raw.decode(errors="ignore").strip()
+                if line:
+                    return line
+                continue
+            if time.monotonic() >= deadline:
+                return None
+            self._buf += self._read_some()
+
+    def _urc(self, line: str, resp: Optional[AtResponse] = None):
+        self.urcs.append(line)
+        if resp is not None:
+            resp.urcs.append(line)
+        if self.on_urc is not None:
+            self.on_urc(line)
+
+    def drain(self, timeout: float = 0.0) -> List[str]:
+        """讀出目前已到達的主動回報（例如 RDY、+QIND）"""
+        found = []
+        deadline = time.monotonic() + timeout
+        while True:
+            line = self._next_line(deadline)
+            if line is None:
+                return found
+            found.append(line)
+            self._urc(line)
+
+    # ---- 指令 ----
+    def command(self, command: str, timeout: float = DEFAULT_TIMEOUT) -> AtResponse:
+        """送出指令並讀到最終結果碼；逾時回傳 final=None 的回應"""
+        resp = AtResponse(command)
+        prefix = _response_prefix(command)
+        t0 = time.monotonic()
+        deadline = t0 + timeout
+        # 指令送出前已在緩衝區的資料都是主動回報
+        if self.ser.in_waiting:
+            self._buf += self._read_some()
+        while True:
+            line = self._next_line(t0)
+            if line is None:
+                break
+            self._urc(line, resp)
+        try:
+            self.ser.write(command.encode() + b"\r\n")
+        except Exception as e:
+            raise AtError(f"write failed: {e}") from e
+        while True:
+            line = self._next_line(deadline)
+            if line is None:
+                break
+            if line == command:
+                continue  # 回顯（ATE1）
+            if line in FINAL_OK or FINAL_ERROR_RE.match(line):
+                resp.final = line
+                break
+            if line.startswith(URC_PREFIXES) and not (prefix and line.startswith(prefix)):
+                self._urc(line, resp)
+                continue
+            resp.lines.append(line)
+        resp.seconds = time.monotonic() - t0
+        return resp
+
+
+def open_port(device: str, **kwargs) -> AtTransport:
+    return AtTransport.open(device, **kwargs)
+
+
+def exchange(device: str, command: str, timeout: float = DEFAULT_TIMEOUT, **kwargs) -> AtResponse:
+    """開啟埠、送一個指令、關閉"""
+    with AtTransport.open(device, **kwargs) as at:
+        return at.command(command, timeout)
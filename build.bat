@@ -110,13 +110,36 @@ pyinstaller --onefile ^
     --workpath=build ^
     --specpath=. ^
     --version-file version_info.txt ^
+    --hidden-import fix_usbcfg ^
     --add-data "assets;assets" ^
     --add-data "config.json;." ^
     --add-data "i18n.py;." ^
     --add-data "logger_util.py;." ^
     --add-data "subprocess_runner.py;." ^
+    --add-data "adb_client.py;." ^
+    --add-data "burn_in_flow.py;." ^
+    --add-data "fw_digest.py;." ^
+    --add-data "fw_validate.py;." ^
+    --add-data "device_monitor.py;." ^
+    --add-data "fix_flow.py;." ^
+    --add-data "mu310_sim.py;." ^
+    --add-data "at_modem_emulator.py;." ^
     --add-data "utils_paths.py;." ^
     --add-data "fix_usbcfg.py;." ^
+    --add-data "at_transport.py;." ^
+    --add-data "at_session.py;." ^
+    --add-data "port_monitor.py;." ^
+    --add-data "keywords_editor.py;." ^
+    --add-data "startup_trace.py;." ^
+    --add-data "job_state.py;." ^
+    --add-data "ui_state.py;." ^
+    --add-data "tk_watchdog.py;." ^
+    --add-data "config_store.py;." ^
+    --add-data "control_service.py;." ^
+    --add-data "cli.py;." ^
+    --add-data "console_logger.py;." ^
+    --add-data "dashboard.py;." ^
+    --add-data "text_fit.py;." ^
     --add-data "README.md;." ^
     --add-data "BAT_FILES;BAT_FILES" ^
     --add-data "logs;logs" ^
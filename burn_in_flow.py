@@ -0,0 +1,520 @@
+"""
+burn_in_flow.py - Firmware burn-in flow (Python port of Burn_in _611GT.bat).
+Purpose: Run the MU310 upgrade steps (ADB check, write test, push, sync, stop services, FOTA trigger) on a worker thread through adb_client, sending the AT commands over a persistent /dev/smd7 session so each one comes back confirmed, reporting push progress/throughput and logging every step to GuiLogger.
+"""
+
+import os
+import re
+import subprocess
+import threading
+import time
+from typing import Callable, Optional
+
+import adb_client
+import at_session
+import fw_digest
+import fw_validate
+from device_monitor import RebootMonitor, query_module_version
+from adb_client import AdbError, ShellSession, TransferStats
+from at_transport import AtError, AtResponse
+
+REMOTE_DIR = "/usrdata/cache/ufs"
+REMOTE_FW = f"{REMOTE_DIR}/update.zip"
+STOP_SERVICES = at_session.CHANNEL_SERVICES
+AT_CHANNEL = at_session.AT_CHANNEL
+
+# 看板顯示的步驟："=== Step N: ... ===" 與 "[4.1] ..." 形式的日誌行
+_STEP_RE = re.compile(r"^(?:=== (Step [^=]+?) ===|\[(\d+(?:\.\d+)+)\] (.+))$")
+
+class BurnInFlow:
+    """韌體燒錄流程，步驟與 Burn_in _611GT.bat 一致，可指定裝置序號"""
+
+    def __init__(
+        self,
+        fw_path: str,
+        logger,
+        tab_name: str = "upgrade",
+        serial: Optional[str] = None,
+        chunk_size: int = adb_client.DEFAULT_CHUNK_SIZE,
+        read_size: int = adb_client.DEFAULT_READ_SIZE,
+        restart_server: bool = True,
+        skip_identical: bool = True,
+        digest_algo: str = fw_digest.DEFAULT_ALGO,
+        validate: bool = True,
+        expected_members: tuple = (),
+        monitor_reboot: bool = True,
+        drop_timeout: float = 120.0,
+        return_timeout: float = 600.0,
+        version_probe: Optional[Callable[[str], Optional[str]]] = query_module_version,
+        on_progress: Optional[Callable[[TransferStats], None]] = None,
+        board=None,
+    ):
+        self.fw_path = os.path.abspath(fw_path)
+        self.logger = logger
+        self.tab_name = tab_name
+        self.serial = serial
+        self.chunk_size = chunk_size
+        self.read_size = read_size
+        self.restart_server = restart_server
+        self.skip_identical = skip_identical
+        self.digest_algo = digest_algo
+        self.validate = validate
+        self.expected_members = tuple(expected_members)
+        self.monitor_reboot = monitor_reboot
+        self.drop_timeout = drop_timeout
+        self.return_timeout = return_timeout
+        self.version_probe = version_probe
+        self.previous_version: Optional[str] = None
+        self.on_progress = on_progress
+        self.board = board  # dashboard.DeviceBoard：序號確定後回報步驟、進度與錯誤
+        self._board_begun = False
+        self.push_stats: Optional[TransferStats] = None
+        self.session: Optional[ShellSession] = None
+        self.at: Optional[at_session.AtSession] = None
+        self.cancel_event = threading.Event()
+
+    # ---- 日誌捷徑 ----
+    def _log(self, msg: str):
+        self.logger.log(msg, tab_name=self.tab_name)
+        m = _STEP_RE.match(msg)
+        if m:
+            self._board(step=m.group(1) or f"{m.group(2)} {m.group(3)}")
+
+    def _ok(self, msg: str):
+        self.logger.success(msg, tab_name=self.tab_name)
+
+    def _err(self, msg: str):
+        self.logger.error(msg, tab_name=self.tab_name)
+        self._board(error=msg)
+
+    # ---- 裝置看板 ----
+    def _board(self, **fields):
+        if self.board is None or not self.serial:
+            return
+        if not self._board_begun:
+            self._board_begun = True
+            self.board.begin(self.serial, "upgrade")
+        self.board.update(self.serial, **fields)
+
+    def _on_push_progress(self, stats: TransferStats):
+        self._board(progress=stats.percent)
+        if self.on_progress is not None:
+            self.on_progress(stats)
+
+    # ---- 取消 ----
+    def cancel(self):
+        """要求取消：於步驟之間（及重啟監控中）生效；push 進行中會等該步驟完成"""
+        self.cancel_event.set()
+
+    def _cancelled(self) -> bool:
+        if self.cancel_event.is_set():
+            self._err("Burn-in cancelled")
+            return True
+        return False
+
+    def _run_adb(self, *args: str) -> int:
+        """執行 adb.exe 子指令並把輸出逐行寫入日誌"""
+        try:
+            proc = subprocess.run(["adb", *args], stdout=subprocess.PIPE, stderr=subprocess.STDOUT, timeout=60)
+        except Exception as e:
+            self._err(f"adb {' '.join(args)} failed: {e}")
+            return -1
+        for line in proc.stdout.decode(errors="ignore").splitlines():
+            if line.strip():
+                self._log(line.rstrip())
+        return proc.returncode
+
+    def _shell(self, command: str) -> int:
+        code, out = adb_client.shell_rc(command, serial=self.serial)
+        for line in out.splitlines():
+            if line.strip():
+                self._log(line.rstrip())
+        return code
+
+    def _open_session(self):
+        """push 後的指令共用一個互動式 shell；開啟失敗時退回逐條 adb shell"""
+        try:
+            self.session = ShellSession(serial=self.serial).open()
+        except AdbError as e:
+            self.logger.warning(f"persistent shell unavailable, fallback to per-command shell: {e}", tab_name=self.tab_name)
+            self.session = None
+
+    def _close_session(self):
+        if self.session is not None:
+            self.session.close()
+            self.session = None
+
+    def _open_at(self):
+        """開啟 /dev/smd7 AT session（需先停止佔用通道的服務）；失敗時退回 printf 盲寫"""
+        try:
+            self.at = at_session.open_adb_channel(
+                self.serial,
+                on_urc=lambda line: self._log(f"URC: {line}"),
+                reopen=False,  # FOTA 後裝置會重啟，不需重開
+            )
+        except AtError as e:
+            self.logger.warning(f"AT channel unavailable, fallback to printf: {e}", tab_name=self.tab_name)
+            self.at = None
+
+    def _close_at(self):
+        if self.at is not None:
+            self.at.close()
+            self.at = None
+
+    def _at(self, command: str, timeout: float = 5.0) -> Optional[AtResponse]:
+        """經由 AT session 執行指令並記錄結果；通道中斷時回傳 None"""
+        try:
+            res = self.at.command(command, timeout=timeout)
+        except AtError as e:
+            self._err(f"{command}: {e}")
+            return None
+        for line in res.lines:
+            self._log(f"  {line}")
+        self._log(f"  {command}: {res.final or 'no response'} ({res.seconds * 1000:.0f} ms)")
+        self.logger.record("at", serial=self.serial, command=command, final=res.final, ms=round(res.seconds * 1000, 1))
+        return res
+
+    def _step(self, label: str, command: str) -> int:
+        """執行單一 shell 步驟，記錄結束碼與耗時"""
+        if self.session is not None:
+            res = self.session.run(command)
+            code, out, seconds = res.code, res.output, res.seconds
+        else:
+            t0 = time.perf_counter()
+            code, out = adb_client.shell_rc(command, serial=self.serial)
+            seconds = time.perf_counter() - t0
+        for line in out.splitlines():
+            if line.strip():
+                self._log(line.rstrip())
+        self._log(f"  {label}: rc={code} ({seconds * 1000:.0f} ms)")
+        self.logger.record("shell_step", serial=self.serial, step=label, rc=code, ms=round(seconds * 1000, 1))
+        return code
+
+    # ---- 步驟 ----
+    def step_check_adb(self) -> bool:
+        self._log("=== Step 0: Check ADB version ===")
+        if self.restart_server:
+            if self._run_adb("version") != 0:
+                self._err("ADB not found! Please install ADB and ensure it is in PATH.")
+                return False
+            self._run_adb("kill-server")
+            self._run_adb("start-server")
+        if not adb_client.ensure_server():
+            self._err("Cannot connect to ADB server")
+            return False
+        if not self.restart_server:
+            # 沿用既有 server（可能是其他工作站程序或模擬器）：只透過 socket 確認版本
+            try:
+                host, port = adb_client.server_address()
+                self._log(f"ADB server {host}:{port} version {int(adb_client.host_query('host:version'), 16)}")
+            except (AdbError, ValueError) as e:
+                self._err(f"Cannot query ADB server version: {e}")
+                return False
+        return True
+
+    def step_wait_device(self, retries: int = 5, interval: float = 3.0) -> bool:
+        self._log("=== Step 1: Check ADB connection ===")
+        for attempt in range(1, retries + 1):
+            try:
+                devices = [s for s, state in adb_client.list_devices() if state == "device"]
+            except AdbError as e:
+                self._err(f"adb devices failed: {e}")
+                devices = []
+            self._log(f"=== ADB devices: {len(devices)} ===")
+            for s in devices:
+                self._log(f"- {s}")
+            if self.serial and self.serial in devices:
+                break
+            if not self.serial and devices:
+                self.serial = devices[0]
+                break
+            if attempt < retries:
+                self._log(f"[INFO] No ADB device found, retrying in {interval:g} seconds... ({attempt}/{retries})")
+                time.sleep(interval)
+        else:
+            self._err("No ADB device connected!")
+            return False
+        self._log(f"Found device: {self.serial}")
+        self._ok("ADB device connection normal")
+        return True
+
+    def step_check_firmware(self) -> bool:
+        self._log("=== Step 2: Check firmware file ===")
+        if not os.path.isfile(self.fw_path):
+            self._err(f"Firmware file not found: \"{self.fw_path}\"!")
+            return False
+        self._ok(f"Firmware file exists: \"{self.fw_path}\"")
+        if self.validate:
+            # 只讀 central directory，數毫秒內即可發現截斷或損毀的 update.zip
+            res = fw_validate.validate_structure(self.fw_path, self.expected_members)
+            for w in res.warnings:
+                self.logger.warning(w, tab_name=self.tab_name)
+            if not res.ok:
+                for e in res.errors:
+                    self._err(e)
+                self._err("Firmware package is invalid, abort before push")
+                return False
+            self._ok(f"Firmware package structure OK ({res.summary()})")
+        return True
+
+    def step_test_write(self) -> bool:
+        self._log("=== Step 3: Test write permission ===")
+        if self._shell(f"echo test > {REMOTE_DIR}/test.txt") != 0:
+            self._err(f"Cannot write to {REMOTE_DIR}!")
+            return False
+        self._shell(f"rm {REMOTE_DIR}/test.txt")
+        self._ok("Target directory writable")
+        return True
+
+    def _remote_is_identical(self) -> bool:
+        """比對本機韌體與裝置上 update.zip 的雜湊，相同則可略過 push"""
+        tool = fw_digest.REMOTE_TOOLS.get(self.digest_algo)
+        if not tool:
+            return False
+        try:
+            local = fw_digest.get_digest(self.fw_path, self.digest_algo)
+            code, out = adb_client.shell_rc(f"{tool} {REMOTE_FW} 2>/dev/null", serial=self.serial)
+        except (AdbError, OSError) as e:
+            self.logger.debug(f"digest check skipped: {e}", tab_name=self.tab_name)
+            return False
+        remote = fw_digest.parse_remote_digest(out) if code == 0 else None
+        self.logger.debug(f"{self.digest_algo} local={local} remote={remote}", tab_name=self.tab_name)
+        return remote is not None and remote == local
+
+    def step_push(self, retries: int = 3) -> bool:
+        self._log("=== Step 4: Upload firmware ===")
+        if self.skip_identical and self._remote_is_identical():
+            self._ok(f"Identical firmware already on device ({self.digest_algo} match), skip push")
+            self.logger.record(
+                "push",
+                serial=self.serial,
+                file=os.path.basename(self.fw_path),
+                bytes=0,
+                skipped=True,
+                reason=f"{self.digest_algo} match",
+            )
+            return True
+        for attempt in range(1, retries + 1):
+            self._log("[4.1] Uploading firmware to device...")
+            try:
+                stats = adb_client.push(
+                    self.fw_path,
+                    REMOTE_FW,
+                    serial=self.serial,
+                    chunk_size=self.chunk_size,
+                    read_size=self.read_size,
+                    progress=self._on_push_progress,
+                )
+            except (AdbError, OSError) as e:
+                self._err(f"push failed: {e}")
+                if attempt < retries:
+                    self._log(f"[INFO] Retry push... attempt {attempt}")
+                    time.sleep(2)
+                    continue
+                self._err(f"Firmware upload failed after {retries} attempts!")
+                return False
+            self.push_stats = stats
+            mb = stats.total / (1024 * 1024)
+            self._ok(
+                f"Firmware upload completed: {mb:.1f} MB in {stats.elapsed:.1f}s "
+                f"({adb_client.format_rate(stats.average_rate)}, chunk {self.chunk_size // 1024} KB)"
+            )
+            self.logger.record(
+                "push",
+                serial=self.serial,
+                file=os.path.basename(self.fw_path),
+                bytes=stats.total,
+                seconds=round(stats.elapsed, 3),
+                mb_per_s=round(stats.average_rate / (1024 * 1024), 3),
+                chunk_kb=self.chunk_size // 1024,
+                attempt=attempt,
+            )
+            return True
+        return False
+
+    def step_sync(self):
+        self._log("[4.2] Executing sync operation...")
+        self._step("sync #1", "sync")
+        self._step("sync #2", "sync")
+        self._ok("Sync operation completed")
+
+    def step_stop_services(self):
+        self._log("[4.3] Stopping related system services...")
+        for svc in STOP_SERVICES:
+            self._step(f"stop {svc}", f"systemctl stop {svc}")
+        self._ok("System services stopped")
+
+    def step_check_channel(self):
+        self._log(f"[4.4] Checking {AT_CHANNEL}...")
+        self._step(f"fuser {AT_CHANNEL}", f"fuser {AT_CHANNEL}")
+        self._ok(f"{AT_CHANNEL} status check completed")
+
+    def step_query_module(self):
+        """與 FOTA 共用同一個 AT session：讀取升級前版本並確認 usbcfg（重啟後 adb 仍須開啟）"""
+        if self.at is None:
+            return
+        self._log("[4.4.1] Querying module over AT channel...")
+        res = self._at("AT+QGMR")
+        if res is not None and res.ok and res.lines and not self.previous_version:
+            self.previous_version = res.lines[0]
+            self._log(f"Current firmware version: {self.previous_version}")
+        res = self._at('AT+QCFG="usbcfg"')
+        if res is not None and res.ok:
+            try:
+                from fix_usbcfg import TARGET_QCFG
+            except ImportError:
+                return
+            if TARGET_QCFG not in res.text:
+                self.logger.warning(f"usbcfg differs from {TARGET_QCFG}, ADB may not return after upgrade", tab_name=self.tab_name)
+
+    def step_trigger_fota(self) -> bool:
+        self._log("[4.5] Sending firmware update command...")
+        if self.at is None:
+            self._step("at", f"printf 'at\\r\\n' > {AT_CHANNEL}")
+            time.sleep(2)
+            self._step("AT+QFOTADL", f"printf 'AT+QFOTADL=\"{REMOTE_FW}\"\\r\\n' > {AT_CHANNEL}")
+            self._ok("Firmware flashing command sent!")
+            return True
+        # 通道已確認可用，不需再固定等待 2 秒
+        res = self._at("AT", timeout=3)
+        if res is None or not res.ok:
+            self._err("AT channel did not answer AT")
+            return False
+        res = self._at(f'AT+QFOTADL="{REMOTE_FW}"', timeout=10)
+        if res is None or res.timed_out:
+            # 模組可能在回覆前即開始重啟，交由重啟監控判定
+            self.logger.warning("No response to AT+QFOTADL, continuing to monitor reboot", tab_name=self.tab_name)
+            return True
+        if not res.ok:
+            self._err(f"AT+QFOTADL rejected: {res.final}")
+            return False
+        self._ok("Firmware flashing command accepted (OK)")
+        return True
+
+    def step_monitor_upgrade(self) -> bool:
+        """取代固定等待 4 分鐘：偵測裝置離線、重新列舉並確認版本"""
+        self._board(step="4.6 Waiting for reboot")
+        res = RebootMonitor(
+            self.serial,
+            self.logger,
+            tab_name=self.tab_name,
+            drop_timeout=self.drop_timeout,
+            return_timeout=self.return_timeout,
+            version_probe=self.version_probe,
+            previous_version=self.previous_version,
+            stop=self.cancel_event,
+        ).run()
+        self.logger.record(
+            "reboot",
+            serial=self.serial,
+            ok=res.ok,
+            drop_s=None if res.drop_s is None else round(res.drop_s, 1),
+            back_s=None if res.back_s is None else round(res.back_s, 1),
+            version_before=self.previous_version,
+            version=res.version,
+            message=res.message,
+        )
+        if res.version:
+            self._board(version=res.version)
+        if not res.ok:
+            self._err(f"Upgrade not confirmed: {res.message}")
+            return False
+        self._ok(f"MU310 burn in PASS, {res.message}")
+        return True
+
+    # ---- 主流程 ----
+    def run(self) -> int:
+        """依序執行所有步驟，回傳結束碼（0=成功）"""
+        try:
+            code = self._run_steps()
+        except Exception:
+            self._board_finish(-1)
+            raise
+        self._board_finish(code)
+        return code
+
+    def _board_finish(self, code: int):
+        if self.board is not None and self.serial:
+            self._board()
+            self.board.finish(self.serial, code, cancelled=self.cancel_event.is_set())
+
+    def _run_steps(self) -> int:
+        self._log(f"[INFO] Firmware selected: \"{self.fw_path}\"")
+        try:
+            for step in (self.step_check_adb, self.step_wait_device, self.step_check_firmware, self.step_test_write, self.step_push):
+                if self._cancelled() or not step():
+                    return 1
+            if self._cancelled():
+                return 1
+            self._open_session()
+            try:
+                self.step_sync()
+                self.step_stop_services()
+                self.step_check_channel()
+                self._open_at()
+                self.step_query_module()
+                if self.at is None and self.monitor_reboot and self.version_probe is not None:
+                    # 無 AT session 時改由版本查詢讀取升級前版本（單次嘗試，讀不到不影響流程）
+                    if self.version_probe is query_module_version:
+                        # 服務已於 4.3 停止，不再停止 / 重新啟動（之後要送 AT+QFOTADL）
+                        self.previous_version = query_module_version(self.serial, deadline_s=0, stop_services=False)
+                    else:
+                        self.previous_version = self.version_probe(self.serial)
+                    if self.previous_version:
+                        self._log(f"Current firmware version: {self.previous_version}")
+                # 送出 AT+QFOTADL 之後模組會自行完成更新，取消只在此之前有效
+                if self._cancelled() or not self.step_trigger_fota():
+                    return 1
+            finally:
+                self._close_at()
+                self._close_session()
+            if self.monitor_reboot:
+                self._log("Notes: do not disconnect during update; device will restart automatically.")
+                return 0 if self.step_monitor_upgrade() else 1
+        except AdbError as e:
+            self._err(f"ADB error: {e}")
+            return 1
+        self._log("Notes: do not disconnect during update; device may restart automatically.")
+        self._ok("MU310 burn in PASS and please wait 4 mins for update.")
+        return 0
+
+
+def options_from_config(config: dict) -> dict:
+    """config.json 中的燒錄設定轉為 BurnInFlow 參數（GUI 與 CLI 共用）"""
+    chunk_kb = int(config.get("push_chunk_kb", adb_client.DEFAULT_CHUNK_SIZE // 1024))
+    read_kb = int(config.get("push_read_kb", adb_client.DEFAULT_READ_SIZE // 1024))
+    return dict(
+        chunk_size=chunk_kb * 1024,
+        read_size=read_kb * 1024,
+        skip_identical=bool(config.get("push_skip_identical", True)),
+        validate=bool(config.get("fw_validate", True)),
+        expected_members=tuple(config.get("fw_expected_members", [])),
+        monitor_reboot=bool(config.get("upgrade_monitor_reboot", True)),
+        drop_timeout=float(config.get("upgrade_drop_timeout", 120)),
+        return_timeout=float(config.get("upgrade_return_timeout", 600)),
+    )
+
+
+def run_burn_in(
+    fw_path: str,
+    logger,
+    tab_name: str = "upgrade",
+    on_complete: Optional[Callable[[int], None]] = None,
+    **kwargs,
+) -> BurnInFlow:
+    """於背景執行緒執行燒錄流程，完成後以結束碼呼叫 on_complete；回傳流程物件（可 cancel()）"""
+    flow = BurnInFlow(fw_path, logger, tab_name=tab_name, **kwargs)
+
+    def _worker():
+        try:
+            code = flow.run()
+        except Exception as e:
+            logger.error(f"Burn-in flow crashed: {e}", tab_name=tab_name)
+            code = -1
+        logger.log(f"[EXIT] code={code}", tab_name=tab_name)
+        if on_complete:
+            on_complete(code)
+
+    t = threading.Thread(target=_worker, daemon=True)
+    t.start()
+    return flow
@@ -0,0 +1,268 @@
+"""
+cli.py - Headless command-line entry point for station automation.
+Purpose: Run the same flows as the GUI (ADB environment check, COM port list, auto fix, firmware upgrade) without creating any Tk objects: logs stream to stdout and a per-process session file, the exit code reflects the result, and a one-line JSON summary is printed last (and optionally written to a file) for the test executive.
+
+Usage:
+  python cli.py env
+  python cli.py ports
+  python cli.py fix
+  python cli.py upgrade FIRMWARE.bin [--serial SERIAL] [--restart-server]
+  python cli.py serve [--host HOST] [--port PORT]   (control_service.py over HTTP until Ctrl+C)
+Common options: --config PATH, --summary PATH, --log-dir DIR, --debug, --quiet
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from config_store import ConfigStore
+from console_logger import ConsoleLogger
+from job_state import Job
+from version import __version__
+
+CONFIG_FILENAME = "config.json"
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2  # 參數錯誤或找不到韌體檔
+EXIT_INTERRUPTED = 130
+
+# upgrade 進度最少間隔（秒）才輸出一行
+PROGRESS_INTERVAL = 2.0
+
+
+def _default_config_path() -> str:
+    base = getattr(sys, "_MEIPASS", os.path.abspath("."))
+    return os.path.join(base, CONFIG_FILENAME)
+
+
+# =============== 指令 ===============
+# 每個指令回傳 (結束碼, 摘要額外欄位)；job 用於取消與狀態
+
+def cmd_env(args, config, logger, job):
+    from utils_paths import get_resource_path
+    from subprocess_runner import run_bat_file
+    import threading
+
+    bat = get_resource_path("BAT_FILES/ADB Environment Check.bat")
+    if not os.path.exists(bat):
+        logger.error("ADB Environment Check.bat not found", tab_name="adb")
+        return EXIT_FAILED, {}
+    done = threading.Event()
+    result = {}
+
+    def _on_complete(code):
+        result["code"] = code
+        done.set()
+
+    proc = run_bat_file(bat, logger=logger, cwd=os.path.dirname(bat), tab_name="adb", on_complete=_on_complete)
+    if proc is None:
+        return EXIT_FAILED, {}
+    job.set_canceller(proc.terminate)
+    # 以逾時輪詢等待，Ctrl+C 才能中斷
+    while not done.wait(0.2):
+        pass
+    return (EXIT_OK if result["code"] == 0 else EXIT_FAILED), {"bat_exit_code": result["code"]}
+
+
+def cmd_ports(args, config, logger, job):
+    from port_monitor import format_port_line, is_dm_port
+
+    try:
+        from fix_usbcfg import candidate_ports
+
+        t0 = time.perf_counter()
+        ports = list(candidate_ports())
+        seconds = time.perf_counter() - t0
+    except Exception as e:
+        logger.error(f"Scan COM ports failed: {e}", tab_name="adb")
+        return EXIT_FAILED, {}
+    if not ports:
+        logger.warning("No COM ports found", tab_name="adb")
+        return EXIT_FAILED, {"ports": []}
+    logger.log(f"Found {len(ports)} COM ports (scanned in {seconds * 1000:.0f} ms):", tab_name="adb")
+    for p in ports:
+        logger.log(f"  {format_port_line(p)}", tab_name="adb")
+    return EXIT_OK, {
+        "ports": [
+            {
+                "device": p.device,
+                "description": getattr(p, "description", "") or "",
+                "vid": getattr(p, "vid", None),
+                "pid": getattr(p, "pid", None),
+                "dm": is_dm_port(p),
+            }
+            for p in ports
+        ]
+    }
+
+
+def cmd_fix(args, config, logger, job):
+    from fix_flow import AutoFixFlow, options_from_config
+
+    flow = AutoFixFlow(logger, tab_name="fix", **options_from_config(config))
+    job.set_canceller(flow.cancel)
+    code = flow.run()
+    return (EXIT_OK if code == 0 else EXIT_FAILED), {}
+
+
+def cmd_upgrade(args, config, logger, job):
+    fw_abs = os.path.abspath(args.firmware)
+    extra = {"firmware": fw_abs, "serial": args.serial}
+    if not os.path.isfile(fw_abs):
+        logger.error(f"Firmware file not found: {fw_abs}", tab_name="upgrade")
+        return EXIT_USAGE, extra
+
+    import adb_client
+    from burn_in_flow import BurnInFlow, options_from_config
+
+    last = {"t": 0.0}
+
+    def _on_progress(st):
+        now = time.monotonic()
+        if st.sent < st.total and now - last["t"] < PROGRESS_INTERVAL:
+            return
+        last["t"] = now
+        logger.log(
+            f"push {st.percent:5.1f}%  {adb_client.format_rate(st.rate or st.average_rate)}  ETA {adb_client.format_eta(st.eta)}",
+            tab_name="upgrade",
+        )
+
+    # 預設沿用既有 adb server：kill-server 會中斷同一台主機上其他執行中的 CLI
+    flow = BurnInFlow(
+        fw_abs,
+        logger,
+        tab_name="upgrade",
+        serial=args.serial,
+        restart_server=args.restart_server,
+        on_progress=_on_progress,
+        board=getattr(args, "board", None),  # control_service.py 傳入 GUI 的裝置看板
+        **options_from_config(config),
+    )
+    job.set_canceller(flow.cancel)
+    code = flow.run()
+    if flow.push_stats is not None:
+        extra["push_bytes"] = flow.push_stats.sent
+        extra["push_seconds"] = round(flow.push_stats.elapsed, 3)
+    if flow.previous_version:
+        extra["previous_version"] = flow.previous_version
+    return (EXIT_OK if code == 0 else EXIT_FAILED), extra
+
+
+def cmd_serve(args, config, logger, job):
+    from control_service import service_from_config
+
+    service = service_from_config(logger, config, job_tabs=True)
+    if args.host is not None:
+        service.host = args.host
+    if args.port is not None:
+        service.port = args.port
+    try:
+        service.start()
+    except OSError as e:
+        logger.error(str(e))
+        return EXIT_FAILED, {}
+    logger.log(f"Control service listening on {service.url}{' (token required)' if service.token else ''}")
+    try:
+        while True:
+            time.sleep(1.0)
+    except KeyboardInterrupt:
+        logger.log("Stopping control service")
+    finally:
+        service.stop()
+    return EXIT_OK, {"url": service.url, "jobs": len(service.jobs)}
+
+
+COMMANDS = {
+    "env": (cmd_env, "ADB environment check (BAT_FILES/ADB Environment Check.bat)"),
+    "ports": (cmd_ports, "list COM ports"),
+    "fix": (cmd_fix, "auto fix ADB connection (usbcfg)"),
+    "upgrade": (cmd_upgrade, "firmware upgrade via adb"),
+    "serve": (cmd_serve, "run the local HTTP control service (control_service.py)"),
+}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--config", default=None, help="config.json path (default: next to the program)")
+    common.add_argument("--summary", default=None, help="also write the JSON summary to this file")
+    common.add_argument("--log-dir", default="logs", help="session log directory (default: logs)")
+    common.add_argument("--debug", action="store_true", help="show DEBUG lines")
+    common.add_argument("--quiet", action="store_true", help="print only the JSON summary on stdout")
+
+    parser = argparse.ArgumentParser(prog="cli.py", description=f"MU310 Tools Center {__version__} (headless)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name, (_, help_text) in COMMANDS.items():
+        p = sub.add_parser(name, parents=[common], help=help_text)
+        if name == "upgrade":
+            p.add_argument("firmware", help="firmware package (*.bin)")
+            p.add_argument("--serial", default=None, help="adb device serial (required with several devices)")
+            p.add_argument("--restart-server", action="store_true", help="kill and restart the adb server first (as the BAT file does)")
+        elif name == "serve":
+            p.add_argument("--host", default=None, help="bind address (default: control_service_host or 127.0.0.1)")
+            p.add_argument("--port", type=int, default=None, help="port (default: control_service_port or 8765, 0 = any)")
+    return parser
+
+
+def _write_summary(path: str, text: str):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text + "\n")
+    os.replace(tmp, path)
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        sys.stdout.reconfigure(errors="replace")
+    except (AttributeError, ValueError):
+        pass
+    logger = ConsoleLogger(log_dir=args.log_dir, debug=args.debug, quiet=args.quiet)
+    store = ConfigStore(args.config or _default_config_path())
+    config = store.load()  # 只讀取，CLI 不寫回設定檔
+    if store.load_error:
+        logger.warning(store.load_error)
+    logger.record("cli_start", command=args.command, argv=sys.argv[1:] if argv is None else list(argv), version=__version__)
+
+    func = COMMANDS[args.command][0]
+    job = Job(args.command)
+    job.start()
+    extra = {}
+    try:
+        code, extra = func(args, config, logger, job)
+    except KeyboardInterrupt:
+        job.cancel()
+        logger.warning("Interrupted")
+        code = EXIT_INTERRUPTED
+    except Exception as e:
+        logger.error(f"{args.command} crashed: {e}")
+        code = EXIT_FAILED
+    job.finish(code)
+
+    summary = {
+        "command": args.command,
+        "state": job.state,
+        "exit_code": code,
+        "seconds": round(job.elapsed, 2),
+        "pid": os.getpid(),
+        "version": __version__,
+        "session_log": os.path.abspath(logger.log_path),
+        "errors": logger.errors[-5:],
+        **extra,
+    }
+    logger.record("cli_result", **summary)
+    text = json.dumps(summary, ensure_ascii=False, default=str)
+    print(text, flush=True)
+    if args.summary:
+        try:
+            _write_summary(args.summary, text)
+        except OSError as e:
+            print(f"cannot write summary {args.summary}: {e}", file=sys.stderr)
+    logger.close()
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
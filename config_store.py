@@ -0,0 +1,163 @@
+"""
+config_store.py - Debounced, atomic config.json persistence.
+Purpose: Own the application settings dict, batch changes and write them from a background thread after a short quiet period via temp file + fsync + os.replace (a crash mid-write never leaves a truncated config.json), skip writes whose serialized content is unchanged, and move an unreadable config aside instead of silently overwriting it with defaults.
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+DEFAULT_DELAY = 0.5
+# 持續有變更時最晚在這段時間內寫出一次
+MAX_DELAY = 3.0
+
+
+class ConfigStore:
+    """設定檔服務：data 供 Tk 執行緒直接讀取；set()/update()/save() 只做標記，實際寫檔在背景執行緒"""
+
+    def __init__(self, path: str, delay: float = DEFAULT_DELAY, max_delay: float = MAX_DELAY):
+        self.path = path
+        self.delay = delay
+        self.max_delay = max_delay
+        self.data: Dict[str, Any] = {}
+        self.load_error: Optional[str] = None
+        self.write_error: Optional[str] = None
+        self.writes = 0
+        self.skipped = 0
+        self._written: Optional[str] = None  # 磁碟上的內容（序列化後）
+        self._pending: Optional[Dict[str, Any]] = None
+        self._first_change = 0.0
+        self._last_change = 0.0
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+
+    # ---- 讀取 ----
+    def load(self) -> Dict[str, Any]:
+        """讀取設定檔；內容損毀時改名為 *.corrupt 保留現場，並以空設定啟動（load_error 記錄原因）"""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                text = f.read()
+        except FileNotFoundError:
+            self.data = {}
+            return self.data
+        except OSError as e:
+            self.load_error = f"cannot read {self.path}: {e}"
+            self.data = {}
+            return self.data
+        try:
+            data = json.loads(text)
+            if not isinstance(data, dict):
+                raise ValueError("top level is not an object")
+        except ValueError as e:
+            aside = f"{self.path}.corrupt"
+            try:
+                os.replace(self.path, aside)
+                self.load_error = f"{self.path} is corrupt ({e}); moved to {aside}"
+            except OSError:
+                self.load_error = f"{self.path} is corrupt ({e})"
+            self.data = {}
+            return self.data
+        self.data = data
+        self._written = self._serialize(data)
+        return self.data
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.data.get(key, default)
+
+    # ---- 變更 ----
+    def set(self, key: str, value: Any):
+        self.update({key: value})
+
+    def update(self, values: Optional[Dict[str, Any]] = None, **kwargs):
+        self.data.update(values or {}, **kwargs)
+        self.save()
+
+    def save(self):
+        """排程寫出目前的 data（呼叫端已直接修改 data 時使用）；快照於呼叫當下取得"""
+        snapshot = dict(self.data)
+        now = time.monotonic()
+        with self._cond:
+            if self._pending is None:
+                self._first_change = now
+            self._pending = snapshot
+            self._last_change = now
+            self._cond.notify()
+        self._ensure_thread()
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """立即寫出尚未寫入的變更並等待完成"""
+        with self._cond:
+            if self._pending is None:
+                return True
+            self._first_change = self._last_change = 0.0
+            self._cond.notify()
+            end = time.monotonic() + timeout
+            while self._pending is not None:
+                remaining = end - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self, timeout: float = 5.0) -> bool:
+        ok = self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        return ok
+
+    # ---- 背景寫入 ----
+    @staticmethod
+    def _serialize(data: Dict[str, Any]) -> str:
+        return json.dumps(data, ensure_ascii=False, indent=2)
+
+    def _ensure_thread(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="config-writer", daemon=True)
+            self._thread.start()
+
+    def _write(self, text: str):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        tmp = os.path.join(directory, f".{os.path.basename(self.path)}.{os.getpid()}.tmp")
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(text)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+            self._written = text
+            self.writes += 1
+            self.write_error = None
+        except OSError as e:
+            self.write_error = str(e)
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._closed:
+                    self._cond.wait()
+                if self._pending is None:
+                    return
+                # 等待安靜 delay 秒（最久 max_delay）再寫，連續的點擊合併為一次寫入
+                now = time.monotonic()
+                due = min(self._last_change + self.delay, self._first_change + self.max_delay)
+                if now < due and not self._closed:
+                    self._cond.wait(due - now)
+                    continue
+                snapshot = self._pending
+            text = self._serialize(snapshot)
+            if text == self._written:
+                self.skipped += 1
+            else:
+                self._write(text)
+            with self._cond:
+                if self._pending is snapshot:
+                    self._pending = None
+                self._cond.notify_all()
@@ -0,0 +1,75 @@
+"""
+console_logger.py - Headless logger with the GuiLogger interface.
+Purpose: Let the burn-in/fix flows and subprocess runner log without tkinter: every line goes to a stream (stdout by default) and to a per-process session file (logs/session_YYYYMMDD_HHMMSS_p<pid>.log), so several CLI instances can run side by side on one station without sharing a log file.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from typing import List, Optional, TextIO
+
+
+class ConsoleLogger:
+    """提供 log/debug/error/warning/success/record，與 GuiLogger 相同（tab_name 只作為輸出前綴）"""
+
+    def __init__(self, stream: Optional[TextIO] = None, log_dir: str = "logs", debug: bool = False, quiet: bool = False):
+        # quiet：只寫 session 檔，不輸出到 stream
+        self.stream = None if quiet else (stream if stream is not None else sys.stdout)
+        self.debug_enabled = debug
+        self.errors: List[str] = []  # 本次執行記錄的 ERROR 訊息（供結果摘要）
+        self._lock = threading.Lock()
+        os.makedirs(log_dir, exist_ok=True)
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
+        self.log_path = os.path.join(log_dir, f"session_{timestamp}_p{os.getpid()}.log")
+        self._fp = open(self.log_path, "a", encoding="utf-8", buffering=1)
+
+    def _timestamp(self):
+        return time.strftime("%H:%M:%S")
+
+    def _write(self, file_line: str, console_line: Optional[str]):
+        # 工作執行緒與主執行緒都會寫入：整行輸出，避免交錯
+        with self._lock:
+            try:
+                self._fp.write(file_line)
+            except Exception:
+                pass
+            if console_line is not None and self.stream is not None:
+                try:
+                    self.stream.write(console_line)
+                    self.stream.flush()
+                except Exception:
+                    pass
+
+    def log(self, message, *, level="INFO", tab_name: str = "all"):
+        ts = self._timestamp()
+        where = "" if tab_name == "all" else f"[{tab_name}] "
+        if level == "ERROR":
+            self.errors.append(str(message))
+        self._write(f"[{ts}] {level}: {message}\n", f"[{ts}] {level}: {where}{message}\n")
+
+    def record(self, event: str, **fields):
+        """結構化紀錄只寫入 session 檔（格式與 GuiLogger 相同）"""
+        payload = json.dumps(fields, ensure_ascii=False, default=str)
+        self._write(f"[{self._timestamp()}] RECORD: {event} {payload}\n", None)
+
+    def debug(self, message, tab_name: str = "all"):
+        if self.debug_enabled:
+            self.log(message, level="DEBUG", tab_name=tab_name)
+
+    def error(self, message, tab_name: str = "all"):
+        self.log(message, level="ERROR", tab_name=tab_name)
+
+    def warning(self, message, tab_name: str = "all"):
+        self.log(message, level="WARNING", tab_name=tab_name)
+
+    def success(self, message, tab_name: str = "all"):
+        self.log(message, level="SUCCESS", tab_name=tab_name)
+
+    def close(self):
+        with self._lock:
+            try:
+                self._fp.close()
+            except Exception:
+                pass
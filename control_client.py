@@ -0,0 +1,169 @@
+"""
+control_client.py - Minimal client for control_service.py.
+Purpose: Standard-library (urllib) client a line controller or test script can use to submit jobs to a station, poll their status, follow the Server-Sent Events log stream and cancel them; also usable from the command line.
+
+Usage:
+  python control_client.py [--url URL] [--token TOKEN] health
+  python control_client.py submit upgrade --firmware D:\\FW\\xxx.bin --serial MU310XXXX --follow
+  python control_client.py status upgrade-1 | cancel upgrade-1 | jobs
+"""
+
+import argparse
+import json
+import sys
+import urllib.error
+import urllib.request
+from typing import Callable, Iterator, Optional, Tuple
+
+DEFAULT_URL = "http://127.0.0.1:8765"
+
+
+class ControlError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(f"HTTP {status}: {message}")
+        self.status = status
+
+
+class ControlClient:
+    def __init__(self, url: str = DEFAULT_URL, token: Optional[str] = None, timeout: float = 10.0):
+        self.url = url.rstrip("/")
+        self.token = token
+        self.timeout = timeout
+
+    def _open(self, method: str, path: str, body: Optional[dict] = None, timeout: Optional[float] = None, headers: Optional[dict] = None):
+        data = json.dumps(body).encode("utf-8") if body is not None else None
+        req = urllib.request.Request(self.url + path, data=data, method=method)
+        if data is not None:
+            req.add_header("Content-Type", "application/json")
+        if self.token:
+            req.add_header("Authorization", f"Bearer {self.token}")
+        for k, v in (headers or {}).items():
+            req.add_header(k, v)
+        try:
+            return urllib.request.urlopen(req, timeout=timeout or self.timeout)
+        except urllib.error.HTTPError as e:
+            try:
+                message = json.loads(e.read().decode("utf-8")).get("error", e.reason)
+            except ValueError:
+                message = e.reason
+            raise ControlError(e.code, message) from None
+
+    def _json(self, method: str, path: str, body: Optional[dict] = None):
+        with self._open(method, path, body) as resp:
+            return json.loads(resp.read().decode("utf-8"))
+
+    def health(self) -> dict:
+        return self._json("GET", "/health")
+
+    def jobs(self) -> list:
+        return self._json("GET", "/jobs")
+
+    def submit(self, kind: str, **params) -> dict:
+        return self._json("POST", "/jobs", {"kind": kind, **params})
+
+    def status(self, job_id: str) -> dict:
+        return self._json("GET", f"/jobs/{job_id}")
+
+    def cancel(self, job_id: str) -> dict:
+        return self._json("POST", f"/jobs/{job_id}/cancel")
+
+    def log(self, job_id: str, since: int = 0) -> dict:
+        return self._json("GET", f"/jobs/{job_id}/log?since={since}")
+
+    def events(self, job_id: str, since: int = 0) -> Iterator[Tuple[str, dict]]:
+        """逐一產生 (event, data)；服務送出 end 後結束"""
+        # 伺服器每 15 秒送出 ping，讀取逾時需大於此間隔
+        with self._open("GET", f"/jobs/{job_id}/events?since={since}", timeout=max(self.timeout, 60.0)) as resp:
+            event, data = "message", []
+            for raw in resp:
+                line = raw.decode("utf-8").rstrip("\r\n")
+                if not line:
+                    if data:
+                        yield event, json.loads("\n".join(data))
+                        if event == "end":
+                            return
+                    event, data = "message", []
+                elif line.startswith(":"):
+                    continue
+                else:
+                    field, _, value = line.partition(":")
+                    value = value[1:] if value.startswith(" ") else value
+                    if field == "event":
+                        event = value
+                    elif field == "data":
+                        data.append(value)
+
+    def wait(self, job_id: str, on_log: Optional[Callable[[dict], None]] = None) -> dict:
+        """跟隨日誌直到工作結束，回傳最終狀態；串流中斷時從最後收到的序號續傳"""
+        since = 0
+        while True:
+            try:
+                for event, data in self.events(job_id, since):
+                    if event == "log":
+                        since = data["seq"]
+                        if on_log is not None:
+                            on_log(data)
+                    elif event == "end":
+                        return data
+            except (OSError, ValueError):
+                pass
+            status = self.status(job_id)
+            if status["state"] in ("succeeded", "failed", "cancelled"):
+                return status
+
+
+def _print_json(data):
+    print(json.dumps(data, ensure_ascii=False, indent=2))
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="control_client.py", description="MU310 station control client")
+    ap.add_argument("--url", default=DEFAULT_URL)
+    ap.add_argument("--token", default=None)
+    sub = ap.add_subparsers(dest="command", required=True)
+    sub.add_parser("health")
+    sub.add_parser("jobs")
+    p = sub.add_parser("submit")
+    p.add_argument("kind", choices=("env", "ports", "fix", "upgrade"))
+    p.add_argument("--firmware", default=None, help="firmware path on the station (upgrade)")
+    p.add_argument("--serial", default=None)
+    p.add_argument("--follow", action="store_true", help="stream the log and exit with the job's exit code")
+    for name in ("status", "cancel", "follow"):
+        sub.add_parser(name).add_argument("job_id")
+    args = ap.parse_args(argv)
+
+    client = ControlClient(args.url, args.token)
+    try:
+        if args.command == "health":
+            _print_json(client.health())
+        elif args.command == "jobs":
+            _print_json(client.jobs())
+        elif args.command == "status":
+            _print_json(client.status(args.job_id))
+        elif args.command == "cancel":
+            _print_json(client.cancel(args.job_id))
+        else:
+            if args.command == "submit":
+                params = {k: v for k, v in (("firmware", args.firmware), ("serial", args.serial)) if v is not None}
+                status = client.submit(args.kind, **params)
+                if not args.follow:
+                    _print_json(status)
+                    return 0
+                job_id = status["id"]
+            else:
+                job_id = args.job_id
+            final = client.wait(job_id, on_log=lambda e: print(f"[{e['ts']}] {e['level']}: {e['message']}", flush=True))
+            _print_json(final)
+            code = final.get("exit_code")
+            return code if isinstance(code, int) and 0 <= code < 256 else 1
+    except ControlError as e:
+        print(e, file=sys.stderr)
+        return 2
+    except OSError as e:
+        print(f"cannot reach {args.url}: {e}", file=sys.stderr)
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,460 @@
+"""
+control_service.py - Optional local HTTP/JSON control service.
+Purpose: Let a line controller (MES) drive a station without UI automation: an asyncio server on its own thread (127.0.0.1 by default, bind/port/token configurable) accepts jobs for the same flows as the GUI and cli.py (env check, COM port list, auto fix, upgrade), reports their state, streams their log lines as Server-Sent Events and cancels them. Log lines also go through the host logger (GuiLogger in the GUI, ConsoleLogger in `cli.py serve`), so the GUI panels and session file show remote jobs like local ones.
+
+Endpoints (JSON unless noted):
+  GET  /health
+  GET  /jobs                      recent jobs
+  POST /jobs                      {"kind": "upgrade", "firmware": "...", "serial": "..."} -> 202 status
+  GET  /jobs/<id>                 status
+  GET  /jobs/<id>/log?since=N     log lines after sequence N
+  GET  /jobs/<id>/events?since=N  text/event-stream: "log" / "state" events, "end" when the job is done
+  POST /jobs/<id>/cancel
+"""
+
+import argparse
+import asyncio
+import hmac
+import json
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Deque, Optional, Set
+from urllib.parse import parse_qs, urlsplit
+
+from job_state import Job
+from version import __version__
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+# 每個工作保留的日誌行數（SSE 重播 / since 查詢）
+LOG_LIMIT = 5000
+# 保留的工作數（超過時移除最舊的已完成工作）
+MAX_JOBS = 100
+MAX_BODY = 64 * 1024
+READ_TIMEOUT = 10.0
+PING_INTERVAL = 15.0
+
+# 工作種類 -> GUI 的工作名稱（狀態列、按鈕停用共用）
+JOB_NAMES = {"env": "adb", "ports": "ports", "fix": "fix", "upgrade": "upgrade"}
+
+_REASONS = {200: "OK", 202: "Accepted", 400: "Bad Request", 401: "Unauthorized", 404: "Not Found",
+            405: "Method Not Allowed", 409: "Conflict", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class HttpError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class JobLogger:
+    """轉送到主日誌（GUI 分頁 / session 檔），同時交給服務作為該工作的日誌串流"""
+
+    def __init__(self, base, publish: Callable[[str, str, str], None], tab_name: Optional[str] = None):
+        self.base = base
+        self._publish = publish
+        self.tab_name = tab_name  # 指定時取代流程的分頁名稱（cli.py serve 以工作 id 區分同時執行的工作）
+
+    @property
+    def debug_enabled(self) -> bool:
+        return bool(getattr(self.base, "debug_enabled", False))
+
+    def log(self, message, *, level="INFO", tab_name: str = "all"):
+        self.base.log(message, level=level, tab_name=self.tab_name or tab_name)
+        self._publish(level, tab_name, str(message))
+
+    def record(self, event: str, **fields):
+        self.base.record(event, **fields)
+
+    def debug(self, message, tab_name: str = "all"):
+        if self.debug_enabled:
+            self.log(message, level="DEBUG", tab_name=tab_name)
+
+    def error(self, message, tab_name: str = "all"):
+        self.log(message, level="ERROR", tab_name=tab_name)
+
+    def warning(self, message, tab_name: str = "all"):
+        self.log(message, level="WARNING", tab_name=tab_name)
+
+    def success(self, message, tab_name: str = "all"):
+        self.log(message, level="SUCCESS", tab_name=tab_name)
+
+
+class ServiceJob:
+    def __init__(self, job_id: str, kind: str, params: dict, job: Job):
+        self.id = job_id
+        self.kind = kind
+        self.params = params
+        self.job = job
+        self.submitted_at = time.time()
+        self.result: dict = {}
+        self.entries: Deque[dict] = deque(maxlen=LOG_LIMIT)
+        self.seq = 0
+        self.errors: Deque[str] = deque(maxlen=5)
+        self.subscribers: Set[asyncio.Queue] = set()
+        self.logger: Optional[JobLogger] = None
+
+    def status(self) -> dict:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "params": self.params,
+            "state": self.job.state,
+            "exit_code": self.job.exit_code,
+            "elapsed": round(self.job.elapsed, 2),
+            "submitted_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.submitted_at)),
+            "log_seq": self.seq,
+            "errors": list(self.errors),
+            "result": self.result,
+        }
+
+
+class ControlService:
+    """本機控制服務；asyncio 事件迴圈在獨立執行緒執行，工作在各自的工作執行緒執行
+
+    - on_job_change(service_job)：工作狀態改變時呼叫（工作執行緒或服務執行緒），GUI 以 after() 轉回 Tk 執行緒
+    - is_busy(job_name)：主程式是否已有同名工作執行中（GUI 的本機操作）
+    - job_tabs：日誌以工作 id 作為分頁名稱寫入主日誌（無 GUI 時區分同時執行的工作）
+    - board：dashboard.DeviceBoard，遠端燒錄工作同樣回報至裝置看板
+    """
+
+    def __init__(
+        self,
+        logger,
+        config: dict,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        token: Optional[str] = None,
+        on_job_change: Optional[Callable[[ServiceJob], None]] = None,
+        is_busy: Optional[Callable[[str], bool]] = None,
+        job_tabs: bool = False,
+        board=None,
+    ):
+        self.logger = logger
+        self.config = config
+        self.host = host
+        self.port = port
+        self.token = token or None
+        self.on_job_change = on_job_change
+        self.is_busy = is_busy
+        self.job_tabs = job_tabs
+        self.board = board
+        self.jobs: "OrderedDict[str, ServiceJob]" = OrderedDict()
+        self._counter = 0
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._error: Optional[BaseException] = None
+
+    # ---- 生命週期 ----
+    def start(self):
+        """開始監聽；綁定失敗時拋出 OSError。port=0 時實際埠號寫回 self.port"""
+        ready = threading.Event()
+        self._thread = threading.Thread(target=self._thread_main, args=(ready,), name="control-service", daemon=True)
+        self._thread.start()
+        ready.wait(5.0)
+        if self._error is not None:
+            raise OSError(f"cannot listen on {self.host}:{self.port}: {self._error}")
+        return self
+
+    def stop(self, timeout: float = 2.0):
+        loop = self._loop
+        if loop is not None:
+            try:
+                loop.call_soon_threadsafe(loop.stop)
+            except RuntimeError:
+                pass
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def _thread_main(self, ready: threading.Event):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            server = loop.run_until_complete(asyncio.start_server(self._handle, self.host, self.port))
+        except OSError as e:
+            self._error = e
+            ready.set()
+            loop.close()
+            return
+        self.port = server.sockets[0].getsockname()[1]
+        self._loop = loop
+        ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            self._loop = None
+            server.close()
+            tasks = [t for t in asyncio.all_tasks(loop) if not t.done()]
+            for t in tasks:
+                t.cancel()
+            loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            loop.run_until_complete(server.wait_closed())
+            loop.close()
+
+    def _call_in_loop(self, func, *args):
+        loop = self._loop
+        if loop is None:
+            return
+        try:
+            loop.call_soon_threadsafe(func, *args)
+        except RuntimeError:
+            # 服務已停止
+            pass
+
+    # ---- 工作 ----
+    def submit(self, kind: str, params: dict) -> ServiceJob:
+        """建立並啟動工作（可於任何執行緒呼叫）；參數錯誤拋出 HttpError(400)，忙碌拋出 HttpError(409)"""
+        import cli
+
+        if kind not in JOB_NAMES:
+            raise HttpError(400, f"unknown kind {kind!r} (expected one of {', '.join(JOB_NAMES)})")
+        name = JOB_NAMES[kind]
+        serial = params.get("serial")
+        if serial is not None and not isinstance(serial, str):
+            raise HttpError(400, "serial must be a string")
+        firmware = params.get("firmware")
+        if kind == "upgrade" and not (isinstance(firmware, str) and firmware):
+            raise HttpError(400, "upgrade requires \"firmware\" (path on the station)")
+        params = {"serial": serial, "firmware": firmware} if kind == "upgrade" else {}
+        with self._lock:
+            # 同一台裝置（或未指定序號）同一時間只能有一個同種工作
+            for other in self.jobs.values():
+                # 未指定序號時會使用唯一的一台裝置，與任何執行中的同種工作都可能是同一台
+                other_serial = other.params.get("serial")
+                if other.kind == kind and not other.job.done and (serial is None or other_serial is None or other_serial == serial):
+                    raise HttpError(409, f"{kind} job {other.id} is still running")
+            if self.is_busy is not None and self.is_busy(name):
+                raise HttpError(409, f"{name} is running on the station")
+            self._counter += 1
+            sj = ServiceJob(f"{kind}-{self._counter}", kind, params, None)
+            sj.job = Job(name, on_change=lambda job, sj=sj: self._on_change(sj))
+            sj.logger = JobLogger(
+                self.logger,
+                lambda level, tab, msg, sj=sj: self._publish_log(sj, level, tab, msg),
+                tab_name=sj.id if self.job_tabs else None,
+            )
+            self.jobs[sj.id] = sj
+            self._prune()
+        self.logger.record("service_submit", id=sj.id, kind=kind, **params)
+        args = argparse.Namespace(firmware=firmware, serial=serial, restart_server=False, board=self.board)
+        sj.job.start()
+        threading.Thread(target=self._run, args=(sj, cli.COMMANDS[kind][0], args), name=f"job-{sj.id}", daemon=True).start()
+        return sj
+
+    def _prune(self):
+        while len(self.jobs) > MAX_JOBS:
+            oldest = next((k for k, j in self.jobs.items() if j.job.done), None)
+            if oldest is None:
+                return
+            del self.jobs[oldest]
+
+    def _run(self, sj: ServiceJob, func, args):
+        # 與 cli.py 相同的指令函式：流程、設定對應與結束碼一致
+        try:
+            code, extra = func(args, self.config, sj.logger, sj.job)
+        except Exception as e:
+            sj.logger.error(f"{sj.kind} crashed: {e}")
+            code, extra = 1, {}
+        sj.result = extra
+        sj.job.finish(code)
+        self.logger.record("service_result", **sj.status())
+
+    def cancel(self, job_id: str) -> bool:
+        sj = self.jobs.get(job_id)
+        if sj is None:
+            raise HttpError(404, f"no job {job_id}")
+        ok = sj.job.cancel()
+        if ok:
+            sj.logger.warning(f"Cancel requested for {sj.id}")
+        return ok
+
+    def _on_change(self, sj: ServiceJob):
+        self._call_in_loop(self._publish_state, sj)
+        if self.on_job_change is not None:
+            try:
+                self.on_job_change(sj)
+            except Exception as e:
+                sj.logger.warning(f"Control service on_job_change failed: {e}")
+
+    # ---- 事件發布（於事件迴圈執行緒）----
+    def _publish_log(self, sj: ServiceJob, level: str, tab: str, message: str):
+        if level == "ERROR":
+            sj.errors.append(message)
+        self._call_in_loop(self._append_entry, sj, {"ts": time.strftime("%H:%M:%S"), "level": level, "tab": tab, "message": message})
+
+    def _append_entry(self, sj: ServiceJob, entry: dict):
+        sj.seq += 1
+        entry["seq"] = sj.seq
+        sj.entries.append(entry)
+        for q in sj.subscribers:
+            q.put_nowait(("log", entry))
+
+    def _publish_state(self, sj: ServiceJob):
+        status = sj.status()
+        for q in sj.subscribers:
+            q.put_nowait(("state", status))
+            if sj.job.done:
+                q.put_nowait(("end", status))
+
+    # ---- HTTP ----
+    async def _read_request(self, reader):
+        line = await reader.readline()
+        if not line:
+            raise ConnectionError("closed")
+        try:
+            method, target, _ = line.decode("latin-1").split(" ", 2)
+        except ValueError:
+            raise HttpError(400, "malformed request line")
+        headers = {}
+        while True:
+            h = await reader.readline()
+            if h in (b"\r\n", b"\n", b""):
+                break
+            key, _, value = h.decode("latin-1").partition(":")
+            headers[key.strip().lower()] = value.strip()
+        length = int(headers.get("content-length") or 0)
+        if length > MAX_BODY:
+            raise HttpError(413, "request body too large")
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), target, headers, body
+
+    @staticmethod
+    def _send(writer, status: int, payload, extra_headers: str = ""):
+        data = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+        writer.write(
+            f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\nContent-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(data)}\r\nConnection: close\r\n{extra_headers}\r\n".encode("latin-1") + data
+        )
+
+    def _authorized(self, headers: dict) -> bool:
+        if not self.token:
+            return True
+        return hmac.compare_digest(headers.get("authorization", ""), f"Bearer {self.token}")
+
+    async def _handle(self, reader, writer):
+        try:
+            try:
+                method, target, headers, body = await asyncio.wait_for(self._read_request(reader), READ_TIMEOUT)
+            except (asyncio.TimeoutError, ConnectionError, asyncio.IncompleteReadError, ValueError):
+                return
+            except HttpError as e:
+                self._send(writer, e.status, {"error": str(e)})
+                return
+            url = urlsplit(target)
+            query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            parts = [p for p in url.path.split("/") if p]
+            try:
+                if not self._authorized(headers):
+                    raise HttpError(401, "missing or invalid token")
+                if len(parts) == 3 and parts[0] == "jobs" and parts[2] == "events" and method == "GET":
+                    await self._stream(writer, self._job(parts[1]), self._since(query, headers))
+                    return
+                status, payload = self._route(method, parts, query, body)
+            except HttpError as e:
+                status, payload = e.status, {"error": str(e)}
+            except Exception as e:
+                status, payload = 500, {"error": f"{type(e).__name__}: {e}"}
+            self._send(writer, status, payload)
+        finally:
+            try:
+                await writer.drain()
+                writer.close()
+            except (ConnectionError, RuntimeError):
+                pass
+
+    def _job(self, job_id: str) -> ServiceJob:
+        sj = self.jobs.get(job_id)
+        if sj is None:
+            raise HttpError(404, f"no job {job_id}")
+        return sj
+
+    @staticmethod
+    def _since(query: dict, headers: dict) -> int:
+        try:
+            return int(headers.get("last-event-id") or query.get("since") or 0)
+        except ValueError:
+            raise HttpError(400, "since must be an integer")
+
+    def _route(self, method: str, parts: list, query: dict, body: bytes):
+        if parts == ["health"] and method == "GET":
+            running = sum(1 for j in self.jobs.values() if not j.job.done)
+            return 200, {"ok": True, "version": __version__, "jobs": len(self.jobs), "running": running}
+        if parts == ["jobs"]:
+            if method == "GET":
+                return 200, [sj.status() for sj in self.jobs.values()]
+            if method == "POST":
+                try:
+                    req = json.loads(body.decode("utf-8") or "{}")
+                except ValueError as e:
+                    raise HttpError(400, f"invalid JSON: {e}")
+                if not isinstance(req, dict):
+                    raise HttpError(400, "request body must be an object")
+                return 202, self.submit(str(req.get("kind", "")), req).status()
+            raise HttpError(405, "use GET or POST")
+        if len(parts) >= 2 and parts[0] == "jobs":
+            sj = self._job(parts[1])
+            if len(parts) == 2 and method == "GET":
+                return 200, sj.status()
+            if parts[2:] == ["cancel"] and method == "POST":
+                return 200, {"cancelled": self.cancel(sj.id), **sj.status()}
+            if parts[2:] == ["log"] and method == "GET":
+                since = self._since(query, {})
+                return 200, {"state": sj.job.state, "lines": [e for e in sj.entries if e["seq"] > since]}
+        raise HttpError(404, "not found")
+
+    async def _stream(self, writer, sj: ServiceJob, since: int):
+        """SSE：先重播 since 之後的日誌，再即時轉送；工作結束送出 end 後關閉"""
+
+        def _event(kind: str, payload, event_id: Optional[int] = None):
+            head = f"id: {event_id}\n" if event_id is not None else ""
+            writer.write(f"{head}event: {kind}\ndata: {json.dumps(payload, ensure_ascii=False, default=str)}\n\n".encode("utf-8"))
+
+        writer.write(
+            b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream; charset=utf-8\r\n"
+            b"Cache-Control: no-cache\r\nConnection: close\r\n\r\n"
+        )
+        queue: asyncio.Queue = asyncio.Queue()
+        # 重播與訂閱在同一個事件迴圈步驟內完成，不會漏掉或重複
+        for entry in list(sj.entries):
+            if entry["seq"] > since:
+                _event("log", entry, entry["seq"])
+        _event("state", sj.status())
+        if sj.job.done:
+            _event("end", sj.status())
+            return
+        sj.subscribers.add(queue)
+        try:
+            await writer.drain()
+            while True:
+                try:
+                    kind, payload = await asyncio.wait_for(queue.get(), PING_INTERVAL)
+                except asyncio.TimeoutError:
+                    writer.write(b": ping\n\n")
+                    await writer.drain()
+                    continue
+                _event(kind, payload, payload.get("seq") if kind == "log" else None)
+                await writer.drain()
+                if kind == "end":
+                    return
+        except ConnectionError:
+            pass
+        finally:
+            sj.subscribers.discard(queue)
+
+
+def service_from_config(logger, config: dict, **kwargs) -> ControlService:
+    """依 config.json 的 control_service_host / control_service_port / control_service_token 建立服務"""
+    return ControlService(
+        logger,
+        config,
+        host=str(config.get("control_service_host", DEFAULT_HOST)),
+        port=int(config.get("control_service_port", DEFAULT_PORT)),
+        token=config.get("control_service_token") or None,
+        **kwargs,
+    )
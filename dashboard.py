@@ -0,0 +1,300 @@
+"""
+dashboard.py - Multi-device dashboard: per-unit state model and tile view.
+Purpose: Keep one record per connected DUT (online, current step, push progress, elapsed time, last error, firmware version), updated from any thread by the flows and the device watcher, and render it as one compact Canvas tile per unit that refreshes at a bounded rate and only redraws tiles whose state changed, so 32+ units cost a few item updates per tick instead of per-line Text rendering.
+"""
+
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import tkinter as tk
+import tkinter.font as tkfont
+from tkinter import ttk
+
+from job_state import CANCELLED, FAILED, RUNNING, SUCCEEDED, format_elapsed
+
+IDLE = "idle"
+REFRESH_MS = 250
+TILE_W = 240
+TILE_H = 96
+PAD = 8
+
+_FILL = {IDLE: "#F4F4F4", RUNNING: "#E6F0FF", SUCCEEDED: "#E3F5E3", FAILED: "#FCE4E4", CANCELLED: "#F5EEDB"}
+_BAR = {RUNNING: "#3B7DDD", SUCCEEDED: "#3E9B4F", FAILED: "#C94040", CANCELLED: "#B08A2E"}
+
+
+class UnitState:
+    __slots__ = ("serial", "online", "kind", "state", "code", "step", "progress", "started", "finished", "error", "version", "rev")
+
+    def __init__(self, serial: str):
+        self.serial = serial
+        self.online = False
+        self.kind: Optional[str] = None
+        self.state = IDLE
+        self.code: Optional[int] = None
+        self.step = ""
+        self.progress: Optional[float] = None  # 0~100；None 為不顯示進度列
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.error = ""
+        self.version: Optional[str] = None
+        self.rev = 0  # 每次變更遞增，畫面以此判斷是否需要重繪
+
+    @property
+    def elapsed(self) -> float:
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.monotonic()) - self.started
+
+    def copy(self) -> "UnitState":
+        other = UnitState(self.serial)
+        for name in self.__slots__:
+            setattr(other, name, getattr(self, name))
+        return other
+
+
+class DeviceBoard:
+    """所有裝置的狀態表；各方法可於任何執行緒呼叫（畫面定時讀取 snapshot）"""
+
+    def __init__(self):
+        self._units: Dict[str, UnitState] = {}
+        self._lock = threading.Lock()
+        self.version = 0
+
+    def _unit(self, serial: str) -> UnitState:
+        unit = self._units.get(serial)
+        if unit is None:
+            unit = self._units[serial] = UnitState(serial)
+        return unit
+
+    def _touch(self, unit: UnitState):
+        unit.rev += 1
+        self.version += 1
+
+    def set_online(self, serials: Optional[Iterable[str]]):
+        """adb 目前在線的裝置（None 為 adb 無法使用）；離線且從未執行工作的裝置自畫面移除"""
+        online = set(serials or ())
+        with self._lock:
+            for serial in online:
+                unit = self._unit(serial)
+                if not unit.online:
+                    unit.online = True
+                    self._touch(unit)
+            for serial, unit in list(self._units.items()):
+                if serial in online or not unit.online:
+                    continue
+                if unit.state == IDLE:
+                    del self._units[serial]
+                    self.version += 1
+                else:
+                    # 燒錄中重啟的裝置保留，顯示為離線
+                    unit.online = False
+                    self._touch(unit)
+
+    def begin(self, serial: str, kind: str):
+        with self._lock:
+            unit = self._unit(serial)
+            unit.kind = kind
+            unit.state = RUNNING
+            unit.code = None
+            unit.step = ""
+            unit.progress = None
+            unit.error = ""
+            unit.started = time.monotonic()
+            unit.finished = None
+            self._touch(unit)
+
+    def update(self, serial: str, step: Optional[str] = None, progress: Optional[float] = None,
+               error: Optional[str] = None, version: Optional[str] = None):
+        """更新步驟 / 進度 / 錯誤 / 版本；切換步驟時清除進度列"""
+        with self._lock:
+            unit = self._unit(serial)
+            changed = False
+            if step is not None and step != unit.step:
+                unit.step = step
+                unit.progress = None
+                changed = True
+            if progress is not None:
+                # 進度只在整數百分比改變時視為變更
+                if unit.progress is None or int(progress) != int(unit.progress):
+                    changed = True
+                unit.progress = progress
+            if error is not None and error != unit.error:
+                unit.error = error
+                changed = True
+            if version is not None and version != unit.version:
+                unit.version = version
+                changed = True
+            if changed:
+                self._touch(unit)
+
+    def finish(self, serial: str, code: int, cancelled: bool = False):
+        with self._lock:
+            unit = self._unit(serial)
+            unit.state = CANCELLED if cancelled else (SUCCEEDED if code == 0 else FAILED)
+            unit.code = code
+            unit.finished = time.monotonic()
+            if unit.started is None:
+                unit.started = unit.finished
+            self._touch(unit)
+
+    def clear_finished(self):
+        """移除已完成且離線的裝置，在線的裝置回到待機"""
+        with self._lock:
+            for serial, unit in list(self._units.items()):
+                if unit.state == RUNNING:
+                    continue
+                if not unit.online:
+                    del self._units[serial]
+                else:
+                    unit.state, unit.step, unit.progress, unit.error = IDLE, "", None, ""
+                    unit.started = unit.finished = None
+                    self._touch(unit)
+            self.version += 1
+
+    def snapshot(self) -> Tuple[int, List[UnitState]]:
+        with self._lock:
+            return self.version, [self._units[s].copy() for s in sorted(self._units)]
+
+
+class DashboardView:
+    """以 Canvas 繪製每台裝置一個方塊；每 REFRESH_MS 讀取一次狀態表，只更新內容有變的方塊"""
+
+    def __init__(self, parent, board: DeviceBoard, i18n):
+        self.board = board
+        self.i18n = i18n
+        self.frame = ttk.Frame(parent)
+        bar = ttk.Frame(self.frame)
+        bar.pack(fill=tk.X, padx=10, pady=(10, 4))
+        self.summary_var = tk.StringVar()
+        ttk.Label(bar, textvariable=self.summary_var).pack(side=tk.LEFT)
+        self.btn_clear = ttk.Button(bar, command=self.board.clear_finished)
+        self.btn_clear.pack(side=tk.RIGHT)
+
+        body = ttk.Frame(self.frame)
+        body.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
+        self.canvas = tk.Canvas(body, highlightthickness=0, background="#FFFFFF")
+        ybar = ttk.Scrollbar(body, orient=tk.VERTICAL, command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=ybar.set)
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        ybar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.font = tkfont.Font(family="Segoe UI", size=9)
+        self.bold = tkfont.Font(family="Segoe UI", size=10, weight="bold")
+        # 步驟 / 錯誤文字依平均字寬截斷，不逐次量測
+        self._max_chars = max(8, (TILE_W - 20) // max(1, self.font.measure("0")))
+
+        self._tiles: Dict[str, dict] = {}  # serial -> {"items": {...}, "key": 上次繪製的內容}
+        self._order: List[str] = []
+        self._cols = 0
+        self._version = -1
+        self._lang = None
+        self.canvas.bind("<Configure>", self._on_configure)
+        self.frame.after(REFRESH_MS, self._tick)
+
+    # ---- 版面 ----
+    def _on_configure(self, event):
+        cols = max(1, (event.width - PAD) // (TILE_W + PAD))
+        if cols != self._cols:
+            self._cols = cols
+            self._relayout()
+
+    def _origin(self, index: int) -> Tuple[int, int]:
+        cols = max(1, self._cols)
+        row, col = divmod(index, cols)
+        return PAD + col * (TILE_W + PAD), PAD + row * (TILE_H + PAD)
+
+    def _relayout(self):
+        self.canvas.delete("all")
+        self._tiles.clear()
+        for i, serial in enumerate(self._order):
+            self._tiles[serial] = {"items": self._create_tile(*self._origin(i)), "key": None}
+        rows = (len(self._order) + max(1, self._cols) - 1) // max(1, self._cols)
+        self.canvas.configure(scrollregion=(0, 0, self._cols * (TILE_W + PAD) + PAD, rows * (TILE_H + PAD) + PAD))
+        if not self._order:
+            self.canvas.create_text(PAD * 2, PAD * 2, anchor="nw", text=self.i18n.t("dash.empty"), fill="#888888", font=self.font, tags=("empty",))
+        self._version = -1
+
+    def _create_tile(self, x: int, y: int) -> dict:
+        c = self.canvas
+        return {
+            "bg": c.create_rectangle(x, y, x + TILE_W, y + TILE_H, outline="#C8C8C8", fill=_FILL[IDLE]),
+            "serial": c.create_text(x + 10, y + 8, anchor="nw", font=self.bold),
+            "state": c.create_text(x + TILE_W - 10, y + 9, anchor="ne", font=self.font),
+            "step": c.create_text(x + 10, y + 30, anchor="nw", font=self.font),
+            "track": c.create_rectangle(x + 10, y + 52, x + TILE_W - 10, y + 60, outline="", fill="#DDDDDD", state="hidden"),
+            "bar": c.create_rectangle(x + 10, y + 52, x + 10, y + 60, outline="", fill=_BAR[RUNNING], state="hidden"),
+            "error": c.create_text(x + 10, y + 70, anchor="nw", font=self.font, fill="#C0392B"),
+            "x": x,
+        }
+
+    # ---- 繪製 ----
+    def _clip(self, text: str) -> str:
+        return text if len(text) <= self._max_chars else text[: self._max_chars - 1] + "…"
+
+    def _state_text(self, unit: UnitState) -> str:
+        if unit.state == IDLE:
+            text = self.i18n.t("common.idle")
+        else:
+            text = self.i18n.t(f"job.{unit.state}", elapsed=format_elapsed(unit.elapsed), code=unit.code)
+        return text if unit.online else f"{text} · {self.i18n.t('dash.offline')}"
+
+    def _draw(self, tile: dict, unit: UnitState):
+        c = self.canvas
+        items = tile["items"]
+        c.itemconfigure(items["bg"], fill=_FILL.get(unit.state, _FILL[IDLE]), dash=() if unit.online else (4, 3))
+        title = unit.serial if not unit.kind else f"{unit.serial}  [{unit.kind}]"
+        c.itemconfigure(items["serial"], text=self._clip(title), fill="#222222" if unit.online else "#888888")
+        c.itemconfigure(items["state"], text=self._state_text(unit))
+        step = unit.step or (unit.version and f"FW {unit.version}") or ""
+        c.itemconfigure(items["step"], text=self._clip(step))
+        if unit.progress is None:
+            c.itemconfigure(items["track"], state="hidden")
+            c.itemconfigure(items["bar"], state="hidden")
+        else:
+            x = items["x"]
+            x0, y0, _, y1 = c.coords(items["track"])
+            width = (TILE_W - 20) * max(0.0, min(100.0, unit.progress)) / 100
+            c.coords(items["bar"], x0, y0, x + 10 + width, y1)
+            c.itemconfigure(items["bar"], fill=_BAR.get(unit.state, _BAR[RUNNING]), state="normal")
+            c.itemconfigure(items["track"], state="normal")
+        c.itemconfigure(items["error"], text=self._clip(unit.error))
+
+    def _tick(self):
+        if not self.frame.winfo_exists():
+            return
+        try:
+            # 分頁不可見時不繪製，切回時一次補上
+            if self.frame.winfo_ismapped():
+                self._refresh()
+        finally:
+            self.frame.after(REFRESH_MS, self._tick)
+
+    def _refresh(self):
+        lang = self.i18n.lang
+        version, units = self.board.snapshot()
+        running = [u for u in units if u.state == RUNNING]
+        if version == self._version and lang == self._lang and not running:
+            return
+        order = [u.serial for u in units]
+        if order != self._order:
+            self._order = order
+            self._relayout()
+        if lang != self._lang:
+            self._lang = lang
+            self.btn_clear.configure(text=self.i18n.t("dash.clear"))
+            for tile in self._tiles.values():
+                tile["key"] = None
+        for unit in units:
+            tile = self._tiles[unit.serial]
+            # 執行中的方塊經過秒數改變時才重繪
+            key = (unit.rev, int(unit.elapsed) if unit.state == RUNNING else None)
+            if key != tile["key"]:
+                tile["key"] = key
+                self._draw(tile, unit)
+        self._version = version
+        counts = {s: sum(1 for u in units if u.state == s) for s in (RUNNING, SUCCEEDED, FAILED)}
+        self.summary_var.set(self.i18n.t(
+            "dash.summary",
+            online=sum(1 for u in units if u.online), running=counts[RUNNING], ok=counts[SUCCEEDED], failed=counts[FAILED],
+        ))
@@ -0,0 +1,280 @@
+"""
+device_monitor.py - Post-flash reboot monitor.
+Purpose: Follow a DUT through its FOTA reboot by watching adb track-devices for the drop-off and re-enumeration of that serial (COM port changes are only logged), then confirm the firmware version over the same serial's AT channel, so the station knows the moment the upgrade has really finished instead of waiting a fixed 4 minutes.
+"""
+
+import threading
+import time
+from typing import Callable, List, Optional, Set, Tuple
+
+import adb_client
+from adb_client import AdbError, DeviceTracker
+from at_transport import AtError
+
+VERSION_CMD = "AT+QGMR"
+
+
+def com_port_snapshot() -> Optional[Set[str]]:
+    """目前 COM 埠名稱集合；未安裝 pyserial 時回傳 None"""
+    try:
+        from fix_usbcfg import candidate_ports
+    except ImportError:
+        return None
+    try:
+        return {p.device for p in candidate_ports()}
+    except Exception:
+        return None
+
+
+def _set_channel_services(serial: str, action: str):
+    """對佔用 AT 通道的服務執行 systemctl stop / start"""
+    from at_session import CHANNEL_SERVICES
+
+    try:
+        adb_client.shell("; ".join(f"systemctl {action} {svc}" for svc in CHANNEL_SERVICES), serial=serial, timeout=15)
+    except AdbError:
+        pass
+
+
+def query_module_version(serial: str, deadline_s: float = 30.0, stop_services: bool = True) -> Optional[str]:
+    """經由該序號裝置的 adb shell AT 通道（/dev/smd7）查詢韌體版本（AT+QGMR）
+
+    不掃描 COM 埠：一站多台時 COM 埠無法對應到序號，可能讀到其他模組的版本。
+    重啟後佔用通道的服務會再次啟動：stop_services 時每次嘗試前先停止（開機中的服務可能較晚才啟動），
+    查詢結束後重新啟動，讓模組回到開機後的狀態。重啟後 AT 通道可能較晚就緒，故於期限內重試。
+    """
+    from at_session import open_adb_channel
+
+    end = time.monotonic() + deadline_s
+    try:
+        while True:
+            if stop_services:
+                _set_channel_services(serial, "stop")
+            try:
+                with open_adb_channel(serial, reopen=False) as at:
+                    resp = at.command(VERSION_CMD, timeout=2.0)
+                if resp.ok and resp.lines:
+                    return resp.lines[0]
+            except AtError:
+                pass
+            if time.monotonic() >= end:
+                return None
+            time.sleep(2)
+    finally:
+        if stop_services:
+            _set_channel_services(serial, "start")
+
+
+def wait_for_device(
+    max_wait: float = 90.0,
+    initial_interval: float = 0.5,
+    max_interval: float = 5.0,
+    factor: float = 2.0,
+    serial: Optional[str] = None,
+    on_poll: Optional[Callable[[int, float], None]] = None,
+    stop: Optional[threading.Event] = None,
+) -> Tuple[Optional[str], float]:
+    """以指數退避輪詢 adb 裝置，出現即回傳 (序號, 等待秒數)；逾時或 stop 被設定時回傳 (None, 秒數)
+
+    輪詢間隔由 initial_interval 起每次乘以 factor，最大為 max_interval；max_wait 為總等待上限。
+    """
+    t0 = time.monotonic()
+    interval = initial_interval
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            online = [s for s, st in adb_client.list_devices() if st == "device"]
+        except AdbError:
+            online = []
+        elapsed = time.monotonic() - t0
+        if on_poll is not None:
+            on_poll(attempt, elapsed)
+        if serial is not None and serial in online:
+            return serial, elapsed
+        if serial is None and online:
+            return online[0], elapsed
+        remaining = max_wait - elapsed
+        if remaining <= 0:
+            return None, elapsed
+        if stop is not None:
+            if stop.wait(min(interval, remaining)):
+                return None, time.monotonic() - t0
+        else:
+            time.sleep(min(interval, remaining))
+        interval = min(interval * factor, max_interval)
+
+
+class DeviceWatcher:
+    """背景以 track-devices 追蹤已連線（device 狀態）的序號清單，清單改變時呼叫 on_change(serials)
+
+    不主動啟動 adb server；server 不在或連線中斷時 on_change(None)，並每 retry_interval 秒重試。
+    """
+
+    def __init__(self, on_change: Callable[[Optional[List[str]]], None], retry_interval: float = 5.0):
+        self.on_change = on_change
+        self.retry_interval = retry_interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last: Optional[List[str]] = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="device-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _emit(self, serials: Optional[List[str]]):
+        if serials != self._last:
+            self._last = serials
+            self.on_change(serials)
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                with DeviceTracker() as tracker:
+                    while not self._stop.is_set():
+                        snapshot = tracker.poll(timeout=1.0)
+                        if snapshot is not None:
+                            self._emit([s for s, st in snapshot if st == "device"])
+            except (AdbError, OSError):
+                self._emit(None)
+            self._stop.wait(self.retry_interval)
+
+
+class MonitorResult:
+    def __init__(self):
+        self.ok = False
+        self.phase = "wait_drop"
+        self.drop_s: Optional[float] = None
+        self.back_s: Optional[float] = None
+        self.version: Optional[str] = None
+        self.message = ""
+
+
+class RebootMonitor:
+    """等待裝置離線 → 重新列舉 → 確認版本；裝置一回來即確認版本
+
+    - 只有 adb 清單顯示本序號離線或消失才算開始重啟；COM 埠無法對應到序號，增減只記錄
+    - version_probe(serial) 讀到與 previous_version 相同的版本時判定失敗；讀不到版本只記錄警告
+    """
+
+    def __init__(
+        self,
+        serial: str,
+        logger,
+        tab_name: str = "upgrade",
+        drop_timeout: float = 120.0,
+        return_timeout: float = 600.0,
+        version_probe: Optional[Callable[[str], Optional[str]]] = query_module_version,
+        previous_version: Optional[str] = None,
+        com_poll_interval: float = 1.0,
+        stop: Optional[threading.Event] = None,
+    ):
+        self.serial = serial
+        self.logger = logger
+        self.tab_name = tab_name
+        self.drop_timeout = drop_timeout
+        self.return_timeout = return_timeout
+        self.version_probe = version_probe
+        self.previous_version = previous_version
+        self.com_poll_interval = com_poll_interval
+        self.stop = stop
+        self._tracker: Optional[DeviceTracker] = None
+
+    def _log(self, msg: str):
+        self.logger.log(msg, tab_name=self.tab_name)
+
+    def _open_tracker(self):
+        try:
+            self._tracker = DeviceTracker()
+        except AdbError as e:
+            self.logger.debug(f"track-devices unavailable, polling instead: {e}", tab_name=self.tab_name)
+            self._tracker = None
+
+    def _next_snapshot(self, wait: float) -> Optional[List[Tuple[str, str]]]:
+        """取得下一份裝置清單；track-devices 斷線時改為輪詢"""
+        if self._tracker is None:
+            self._open_tracker()
+        if self._tracker is not None:
+            try:
+                return self._tracker.poll(timeout=wait)
+            except AdbError:
+                self._tracker.close()
+                self._tracker = None
+        time.sleep(wait)
+        try:
+            return adb_client.list_devices()
+        except AdbError:
+            return None
+
+    def _online(self, snapshot: List[Tuple[str, str]]) -> bool:
+        return any(s == self.serial and st == "device" for s, st in snapshot)
+
+    def run(self) -> MonitorResult:
+        res = MonitorResult()
+        t0 = time.monotonic()
+        t_drop = None
+        coms = com_port_snapshot()
+        next_com = t0 + self.com_poll_interval
+        self._log(f"[4.6] Waiting for {self.serial} to reboot into the new firmware...")
+        try:
+            while True:
+                now = time.monotonic()
+                if self.stop is not None and self.stop.is_set():
+                    res.message = "monitoring cancelled (the module may still be flashing)"
+                    return res
+                if res.phase == "wait_drop" and now - t0 > self.drop_timeout:
+                    res.message = f"device did not restart within {self.drop_timeout:g}s (FOTA not started?)"
+                    return res
+                if res.phase == "wait_return" and now - t_drop > self.return_timeout:
+                    res.message = f"device did not come back within {self.return_timeout:g}s after dropping off"
+                    return res
+
+                snap = self._next_snapshot(0.5)
+                now = time.monotonic()
+                if snap is not None:
+                    online = self._online(snap)
+                    if res.phase == "wait_drop" and not online:
+                        t_drop = now
+                        res.drop_s = now - t0
+                        res.phase = "wait_return"
+                        self._log(f"Device dropped off after {res.drop_s:.1f}s, flashing...")
+                    elif res.phase == "wait_return" and online:
+                        res.back_s = now - t0
+                        res.phase = "verify"
+                        self._log(f"Device re-enumerated after {res.back_s:.1f}s")
+                        break
+
+                if coms is not None and now >= next_com:
+                    next_com = now + self.com_poll_interval
+                    current = com_port_snapshot()
+                    if current is not None and current != coms:
+                        removed, added = sorted(coms - current), sorted(current - coms)
+                        if removed:
+                            self._log(f"COM ports removed: {', '.join(removed)}")
+                        if added:
+                            self._log(f"COM ports added: {', '.join(added)}")
+                        # 一站多台時無法判斷是哪台模組的埠，不作為重啟依據
+                        coms = current
+        finally:
+            if self._tracker is not None:
+                self._tracker.close()
+                self._tracker = None
+
+        res.phase = "done"
+        if self.version_probe is not None:
+            res.version = self.version_probe(self.serial)
+            if not res.version:
+                self.logger.warning("Device is back but firmware version could not be read", tab_name=self.tab_name)
+            else:
+                self._log(f"Firmware version: {res.version}")
+                if self.previous_version and res.version == self.previous_version:
+                    res.message = f"firmware version unchanged ({res.version}) after reboot"
+                    return res
+        res.ok = True
+        res.message = f"upgrade finished in {res.back_s:.1f}s"
+        return res
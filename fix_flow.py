@@ -0,0 +1,141 @@
+"""
+fix_flow.py - ADB connection auto-fix flow (Python port of auto_fix_adb_ENG.bat).
+Purpose: Check ADB, run the usbcfg fix in-process (fix_usbcfg.run_fix on the worker thread, output to GuiLogger) when no device is present, then wait for the module to come back with exponential-backoff polling instead of a fixed 90 s timeout, recording the real reboot time per unit.
+"""
+
+import threading
+from typing import Callable, Optional
+
+import adb_client
+from adb_client import AdbError
+from device_monitor import wait_for_device
+
+
+class AutoFixFlow:
+    """自動修復流程，步驟與 auto_fix_adb_ENG.bat 一致"""
+
+    def __init__(
+        self,
+        logger,
+        tab_name: str = "fix",
+        max_wait: float = 90.0,
+        initial_interval: float = 0.5,
+        max_interval: float = 5.0,
+    ):
+        self.logger = logger
+        self.tab_name = tab_name
+        self.max_wait = max_wait
+        self.initial_interval = initial_interval
+        self.max_interval = max_interval
+        self.cancel_event = threading.Event()
+
+    def cancel(self):
+        """要求取消：於步驟之間及等待重啟時生效"""
+        self.cancel_event.set()
+
+    def _cancelled(self) -> bool:
+        if self.cancel_event.is_set():
+            self.logger.error("Auto fix cancelled", tab_name=self.tab_name)
+            return True
+        return False
+
+    def _log(self, msg: str):
+        self.logger.log(msg, tab_name=self.tab_name)
+
+    def _devices(self):
+        try:
+            devices = [s for s, st in adb_client.list_devices() if st == "device"]
+        except AdbError as e:
+            self.logger.error(f"adb devices failed: {e}", tab_name=self.tab_name)
+            devices = []
+        self._log(f"=== ADB devices: {len(devices)} ===")
+        for s in devices:
+            self._log(f"- {s}")
+        return devices
+
+    def _fix_log(self, message: str, level: str = "INFO"):
+        if level == "DEBUG":
+            self.logger.debug(message, tab_name=self.tab_name)
+        else:
+            self.logger.log(message, level=level, tab_name=self.tab_name)
+
+    def _run_fix(self) -> int:
+        """直接呼叫 fix_usbcfg.run_fix（不再另啟 Python 程序，打包版也不需系統 Python）"""
+        try:
+            import fix_usbcfg
+        except ImportError as e:
+            self.logger.error(f"pyserial is not available: {e}", tab_name=self.tab_name)
+            return -1
+        return fix_usbcfg.run_fix(log=self._fix_log)
+
+    def run(self) -> int:
+        self._log("[STEP 1] Checking ADB device connection...")
+        if not adb_client.ensure_server():
+            self.logger.error("Cannot connect to ADB server", tab_name=self.tab_name)
+            return 1
+        if self._devices():
+            self.logger.success("ADB is connected, no fix needed.", tab_name=self.tab_name)
+            return 0
+
+        self._log("No ADB device detected. Attempting to fix...")
+        if self._cancelled():
+            return 1
+        self._log("[STEP 2] Sending AT command to set USB mode...")
+        if self._run_fix() != 0:
+            self.logger.error("Failed to send AT command. Cannot proceed with fix.", tab_name=self.tab_name)
+            return 1
+
+        self._log(f"AT command sent successfully. Waiting up to {self.max_wait:g} seconds for reboot...")
+        serial, seconds = wait_for_device(
+            max_wait=self.max_wait,
+            initial_interval=self.initial_interval,
+            max_interval=self.max_interval,
+            on_poll=lambda n, el: self.logger.debug(f"poll #{n} at {el:.1f}s", tab_name=self.tab_name),
+            stop=self.cancel_event,
+        )
+        if self._cancelled():
+            return 1
+
+        self._log("[STEP 3] Rechecking ADB device connection...")
+        self.logger.record("fix_reboot", serial=serial, ok=serial is not None, seconds=round(seconds, 1))
+        if serial is None:
+            self._devices()
+            self.logger.error("ADB still not connected after fix. Please check the device manually.", tab_name=self.tab_name)
+            return 1
+        self._devices()
+        self.logger.success(f"ADB connection restored successfully! ({serial}, reboot took {seconds:.1f}s)", tab_name=self.tab_name)
+        return 0
+
+
+def options_from_config(config: dict) -> dict:
+    """config.json 中的修復設定轉為 AutoFixFlow 參數（GUI 與 CLI 共用）"""
+    # 重啟等待為指數退避輪詢，裝置一出現即結束；fix_reconnect_max_wait 為上限
+    return dict(
+        max_wait=float(config.get("fix_reconnect_max_wait", 90)),
+        initial_interval=float(config.get("fix_reconnect_initial_interval", 0.5)),
+        max_interval=float(config.get("fix_reconnect_max_interval", 5)),
+    )
+
+
+def run_auto_fix(
+    logger,
+    tab_name: str = "fix",
+    on_complete: Optional[Callable[[int], None]] = None,
+    **kwargs,
+) -> AutoFixFlow:
+    """於背景執行緒執行自動修復，完成後以結束碼呼叫 on_complete；回傳流程物件（可 cancel()）"""
+    flow = AutoFixFlow(logger, tab_name=tab_name, **kwargs)
+
+    def _worker():
+        try:
+            code = flow.run()
+        except Exception as e:
+            logger.error(f"Auto fix crashed: {e}", tab_name=tab_name)
+            code = -1
+        logger.log(f"[EXIT] code={code}", tab_name=tab_name)
+        if on_complete:
+            on_complete(code)
+
+    t = threading.Thread(target=_worker, daemon=True)
+    t.start()
+    return flow
@@ -1,57 +1,212 @@
-import serial
-import serial.tools.list_ports
+import json
+import os
+import re
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from at_transport import AtTransport
+from utils_paths import get_data_path
 
 TARGET_QCFG = '0x2c7c,0x0801,2,1,1,0,0,1,0'
 
-def is_at_port(port):
+# 單一埠探測期限（秒）；實機模組通常 50 ms 內回 OK
+PROBE_DEADLINE = 0.8
+PROBE_MAX_WORKERS = 16
+
+# 額外的序列埠路徑（例如模擬器的 pty），以 os.pathsep 分隔
+EXTRA_PORTS_ENV = 'MU310_EXTRA_PORTS'
+
+# 上次成功的 AT 埠特徵（VID:PID、USB 位置、介面編號）
+FINGERPRINT_FILENAME = 'at_port_cache.json'
+
+
+class PathPort:
+    """只有路徑的序列埠（欄位與 ListPortInfo 相容）"""
+    def __init__(self, device):
+        self.device = device
+        self.name = os.path.basename(device)
+        self.description = 'virtual'
+        self.hwid = 'n/a'
+        self.vid = None
+        self.pid = None
+        self.serial_number = None
+        self.location = None
+        self.interface = None
+
+
+def candidate_ports():
+    # list_ports 載入較慢，第一次列舉時才匯入（多半在背景執行緒）
+    import serial.tools.list_ports
+
+    ports = list(serial.tools.list_ports.comports())
+    for dev in os.environ.get(EXTRA_PORTS_ENV, '').split(os.pathsep):
+        if dev.strip():
+            ports.append(PathPort(dev.strip()))
+    return ports
+
+def _interface_number(port):
+    """USB 介面編號：Windows/Linux 的 location 皆以 ":x.N" / ":1.N" 結尾"""
+    m = re.search(r':[^:]*\.(\d+)$', getattr(port, 'location', None) or '')
+    return int(m.group(1)) if m else None
+
+
+def port_fingerprint(port):
+    vid, pid = getattr(port, 'vid', None), getattr(port, 'pid', None)
+    return {
+        'vid_pid': f"{vid:04X}:{pid:04X}" if vid is not None and pid is not None else None,
+        'location': getattr(port, 'location', None),
+        'interface': _interface_number(port),
+        'device': port.device,
+    }
+
+
+def load_fingerprint(path=None):
     try:
-        ser = serial.Serial(port.device, 115200, timeout=1)
-        ser.write(b'AT\r\n')
-        time.sleep(0.3)
-        resp = ser.read_all().decode(errors='ignore')
-        ser.close()
-        return 'OK' in resp
-    except:
-        return False
+        with open(path or get_data_path(FINGERPRINT_FILENAME), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else None
+    except Exception:
+        return None
+
+
+def save_fingerprint(port, path=None):
+    path = path or get_data_path(FINGERPRINT_FILENAME)
+    fp = port_fingerprint(port)
+    if load_fingerprint(path) == fp:
+        return
+    # 暫存檔名含 pid 與執行緒，多個修正流程 / CLI 同時寫入時不會互相覆蓋暫存檔
+    directory = os.path.dirname(os.path.abspath(path))
+    tmp = os.path.join(directory, f'.{os.path.basename(path)}.{os.getpid()}.{threading.get_ident()}.tmp')
+    try:
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(fp, f, indent=1)
+        os.replace(tmp, path)
+    except OSError:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+
+
+def match_fingerprint(ports, fp):
+    """找出符合特徵的埠：優先比對 VID:PID + USB 位置 + 介面（COM 編號可能改變），無 USB 資訊時比對路徑"""
+    if not fp:
+        return None
+    for p in ports:
+        cur = port_fingerprint(p)
+        if fp.get('vid_pid') and cur['vid_pid'] == fp['vid_pid'] \
+                and cur['location'] == fp.get('location') and cur['interface'] == fp.get('interface'):
+            return p
+    for p in ports:
+        if not fp.get('vid_pid') and p.device == fp.get('device'):
+            return p
+    return None
 
-def fix_usbcfg(port):
+
+class ProbeResult:
+    def __init__(self, port, ok, seconds, detail=''):
+        self.port = port
+        self.ok = ok
+        self.seconds = seconds
+        self.detail = detail
+
+
+def probe_port(port, deadline=PROBE_DEADLINE):
+    """送出 AT 並讀到結果碼或期限為止（不再固定 sleep）"""
+    t0 = time.monotonic()
+    try:
+        with AtTransport.open(port.device, write_timeout=deadline) as at:
+            resp = at.command('AT', timeout=deadline)
+        detail = resp.final or (' '.join(resp.lines) or 'no answer')
+        return ProbeResult(port, resp.ok, time.monotonic() - t0, detail)
+    except Exception as e:
+        return ProbeResult(port, False, time.monotonic() - t0, str(e))
+
+
+def is_at_port(port, deadline=PROBE_DEADLINE):
+    return probe_port(port, deadline).ok
+
+
+def find_at_port(ports=None, deadline=PROBE_DEADLINE, max_workers=PROBE_MAX_WORKERS, use_cache=True):
+    """先試上次成功的埠，未命中再平行探測其餘候選埠；回傳 (port 或 None, 已完成的 ProbeResult 清單)"""
+    ports = candidate_ports() if ports is None else list(ports)
+    results = []
+    if not ports:
+        return None, results
+    if use_cache:
+        cached = match_fingerprint(ports, load_fingerprint())
+        if cached is not None:
+            res = probe_port(cached, deadline)
+            res.detail += ' (cached)'
+            results.append(res)
+            if res.ok:
+                return cached, results
+            ports = [p for p in ports if p is not cached]
+            if not ports:
+                return None, results
+    pool = ThreadPoolExecutor(max_workers=min(max_workers, len(ports)), thread_name_prefix='at-probe')
+    try:
+        futures = [pool.submit(probe_port, p, deadline) for p in ports]
+        for fut in as_completed(futures):
+            res = fut.result()
+            results.append(res)
+            if res.ok:
+                if use_cache:
+                    save_fingerprint(res.port)
+                return res.port, results
+        return None, results
+    finally:
+        # 勝出後不等其他埠（尚未開始的直接取消，進行中的在期限內自行結束）
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _print_log(message, level='INFO'):
+    print(message)
+
+
+def print_probe_report(results, log=_print_log):
+    for r in sorted(results, key=lambda r: r.seconds):
+        log(f"[PROBE] {r.port.device}: {r.seconds * 1000:.0f} ms {r.detail}")
+
+def fix_usbcfg(port, log=_print_log):
+    """檢查並修正 usbcfg；設定成功或原本即正確時回傳 True。log(message, level) 預設為 print"""
     try:
-        print(f"[INFO] 嘗試連接 AT PORT: {port.device}")
-        ser = serial.Serial(port.device, 115200, timeout=1)
-        ser.write(b'AT+QCFG="usbcfg"\r\n')
-        time.sleep(0.5)
-        resp = ser.read_all().decode(errors='ignore')
-        print(f"[INFO] 目前設定為: {resp.strip()}")
-
-        if TARGET_QCFG not in resp:
-            cmd = f'AT+QCFG="usbcfg",{TARGET_QCFG}\r\n'
-            print("[INFO] 設定 usbcfg 中...")
-            ser.write(cmd.encode())
-            time.sleep(1)
-            result = ser.read_all().decode(errors='ignore')
-            print(f"[回應] {result.strip()}")
-
-            if 'OK' in result:
-                print("[INFO] 設定成功，DUT MU310 執行重啟...")
-                ser.write(b'AT+CFUN=1,1\r\n')
-            else:
-                print("[錯誤] 設定失敗，請手動檢查DUT。")
-        else:
-            print("[INFO] usbcfg 設定正確，無需變更。")
-
-        ser.close()
+        log(f"[INFO] 嘗試連接 AT PORT: {port.device}")
+        with AtTransport.open(port.device) as at:
+            resp = at.command('AT+QCFG="usbcfg"', timeout=2)
+            log(f"[INFO] 目前設定為: {resp.text} {resp.final or 'TIMEOUT'} ({resp.seconds * 1000:.0f} ms)")
+
+            if TARGET_QCFG not in resp.text:
+                log("[INFO] 設定 usbcfg 中...")
+                result = at.command(f'AT+QCFG="usbcfg",{TARGET_QCFG}', timeout=5)
+                log(f"[回應] {result.final or 'TIMEOUT'} ({result.seconds * 1000:.0f} ms)")
+
+                if result.ok:
+                    log("[INFO] 設定成功，DUT MU310 執行重啟...", 'SUCCESS')
+                    # 模組可能在回 OK 前就重啟，結果不影響流程
+                    at.command('AT+CFUN=1,1', timeout=1)
+                    return True
+                log("[錯誤] 設定失敗，請手動檢查DUT。", 'ERROR')
+                return False
+            log("[INFO] usbcfg 設定正確，無需變更。", 'SUCCESS')
+            return True
 
     except Exception as e:
-        print(f"[錯誤] 無法操作 {port.device}，錯誤：{e}")
+        log(f"[錯誤] 無法操作 {port.device}，錯誤：{e}", 'ERROR')
+        return False
+
+def run_fix(log=_print_log):
+    """找出 AT 埠並修正 usbcfg；回傳結束碼（0 成功，1 失敗），可於 GUI 執行緒外直接呼叫"""
+    port, results = find_at_port()
+    print_probe_report(results, log)
+    if port is None:
+        log("[錯誤] 找不到任何可回應的 AT PORT。", 'ERROR')
+        return 1
+    return 0 if fix_usbcfg(port, log) else 1
 
 if __name__ == "__main__":
-    ports = list(serial.tools.list_ports.comports())
-    for port in ports:
-        if is_at_port(port):
-            fix_usbcfg(port)
-            break
-    else:
-        print("[錯誤] 找不到任何可回應的 AT PORT。")
+    import sys
+    sys.exit(run_fix())
 
 #這個 AT 指令意思是：模組功能開關重啟 (reset and full functionality)
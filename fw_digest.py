@@ -0,0 +1,203 @@
+"""
+fw_digest.py - Firmware digest service.
+Purpose: Hash firmware images with mmap on a background worker and keep the results in a small on-disk store keyed by (absolute path, size, mtime_ns), so a digest can be prefetched as soon as a file is selected and reused across retries and launches.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Optional, Tuple
+
+from utils_paths import get_data_path
+
+DEFAULT_ALGO = "md5"
+# 每次交給 hashlib 的區塊（hashlib 對大區塊會釋放 GIL，不影響 Tk 執行緒）
+HASH_BLOCK = 8 * 1024 * 1024
+CACHE_FILENAME = "fw_digest_cache.json"
+CACHE_MAX_ENTRIES = 64
+
+# 遠端對應的 shell 指令
+REMOTE_TOOLS = {
+    "md5": "md5sum",
+    "sha256": "sha256sum",
+}
+
+FileKey = Tuple[str, int, int, str]
+
+
+def _file_key(path: str, algo: str) -> FileKey:
+    st = os.stat(path)
+    return (os.path.abspath(path), st.st_size, st.st_mtime_ns, algo)
+
+
+def compute_digest(path: str, algo: str = DEFAULT_ALGO) -> str:
+    """直接計算檔案雜湊（不使用快取）；以 mmap 分段餵給 hashlib，避免額外複製"""
+    h = hashlib.new(algo)
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return h.hexdigest()
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            # 無法 mmap（例如網路磁碟）時退回大區塊讀取
+            while True:
+                block = f.read(HASH_BLOCK)
+                if not block:
+                    break
+                h.update(block)
+            return h.hexdigest()
+        with mm:
+            view = memoryview(mm)
+            try:
+                for off in range(0, size, HASH_BLOCK):
+                    h.update(view[off:off + HASH_BLOCK])
+            finally:
+                view.release()
+    return h.hexdigest()
+
+
+class DigestStore:
+    """磁碟上的雜湊快取（JSON），size/mtime_ns 不符即視為失效"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or get_data_path(CACHE_FILENAME)
+        self._entries: Optional[Dict[str, dict]] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _name(key: FileKey) -> str:
+        return f"{key[3]}|{key[0]}"
+
+    def _load(self) -> Dict[str, dict]:
+        if self._entries is None:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                self._entries = data if isinstance(data, dict) else {}
+            except Exception:
+                self._entries = {}
+        return self._entries
+
+    def get(self, key: FileKey) -> Optional[str]:
+        with self._lock:
+            item = self._load().get(self._name(key))
+        if item and item.get("size") == key[1] and item.get("mtime_ns") == key[2]:
+            return item.get("digest")
+        return None
+
+    def put(self, key: FileKey, digest: str):
+        with self._lock:
+            entries = self._load()
+            entries.pop(self._name(key), None)
+            entries[self._name(key)] = {"size": key[1], "mtime_ns": key[2], "digest": digest}
+            # 只保留最近的幾筆（dict 保持插入順序）
+            while len(entries) > CACHE_MAX_ENTRIES:
+                entries.pop(next(iter(entries)))
+            snapshot = json.dumps(entries, ensure_ascii=False, indent=1)
+        # 暫存檔名含 pid 與執行緒，多個 CLI / GUI 同時寫入時不會互相覆蓋暫存檔
+        directory = os.path.dirname(os.path.abspath(self.path))
+        tmp = os.path.join(directory, f".{os.path.basename(self.path)}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(snapshot)
+            os.replace(tmp, self.path)
+        except OSError:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+
+
+class DigestService:
+    """背景雜湊服務：同一檔案同時只計算一次，結果寫入記憶體與磁碟快取"""
+
+    def __init__(self, store: Optional[DigestStore] = None):
+        self.store = store or DigestStore()
+        self._memory: Dict[FileKey, str] = {}
+        self._pending: Dict[FileKey, Future] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="fw-digest")
+        return self._executor
+
+    def cached(self, path: str, algo: str = DEFAULT_ALGO) -> Optional[str]:
+        """僅查快取（記憶體 → 磁碟），不觸發計算"""
+        try:
+            key = _file_key(path, algo)
+        except OSError:
+            return None
+        with self._lock:
+            hit = self._memory.get(key)
+        if hit:
+            return hit
+        hit = self.store.get(key)
+        if hit:
+            with self._lock:
+                self._memory[key] = hit
+        return hit
+
+    def _compute(self, key: FileKey) -> str:
+        try:
+            digest = compute_digest(key[0], key[3])
+            with self._lock:
+                self._memory[key] = digest
+            self.store.put(key, digest)
+            return digest
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+
+    def prefetch(self, path: str, algo: str = DEFAULT_ALGO, on_done: Optional[Callable[[str], None]] = None) -> Future:
+        """排入背景計算並回傳 Future；已快取時回傳已完成的 Future"""
+        key = _file_key(path, algo)
+        hit = self.cached(path, algo)
+        if hit:
+            fut: Future = Future()
+            fut.set_result(hit)
+        else:
+            with self._lock:
+                fut = self._pending.get(key)
+                if fut is None:
+                    fut = self._pool().submit(self._compute, key)
+                    self._pending[key] = fut
+        if on_done is not None:
+            def _cb(f: Future):
+                if f.exception() is None:
+                    on_done(f.result())
+            fut.add_done_callback(_cb)
+        return fut
+
+    def get(self, path: str, algo: str = DEFAULT_ALGO) -> str:
+        """取得雜湊；若背景正在計算則等待其完成"""
+        return self.prefetch(path, algo).result()
+
+
+service = DigestService()
+
+
+def prefetch(path: str, algo: str = DEFAULT_ALGO, on_done: Optional[Callable[[str], None]] = None) -> Future:
+    return service.prefetch(path, algo, on_done)
+
+
+def cached_digest(path: str, algo: str = DEFAULT_ALGO) -> Optional[str]:
+    return service.cached(path, algo)
+
+
+def get_digest(path: str, algo: str = DEFAULT_ALGO) -> str:
+    return service.get(path, algo)
+
+
+def parse_remote_digest(output: str) -> Optional[str]:
+    """解析 md5sum/sha256sum 輸出的第一欄"""
+    for line in output.splitlines():
+        parts = line.strip().split()
+        if parts and all(c in "0123456789abcdefABCDEF" for c in parts[0]) and len(parts[0]) in (32, 64):
+            return parts[0].lower()
+    return None
@@ -0,0 +1,231 @@
+"""
+fw_validate.py - Pre-flight structural validation of firmware packages.
+Purpose: Check that the selected firmware (.bin, pushed as update.zip) is a complete zip by reading only the end-of-central-directory record and the central directory (seek, no full read), with an optional streamed CRC pass on a background thread.
+"""
+
+import os
+import struct
+import threading
+import time
+import zipfile
+from typing import Callable, Iterable, List, Optional
+
+EOCD_SIG = b"PK\x05\x06"
+ZIP64_LOCATOR_SIG = b"PK\x06\x07"
+ZIP64_EOCD_SIG = b"PK\x06\x06"
+CD_SIG = b"PK\x01\x02"
+LOCAL_SIG = b"PK\x03\x04"
+EOCD_SIZE = 22
+EOCD_MAX_COMMENT = 0xFFFF
+LOCAL_HEADER_SIZE = 30
+SUPPORTED_METHODS = (0, 8)  # stored / deflated
+CRC_READ_SIZE = 1024 * 1024
+
+
+class ZipEntry:
+    def __init__(self, name: str, method: int, flags: int, crc: int, comp_size: int, size: int, offset: int):
+        self.name = name
+        self.method = method
+        self.flags = flags
+        self.crc = crc
+        self.comp_size = comp_size
+        self.size = size
+        self.offset = offset
+
+
+class ValidationResult:
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: List[ZipEntry] = []
+        self.errors: List[str] = []
+        self.warnings: List[str] = []
+        self.seconds = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+    def summary(self) -> str:
+        total = sum(e.size for e in self.entries)
+        return f"{len(self.entries)} entries, {total / (1024 * 1024):.1f} MB uncompressed, checked in {self.seconds * 1000:.1f} ms"
+
+
+def _find_eocd(f, file_size: int) -> Optional[int]:
+    """從檔尾往前找 EOCD（最多 22 + 65535 位元組註解）"""
+    span = min(file_size, EOCD_SIZE + EOCD_MAX_COMMENT)
+    f.seek(file_size - span)
+    tail = f.read(span)
+    pos = tail.rfind(EOCD_SIG)
+    while pos != -1:
+        if pos + EOCD_SIZE <= len(tail):
+            comment_len = struct.unpack("<H", tail[pos + 20:pos + 22])[0]
+            # 註解長度必須剛好延伸到檔尾，否則是資料中的偽簽章
+            if pos + EOCD_SIZE + comment_len == len(tail):
+                return file_size - span + pos
+        pos = tail.rfind(EOCD_SIG, 0, pos)
+    return None
+
+
+def _read_zip64_eocd(f, eocd_pos: int):
+    """回傳 (entries, cd_size, cd_offset)；無 zip64 紀錄時回傳 None"""
+    if eocd_pos < 20:
+        return None
+    f.seek(eocd_pos - 20)
+    loc = f.read(20)
+    if loc[:4] != ZIP64_LOCATOR_SIG:
+        return None
+    z64_offset = struct.unpack("<Q", loc[8:16])[0]
+    f.seek(z64_offset)
+    rec = f.read(56)
+    if len(rec) < 56 or rec[:4] != ZIP64_EOCD_SIG:
+        return None
+    entries, cd_size, cd_offset = struct.unpack("<QQQ", rec[32:56])
+    return entries, cd_size, cd_offset
+
+
+def _zip64_extra(extra: bytes, comp_size: int, size: int, offset: int):
+    """解析 zip64 extra field（0x0001），僅替換為 0xFFFFFFFF 的欄位"""
+    i = 0
+    while i + 4 <= len(extra):
+        hid, hlen = struct.unpack("<HH", extra[i:i + 4])
+        body = extra[i + 4:i + 4 + hlen]
+        if hid == 0x0001:
+            vals = []
+            for j in range(0, len(body) - 7, 8):
+                vals.append(struct.unpack("<Q", body[j:j + 8])[0])
+            if size == 0xFFFFFFFF and vals:
+                size = vals.pop(0)
+            if comp_size == 0xFFFFFFFF and vals:
+                comp_size = vals.pop(0)
+            if offset == 0xFFFFFFFF and vals:
+                offset = vals.pop(0)
+            break
+        i += 4 + hlen
+    return comp_size, size, offset
+
+
+def validate_structure(
+    path: str,
+    expected_members: Iterable[str] = (),
+    check_local_headers: bool = True,
+) -> ValidationResult:
+    """快速結構檢查：EOCD、central directory、CRC 中繼資料、必要成員、local header 位置"""
+    res = ValidationResult(path)
+    t0 = time.perf_counter()
+    try:
+        file_size = os.path.getsize(path)
+        with open(path, "rb") as f:
+            if file_size < EOCD_SIZE:
+                res.errors.append(f"file too small for a zip ({file_size} bytes)")
+                return res
+            eocd_pos = _find_eocd(f, file_size)
+            if eocd_pos is None:
+                res.errors.append("end-of-central-directory not found (truncated or not a zip)")
+                return res
+            f.seek(eocd_pos)
+            eocd = f.read(EOCD_SIZE)
+            disk_no, cd_disk, n_disk, n_total, cd_size, cd_offset, _ = struct.unpack("<4s4H2LH", eocd)[1:]
+            if disk_no != 0 or cd_disk != 0 or n_disk != n_total:
+                res.errors.append("multi-disk zip is not supported")
+                return res
+            if n_total == 0xFFFF or cd_size == 0xFFFFFFFF or cd_offset == 0xFFFFFFFF:
+                z64 = _read_zip64_eocd(f, eocd_pos)
+                if z64 is None:
+                    res.errors.append("zip64 end-of-central-directory missing")
+                    return res
+                n_total, cd_size, cd_offset = z64
+            cd_limit = eocd_pos
+            if cd_offset + cd_size > cd_limit:
+                res.errors.append(f"central directory out of range (offset {cd_offset} + size {cd_size} > {cd_limit}), file truncated?")
+                return res
+
+            f.seek(cd_offset)
+            cd = f.read(cd_size)
+            pos = 0
+            while pos + 46 <= len(cd) and cd[pos:pos + 4] == CD_SIG:
+                (flags, method, crc, comp_size, size, name_len, extra_len, comment_len, offset) = struct.unpack(
+                    "<HH4xLLLHHH8xL", cd[pos + 8:pos + 46]
+                )
+                name = cd[pos + 46:pos + 46 + name_len].decode("utf-8" if flags & 0x800 else "cp437", errors="replace")
+                extra = cd[pos + 46 + name_len:pos + 46 + name_len + extra_len]
+                comp_size, size, offset = _zip64_extra(extra, comp_size, size, offset)
+                res.entries.append(ZipEntry(name, method, flags, crc, comp_size, size, offset))
+                pos += 46 + name_len + extra_len + comment_len
+
+            if len(res.entries) != n_total:
+                res.errors.append(f"central directory lists {len(res.entries)} entries, EOCD says {n_total}")
+
+            for e in res.entries:
+                if e.name.endswith("/"):
+                    continue
+                # CRC-32 為 0 也是合法值，不作為缺少中繼資料的依據（完整檢查見 verify_crc）
+                if e.method not in SUPPORTED_METHODS:
+                    res.warnings.append(f"{e.name}: compression method {e.method}")
+                if e.flags & 0x1:
+                    res.warnings.append(f"{e.name}: encrypted entry")
+                header_len = LOCAL_HEADER_SIZE
+                if check_local_headers:
+                    f.seek(e.offset)
+                    local = f.read(LOCAL_HEADER_SIZE)
+                    if len(local) < LOCAL_HEADER_SIZE or local[:4] != LOCAL_SIG:
+                        res.errors.append(f"{e.name}: bad local header at offset {e.offset}")
+                        continue
+                    # local header 的檔名與 extra 長度可能與 central directory 不同，資料起點以 local header 為準
+                    name_len, extra_len = struct.unpack("<HH", local[26:30])
+                    header_len += name_len + extra_len
+                if e.offset + header_len + e.comp_size > cd_offset:
+                    res.errors.append(f"{e.name}: data extends past central directory (truncated?)")
+
+            names = {e.name for e in res.entries}
+            for member in expected_members:
+                if member and member not in names:
+                    res.errors.append(f"expected member missing: {member}")
+            if not res.entries:
+                res.errors.append("zip has no entries")
+    except OSError as e:
+        res.errors.append(f"cannot read firmware: {e}")
+    finally:
+        res.seconds = time.perf_counter() - t0
+    return res
+
+
+def verify_crc(path: str, progress: Optional[Callable[[int, int], None]] = None) -> List[str]:
+    """完整串流解壓並比對每個成員的 CRC-32，回傳錯誤清單（空清單表示通過）"""
+    errors: List[str] = []
+    try:
+        with zipfile.ZipFile(path) as zf:
+            infos = [i for i in zf.infolist() if not i.is_dir()]
+            total = sum(i.file_size for i in infos)
+            done = 0
+            for info in infos:
+                try:
+                    with zf.open(info) as src:
+                        while True:
+                            block = src.read(CRC_READ_SIZE)
+                            if not block:
+                                break
+                            done += len(block)
+                            if progress is not None:
+                                progress(done, total)
+                except (zipfile.BadZipFile, OSError, EOFError, NotImplementedError) as e:
+                    errors.append(f"{info.filename}: {e}")
+    except (zipfile.BadZipFile, OSError) as e:
+        errors.append(str(e))
+    return errors
+
+
+def verify_crc_async(
+    path: str,
+    on_done: Callable[[List[str], float], None],
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> threading.Thread:
+    """於背景執行緒執行完整 CRC 檢查，完成後以 (錯誤清單, 秒數) 呼叫 on_done"""
+
+    def _worker():
+        t0 = time.perf_counter()
+        errors = verify_crc(path, progress)
+        on_done(errors, time.perf_counter() - t0)
+
+    t = threading.Thread(target=_worker, daemon=True)
+    t.start()
+    return t
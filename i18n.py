@@ -30,6 +30,7 @@ EN: Dict[str, str] = {
     "tab.adb": "ADB Tools",
     "tab.fix": "Connection Fix",
     "tab.upgrade": "Firmware Upgrade",
+    "tab.dashboard": "Devices",
     "tab.dm_check": "DM Port Check",
     "tab.help": "Help",
 
@@ -61,6 +62,7 @@ EN: Dict[str, str] = {
     "upg.target": "Target path:",
     "upg.at": "AT channel:",
     "upg.start": "Start Upgrade",
+    "upg.push_progress": "{pct}%  {sent}/{total} MB  {rate}  ETA {eta}",
 
     # Logs toolbar
     "logs.save": "Save",
@@ -74,6 +76,25 @@ EN: Dict[str, str] = {
     "status.dmport": "DM PORT: {dm}",
     "status.version": "Version: {ver}",
 
+    # Job states
+    "job.queued": "Queued",
+    "job.running": "Running {elapsed}",
+    "job.succeeded": "Done ({elapsed})",
+    "job.failed": "Failed, code {code} ({elapsed})",
+    "job.cancelled": "Cancelled ({elapsed})",
+    "job.busy": "{job} is still running",
+
+    # Device dashboard
+    "dash.summary": "Online: {online}   Running: {running}   Passed: {ok}   Failed: {failed}",
+    "dash.empty": "No devices. Connect a module or start an upgrade.",
+    "dash.offline": "offline",
+    "dash.clear": "Clear finished",
+
+    # Diagnostics
+    "diag.title": "Diagnostics - UI stalls",
+    "diag.stats": "Heartbeats: {beats}   Stalls: {stalls}   Max lag: {max} ms   p99 lag: {p99} ms   Threshold: {threshold} ms",
+    "diag.no_stack": "The stall ended before the main thread stack could be sampled.",
+
     # Help
     "help.title": "Usage Guide",
     "help.text": (
@@ -127,6 +148,7 @@ ZH: Dict[str, str] = {
     "tab.adb": "ADB 工具",
     "tab.fix": "連線修復",
     "tab.upgrade": "韌體升級",
+    "tab.dashboard": "裝置看板",
     "tab.dm_check": "DM 埠檢查",
     "tab.help": "說明",
 
@@ -158,6 +180,7 @@ ZH: Dict[str, str] = {
     "upg.target": "目標路徑:",
     "upg.at": "AT 通道:",
     "upg.start": "開始升級",
+    "upg.push_progress": "{pct}%  {sent}/{total} MB  {rate}  剩餘 {eta}",
 
     # Logs toolbar
     "logs.save": "儲存",
@@ -171,6 +194,25 @@ ZH: Dict[str, str] = {
     "status.dmport": "DM 埠: {dm}",
     "status.version": "版本: {ver}",
 
+    # 工作狀態
+    "job.queued": "排隊中",
+    "job.running": "執行中 {elapsed}",
+    "job.succeeded": "完成 ({elapsed})",
+    "job.failed": "失敗，代碼 {code} ({elapsed})",
+    "job.cancelled": "已取消 ({elapsed})",
+    "job.busy": "{job} 仍在執行中",
+
+    # 裝置看板
+    "dash.summary": "在線: {online}   執行中: {running}   通過: {ok}   失敗: {failed}",
+    "dash.empty": "沒有裝置。請連接模組或開始升級。",
+    "dash.offline": "離線",
+    "dash.clear": "清除已完成",
+
+    # 診斷
+    "diag.title": "診斷 - 介面停頓",
+    "diag.stats": "心跳: {beats}   停頓: {stalls}   最大延遲: {max} ms   p99 延遲: {p99} ms   門檻: {threshold} ms",
+    "diag.no_stack": "停頓在取樣主執行緒堆疊前就已結束。",
+
     # Help
     "help.title": "使用說明",
     "help.text": (
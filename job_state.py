@@ -0,0 +1,106 @@
+"""
+job_state.py - Job state model for long-running GUI operations.
+Purpose: Track one background job (BAT run, auto fix, firmware upgrade) through queued/running/succeeded/failed/cancelled with start/finish times, elapsed time and exit code, and notify the GUI on every transition so labels, buttons and the status bar follow the real process completion.
+"""
+
+import time
+from typing import Callable, Optional
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINAL_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+
+def format_elapsed(seconds: float) -> str:
+    seconds = int(max(0, seconds))
+    h, rem = divmod(seconds, 3600)
+    m, s = divmod(rem, 60)
+    return f"{h}:{m:02d}:{s:02d}" if h else f"{m:02d}:{s:02d}"
+
+
+class Job:
+    """單一背景工作的狀態
+
+    狀態轉換與 on_change 回呼都應在 Tk 主執行緒執行：工作執行緒的 on_complete 以 after() 轉回後再呼叫 finish()。
+    """
+
+    def __init__(self, name: str, on_change: Optional[Callable[["Job"], None]] = None):
+        self.name = name
+        self.on_change = on_change
+        self.state = QUEUED
+        self.exit_code: Optional[int] = None
+        self.created_at = time.monotonic()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.cancel_requested = False
+        self._canceller: Optional[Callable[[], None]] = None
+
+    @property
+    def done(self) -> bool:
+        return self.state in FINAL_STATES
+
+    @property
+    def running(self) -> bool:
+        return self.state == RUNNING
+
+    @property
+    def elapsed(self) -> float:
+        """執行時間（秒）；尚未開始為 0，執行中持續增加"""
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+    def _notify(self):
+        if self.on_change is not None:
+            self.on_change(self)
+
+    def start(self, canceller: Optional[Callable[[], None]] = None):
+        if self.state != QUEUED:
+            return
+        self.state = RUNNING
+        self.started_at = time.monotonic()
+        self._canceller = canceller
+        self._notify()
+
+    def set_canceller(self, canceller: Optional[Callable[[], None]]):
+        """工作啟動後才取得的取消方式（例如子程序的 terminate）"""
+        self._canceller = canceller
+
+    def finish(self, exit_code: int):
+        """以結束碼完成：0 為成功，其餘為失敗；已要求取消者記為 cancelled"""
+        if self.done:
+            return
+        self.exit_code = exit_code
+        self.finished_at = time.monotonic()
+        if self.started_at is None:
+            self.started_at = self.finished_at
+        if self.cancel_requested:
+            self.state = CANCELLED
+        else:
+            self.state = SUCCEEDED if exit_code == 0 else FAILED
+        self._notify()
+
+    def cancel(self) -> bool:
+        """要求取消；排隊中的工作直接取消，執行中的工作呼叫 canceller 並等待 finish()"""
+        if self.done:
+            return False
+        self.cancel_requested = True
+        if self.state == QUEUED:
+            self.state = CANCELLED
+            self.finished_at = time.monotonic()
+            self._notify()
+            return True
+        if self._canceller is None:
+            return False
+        try:
+            self._canceller()
+        except Exception:
+            return False
+        return True
+
+    def __repr__(self):
+        return f"Job({self.name!r}, {self.state}, code={self.exit_code}, {format_elapsed(self.elapsed)})"
@@ -0,0 +1,316 @@
+"""
+keywords_editor.py - Keyword color editor window.
+Purpose: Toplevel editor for keywords.txt (keyword=#RRGGBB per line) with search highlighting and shortcuts; saving reloads the colors into the GUI logger. Imported on first use from the Settings tab.
+"""
+
+import os
+import tkinter as tk
+from tkinter import ttk, messagebox
+
+from utils_paths import get_resource_path
+
+
+class KeywordsEditor:
+    def __init__(self, parent):
+        self.parent = parent
+        self.i18n = parent.i18n  # 從父視窗取得 i18n 實例
+        self.window = tk.Toplevel(parent)
+        self.window.title(self.i18n.t("keywords.window_title"))
+        self.window.geometry("800x700")  # 增加視窗大小，確保按鈕不被擋住
+        self.window.resizable(True, True)
+        
+        # 設定最小視窗大小，確保按鈕可見
+        self.window.minsize(700, 600)
+        
+        # 設定視窗置中
+        self.window.transient(parent)
+        self.window.grab_set()
+        
+        # 確保視窗不會被主視窗擋住
+        self.window.update_idletasks()
+        x = parent.winfo_x() + (parent.winfo_width() // 2) - (self.window.winfo_width() // 2)
+        y = parent.winfo_y() + (parent.winfo_height() // 2) - (self.window.winfo_height() // 2)
+        self.window.geometry(f"+{x}+{y}")
+        
+        self._build_ui()
+        self._load_keywords()
+        self._setup_shortcuts()
+
+    def _build_ui(self):
+        # 標題
+        self.title_label = ttk.Label(self.window, text=self.i18n.t("keywords.title"), font=("Segoe UI", 14, "bold"))
+        self.title_label.pack(pady=(20, 10))
+
+        # 說明文字
+        self.help_label = ttk.Label(self.window, text=self.i18n.t("keywords.help_text"), foreground="gray")
+        self.help_label.pack(pady=(0, 5))
+        
+        # 快捷鍵說明
+        self.shortcuts_label = ttk.Label(self.window, text=self.i18n.t("keywords.shortcuts"), foreground="darkgreen", font=("Segoe UI", 9))
+        self.shortcuts_label.pack(pady=(0, 10))
+
+        # 搜尋區域
+        search_frame = ttk.Frame(self.window)
+        search_frame.pack(fill=tk.X, padx=20, pady=(0, 15))  # 增加底部間距
+        
+        self.search_label = ttk.Label(search_frame, text=self.i18n.t("keywords.search_label"))
+        self.search_label.pack(side=tk.LEFT)
+        
+        self.search_var = tk.StringVar()
+        self.search_entry = ttk.Entry(search_frame, textvariable=self.search_var, width=25)  # 增加搜尋框寬度
+        self.search_entry.pack(side=tk.LEFT, padx=(5, 10))
+        self.search_entry.bind('<KeyRelease>', self._on_search_changed)
+        
+        self.search_btn = ttk.Button(search_frame, text=self.i18n.t("keywords.search_btn"), command=self._search_keywords)
+        self.search_btn.pack(side=tk.LEFT, padx=(0, 10))
+        
+        self.clear_btn = ttk.Button(search_frame, text=self.i18n.t("keywords.clear_btn"), command=self._clear_search)
+        self.clear_btn.pack(side=tk.LEFT, padx=(0, 10))
+        
+        # 搜尋結果狀態
+        self.search_status = ttk.Label(search_frame, text="", foreground="blue")
+        self.search_status.pack(side=tk.LEFT, padx=(10, 0))
+
+        # 文字編輯區域
+        text_frame = ttk.Frame(self.window)
+        text_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=(0, 20))
+
+        # 文字編輯器 - 增加最小高度確保可讀性
+        self.text_editor = tk.Text(text_frame, wrap=tk.WORD, font=("Consolas", 10), height=20)
+        self.text_editor.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        # 捲軸
+        scrollbar = ttk.Scrollbar(text_frame, orient=tk.VERTICAL, command=self.text_editor.yview)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.text_editor.config(yscrollcommand=scrollbar.set)
+
+        # 按鈕區域 - 修正佈局問題
+        button_frame = ttk.Frame(self.window)
+        button_frame.pack(fill=tk.X, padx=20, pady=(0, 20))
+        
+        # 確保按鈕區域有固定高度，防止被擠壓
+        button_frame.configure(height=80)  # 增加按鈕區域高度
+        button_frame.pack_propagate(False)  # 防止子元件影響父元件大小
+
+        # 重新載入按鈕
+        self.reload_btn = ttk.Button(
+            button_frame,
+            text=self.i18n.t("keywords.reload_btn"),
+            command=self._reload_keywords
+        )
+        self.reload_btn.pack(side=tk.LEFT, pady=20)  # 增加垂直間距
+
+        # 儲存按鈕
+        self.save_btn = ttk.Button(
+            button_frame,
+            text=self.i18n.t("keywords.save_btn"),
+            style="Handover.TButton",
+            command=self._save_keywords
+        )
+        self.save_btn.pack(side=tk.RIGHT, padx=(10, 0), pady=20)  # 增加垂直間距
+
+        # 取消按鈕
+        self.cancel_btn = ttk.Button(
+            button_frame,
+            text=self.i18n.t("keywords.cancel_btn"),
+            command=self.window.destroy
+        )
+        self.cancel_btn.pack(side=tk.RIGHT, pady=20)  # 增加垂直間距
+
+    def _load_keywords(self):
+        """載入 keywords.txt 內容"""
+        try:
+            # 優先使用當前目錄的 keywords.txt
+            keywords_file = os.path.join(os.getcwd(), "keywords.txt")
+            if not os.path.exists(keywords_file):
+                # 如果當前目錄沒有，嘗試使用資源路徑
+                keywords_file = get_resource_path("keywords.txt")
+            
+            if os.path.exists(keywords_file):
+                with open(keywords_file, 'r', encoding='utf-8') as f:
+                    content = f.read()
+                    self.text_editor.delete(1.0, tk.END)
+                    self.text_editor.insert(1.0, content)
+            else:
+                # 如果檔案不存在，顯示預設內容
+                default_content = """# 關鍵字顏色設定檔
+# 格式：關鍵字=顏色代碼
+# 每行一個設定，以 # 開頭的是註解
+
+# 範例：
+adb device=#FF0000
+12345=#0000FF
+SUCCESS=#00FF00
+ERROR=#FF0000"""
+                self.text_editor.delete(1.0, tk.END)
+                self.text_editor.insert(1.0, default_content)
+        except Exception as e:
+            messagebox.showerror(
+                self.i18n.t("common.error"), 
+                self.i18n.t("keywords.load_error", error=str(e))
+            )
+
+    def _reload_keywords(self):
+        """重新載入關鍵字檔案"""
+        self._load_keywords()
+        self._clear_search()  # 清除搜尋結果
+
+    def _on_search_changed(self, event=None):
+        """搜尋框內容改變時的回調"""
+        # 延遲搜尋，避免每次按鍵都搜尋
+        if hasattr(self, '_search_after_id'):
+            self.window.after_cancel(self._search_after_id)
+        self._search_after_id = self.window.after(300, self._search_keywords)
+
+    def _search_keywords(self):
+        """搜尋關鍵字"""
+        search_text = self.search_var.get().strip()
+        if not search_text:
+            self._clear_search()
+            return
+        
+        # 清除之前的高亮
+        self.text_editor.tag_remove("search_highlight", "1.0", tk.END)
+        
+        # 搜尋並高亮
+        start_pos = "1.0"
+        matches = 0
+        
+        while True:
+            # 在文字中搜尋
+            pos = self.text_editor.search(search_text, start_pos, tk.END, nocase=True)
+            if not pos:
+                break
+            
+            # 計算結束位置
+            end_pos = f"{pos}+{len(search_text)}c"
+            
+            # 高亮搜尋結果
+            self.text_editor.tag_add("search_highlight", pos, end_pos)
+            matches += 1
+            
+            # 繼續搜尋下一個
+            start_pos = end_pos
+        
+        # 設定高亮樣式
+        self.text_editor.tag_config("search_highlight", background="yellow", foreground="black")
+        
+        # 更新狀態
+        if matches > 0:
+            self.search_status.config(text=f"找到 {matches} 個結果", foreground="blue")
+            # 滾動到第一個結果
+            first_match = self.text_editor.search(search_text, "1.0", tk.END, nocase=True)
+            if first_match:
+                self.text_editor.see(first_match)
+        else:
+            self.search_status.config(text="未找到結果", foreground="red")
+
+    def _clear_search(self):
+        """清除搜尋結果"""
+        self.search_var.set("")
+        self.text_editor.tag_remove("search_highlight", "1.0", tk.END)
+        self.search_status.config(text="")
+        
+        # 取消延遲搜尋
+        if hasattr(self, '_search_after_id'):
+            self.window.after_cancel(self._search_after_id)
+
+    def _setup_shortcuts(self):
+        """設定快捷鍵"""
+        # Ctrl+F 開啟搜尋
+        self.window.bind('<Control-f>', lambda e: self.search_entry.focus_set())
+        
+        # Ctrl+S 儲存
+        self.window.bind('<Control-s>', lambda e: self._save_keywords())
+        
+        # Escape 清除搜尋
+        self.window.bind('<Escape>', lambda e: self._clear_search())
+        
+        # F3 下一個搜尋結果
+        self.window.bind('<F3>', lambda e: self._find_next())
+        
+        # Shift+F3 上一個搜尋結果
+        self.window.bind('<Shift-F3>', lambda e: self._find_previous())
+
+    def _find_next(self):
+        """搜尋下一個結果"""
+        search_text = self.search_var.get().strip()
+        if not search_text:
+            return
+        
+        # 從當前游標位置搜尋
+        current_pos = self.text_editor.index(tk.INSERT)
+        pos = self.text_editor.search(search_text, current_pos, tk.END, nocase=True)
+        
+        if pos:
+            # 找到結果，移動游標並選中
+            end_pos = f"{pos}+{len(search_text)}c"
+            self.text_editor.mark_set(tk.INSERT, pos)
+            self.text_editor.tag_remove(tk.SEL, "1.0", tk.END)
+            self.text_editor.tag_add(tk.SEL, pos, end_pos)
+            self.text_editor.see(pos)
+        else:
+            # 沒找到，從頭開始搜尋
+            pos = self.text_editor.search(search_text, "1.0", tk.END, nocase=True)
+            if pos:
+                end_pos = f"{pos}+{len(search_text)}c"
+                self.text_editor.mark_set(tk.INSERT, pos)
+                self.text_editor.tag_remove(tk.SEL, "1.0", tk.END)
+                self.text_editor.tag_add(tk.SEL, pos, end_pos)
+                self.text_editor.see(pos)
+
+    def _find_previous(self):
+        """搜尋上一個結果"""
+        search_text = self.search_var.get().strip()
+        if not search_text:
+            return
+        
+        # 從當前游標位置向前搜尋
+        current_pos = self.text_editor.index(tk.INSERT)
+        pos = self.text_editor.search(search_text, current_pos, "1.0", backwards=True, nocase=True)
+        
+        if pos:
+            # 找到結果，移動游標並選中
+            end_pos = f"{pos}+{len(search_text)}c"
+            self.text_editor.mark_set(tk.INSERT, pos)
+            self.text_editor.tag_remove(tk.SEL, "1.0", tk.END)
+            self.text_editor.tag_add(tk.SEL, pos, end_pos)
+            self.text_editor.see(pos)
+        else:
+            # 沒找到，從尾部開始搜尋
+            pos = self.text_editor.search(search_text, tk.END, "1.0", backwards=True, nocase=True)
+            if pos:
+                end_pos = f"{pos}+{len(search_text)}c"
+                self.text_editor.mark_set(tk.INSERT, pos)
+                self.text_editor.tag_remove(tk.SEL, "1.0", tk.END)
+                self.text_editor.tag_add(tk.SEL, pos, end_pos)
+                self.text_editor.see(pos)
+
+    def _save_keywords(self):
+        """儲存關鍵字設定"""
+        try:
+            content = self.text_editor.get(1.0, tk.END)
+            
+            # 使用當前目錄的 keywords.txt，而不是打包後的資源路徑
+            keywords_file = os.path.join(os.getcwd(), "keywords.txt")
+            
+            # 確保目錄存在
+            os.makedirs(os.path.dirname(keywords_file), exist_ok=True)
+            
+            with open(keywords_file, 'w', encoding='utf-8') as f:
+                f.write(content)
+            
+            # 重新載入關鍵字到 logger
+            if hasattr(self.parent, 'logger'):
+                self.parent.logger._load_keywords_from_file()
+            
+            messagebox.showinfo(
+                self.i18n.t("common.info"), 
+                self.i18n.t("keywords.save_success", path=keywords_file)
+            )
+            
+        except Exception as e:
+            messagebox.showerror(
+                self.i18n.t("common.error"), 
+                self.i18n.t("keywords.save_error", error=str(e))
+            )
@@ -4,14 +4,21 @@ Purpose: Provide a simple logger that can attach a Text widget panel for live lo
 """
 
 import os
+import json
 import time
 import tkinter as tk
 from tkinter import ttk
 from typing import Optional, Dict
 import re
+import threading
+from collections import deque
 
+import startup_trace
 from i18n import I18N
 
+# 尚未建立的分頁最多暫存的日誌筆數（超過時丟棄最舊的）
+PENDING_LIMIT = 2000
+
 class GuiLogger:
     def __init__(self, logs_tab_parent, i18n: Optional[I18N] = None):
         self.text_widgets = {}  # 改為字典，key 為標籤頁名稱
@@ -21,8 +28,13 @@ class GuiLogger:
         # self._build_logs_tab(logs_tab_parent)  # 已移除
         self._setup_colors()
         self.custom_keywords = {}  # 存放自訂關鍵字
-        self._load_keywords_from_file()  # 載入自訂關鍵字
+        with startup_trace.phase("load keywords"):
+            self._load_keywords_from_file()  # 載入自訂關鍵字
         self.tag_counter = 0  # 用於生成唯一的 tag 名稱
+        self._pending = {}  # 尚未建立日誌面板的分頁：tab_name -> deque[(時間戳, level, message)]
+        # text_widgets / _pending 的增刪與讀取都在此鎖內（工作執行緒記錄日誌時，Tk 執行緒可能正在建立分頁）
+        # 不在鎖內操作 Text，避免工作執行緒等 Tk 執行緒、Tk 執行緒等鎖而互相卡住
+        self._lock = threading.Lock()
 
     def _setup_colors(self):
         """設定文字顏色標籤（已改為從 keywords.txt 載入）"""
@@ -107,7 +119,8 @@ class GuiLogger:
         self.main_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         ybar.pack(side=tk.RIGHT, fill=tk.Y)
         xbar.pack(side=tk.BOTTOM, fill=tk.X)
-        self.text_widgets["logs"] = self.main_text
+        with self._lock:
+            self.text_widgets["logs"] = self.main_text
 
     def attach_log_panel(self, parent, tab_name: str = "default"):
         """建立獨立的日誌面板，每個標籤頁都有自己的日誌區域"""
@@ -126,10 +139,26 @@ class GuiLogger:
         ybar.pack(side=tk.RIGHT, fill=tk.Y)
         xbar.pack(side=tk.BOTTOM, fill=tk.X)
         
-        # 將文字區域加入到對應的標籤頁
-        self.text_widgets[tab_name] = text
+        # 補上分頁建立前暫存的日誌；補寫期間的新日誌仍進暫存區，直到暫存區清空才改為直接寫入，不遺漏也不亂序
+        while True:
+            with self._lock:
+                buf = self._pending.get(tab_name)
+                if not buf:
+                    self._pending.pop(tab_name, None)
+                    self.text_widgets[tab_name] = text
+                    break
+                items = list(buf)
+                buf.clear()
+            for ts, level, message in items:
+                self._apply_colors(text, message, level, timestamp=ts)
         return text
 
+    def defer_tab(self, tab_name: str):
+        """登記稍後才建立日誌面板的分頁；在 attach_log_panel 之前寫給它（或 all）的日誌先暫存"""
+        with self._lock:
+            if tab_name not in self.text_widgets:
+                self._pending.setdefault(tab_name, deque(maxlen=PENDING_LIMIT))
+
     def refresh_texts(self):
         self.btn_save.config(text=self.i18n.t("logs.save"))
         self.btn_clear.config(text=self.i18n.t("logs.clear"))
@@ -147,11 +176,11 @@ class GuiLogger:
         self.tag_counter += 1
         return f"{base_name}_{self.tag_counter}"
 
-    def _apply_colors(self, text_widget, message, level):
-        """套用彩色文字到 Text widget"""
+    def _apply_colors(self, text_widget, message, level, timestamp: Optional[str] = None):
+        """套用彩色文字到 Text widget（timestamp 為暫存日誌的原始時間）"""
         try:
             # 插入時間戳記
-            timestamp = f"[{self._timestamp()}] "
+            timestamp = f"[{timestamp or self._timestamp()}] "
             text_widget.insert(tk.END, timestamp)
             
             # 插入等級標籤（帶顏色）
@@ -245,7 +274,8 @@ class GuiLogger:
 
     def log(self, message, *, level="INFO", tab_name: str = "all"):
         """記錄日誌到指定標籤頁或所有標籤頁"""
-        line = f"[{self._timestamp()}] {level}: {message}\n"
+        ts = self._timestamp()
+        line = f"[{ts}] {level}: {message}\n"
         
         # 寫入檔案（純文字格式）
         try:
@@ -253,21 +283,32 @@ class GuiLogger:
         except Exception:
             pass
         
-        # 顯示到 GUI（彩色格式）
-        if tab_name == "all":
-            # 顯示到所有標籤頁
-            for w in self.text_widgets.values():
-                try:
-                    self._apply_colors(w, message, level)
-                except Exception:
-                    pass
-        else:
-            # 只顯示到指定標籤頁
-            if tab_name in self.text_widgets:
-                try:
-                    self._apply_colors(self.text_widgets[tab_name], message, level)
-                except Exception:
-                    pass
+        # 顯示到 GUI（彩色格式）：鎖內決定目標並寫入暫存區，鎖外寫入 Text
+        with self._lock:
+            if tab_name == "all":
+                # 顯示到所有標籤頁
+                widgets = list(self.text_widgets.values())
+                for buf in self._pending.values():
+                    buf.append((ts, level, message))
+            else:
+                # 只顯示到指定標籤頁
+                w = self.text_widgets.get(tab_name)
+                widgets = [w] if w is not None else []
+                if w is None and tab_name in self._pending:
+                    self._pending[tab_name].append((ts, level, message))
+        for w in widgets:
+            try:
+                self._apply_colors(w, message, level, timestamp=ts)
+            except Exception:
+                pass
+
+    def record(self, event: str, **fields):
+        """寫入結構化紀錄到 session 檔（不顯示於 GUI），供事後統計，例如每台裝置的 push 速率"""
+        payload = json.dumps(fields, ensure_ascii=False, default=str)
+        try:
+            self._fp.write(f"[{self._timestamp()}] RECORD: {event} {payload}\n")
+        except Exception:
+            pass
 
     def debug(self, message, tab_name: str = "all"):
         """除錯訊息，只在 DEBUG 模式開啟時顯示"""
@@ -285,7 +326,11 @@ class GuiLogger:
 
     def clear_all(self):
         """清空所有日誌顯示"""
-        for w in self.text_widgets.values():
+        with self._lock:
+            for buf in self._pending.values():
+                buf.clear()
+            widgets = list(self.text_widgets.values())
+        for w in widgets:
             try:
                 w.delete("1.0", tk.END)
             except Exception:
@@ -293,27 +338,31 @@ class GuiLogger:
 
     def clear_logs(self, tab_name: str = "all"):
         """清空指定標籤頁的日誌"""
-        if tab_name == "all":
-            # 清空所有標籤頁的日誌
-            for text_widget in self.text_widgets.values():
-                try:
-                    text_widget.delete("1.0", tk.END)
-                except Exception:
-                    pass
-        else:
-            # 清空指定標籤頁的日誌
-            if tab_name in self.text_widgets:
-                try:
-                    self.text_widgets[tab_name].delete("1.0", tk.END)
-                except Exception:
-                    pass
+        with self._lock:
+            if tab_name == "all":
+                for buf in self._pending.values():
+                    buf.clear()
+                widgets = list(self.text_widgets.values())
+            else:
+                if tab_name in self._pending:
+                    self._pending[tab_name].clear()
+                w = self.text_widgets.get(tab_name)
+                widgets = [w] if w is not None else []
+        # 清空標籤頁的日誌
+        for text_widget in widgets:
+            try:
+                text_widget.delete("1.0", tk.END)
+            except Exception:
+                pass
 
     def save_log(self):
         # Already saving to file in real-time; this is a no-op placeholder
         self.log("Log is continuously saved to: " + self.log_path, level="INFO")
 
     def scroll_to_end(self):
-        for w in self.text_widgets.values():
+        with self._lock:
+            widgets = list(self.text_widgets.values())
+        for w in widgets:
             try:
                 w.see(tk.END)
             except Exception:
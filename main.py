@@ -8,6 +8,18 @@ English/Chinese UI with runtime switching.
 
 import os
 import sys
+import time
+
+# 啟動計時起點：首次繪製時間由此起算（含後續 import）
+_START_T0 = time.perf_counter()
+
+# 選用的啟動追蹤須在其他 import 之前開始，才能記錄各模組的載入時間
+import startup_trace
+
+startup_trace.start_if_requested(
+    os.path.join(getattr(sys, "_MEIPASS", os.path.abspath(".")), "config.json"), t0=_START_T0
+)
+
 import json
 import threading
 import tkinter as tk
@@ -17,18 +29,42 @@ import tkinter.font as tkfont
 from utils_paths import get_resource_path
 from logger_util import GuiLogger
 from i18n import I18N
-from subprocess_runner import run_bat_file, run_command
+from port_monitor import PortMonitor, format_port_line
+from config_store import ConfigStore
+from job_state import RUNNING, Job, format_elapsed
+from ui_state import FRAME_MS, UiStore
+from tk_watchdog import StallView, TkWatchdog
+from dashboard import DashboardView, DeviceBoard
+from text_fit import elide_middle, glyph_widths
 from version import __version__, __build__
 
 APP_SIZE = "900x600"
 DEFAULT_FONT_SIZE = 12
 CONFIG_FILENAME = "config.json"
+# 分頁建立模式：lazy（第一次選取才建立）/ eager（啟動時全部建立）；環境變數優先於 config.json 的 tab_mode
+TAB_MODE_ENV = "MU310_TAB_MODE"
+# 設為 1 時於首次繪製後輸出啟動時間（JSON）並結束，供 --startup-report 使用
+STARTUP_REPORT_ENV = "MU310_STARTUP_REPORT"
+# 執行中工作的經過時間更新間隔
+JOB_TICK_MS = 1000
+# 韌體路徑 Entry 的邊框與內距（px），省略顯示時從 Entry 寬度扣除
+ENTRY_TEXT_PAD_PX = 10
 
 
 class App(tk.Tk):
+    # 工作名稱（同分頁名稱）-> (i18n 標題 key, 狀態 Label 屬性, 執行中停用的按鈕屬性)
+    _JOB_WIDGETS = {
+        "adb": ("adb.check_env", "lbl_adb_status", ("btn_adb_check",)),
+        "fix": ("btn.auto_fix", "lbl_fix_status", ("btn_auto_fix",)),
+        "upgrade": ("btn.run_upgrade", "lbl_upgrade_status", ("btn_upgrade", "btn_browse_firmware")),
+    }
+
     def __init__(self):
         super().__init__()
-        self._load_config()
+        with startup_trace.phase("config load"):
+            # 設定檔服務：變更合併後於背景執行緒以暫存檔 + rename 寫出
+            self.config_store = ConfigStore(self._config_path())
+            self.config_data = self.config_store.load()
         default_lang = self.config_data.get("lang", "ZH")
         self.i18n = I18N(default_lang)
         # Window geometry (size)
@@ -40,18 +76,53 @@ class App(tk.Tk):
         self.title(self._get_app_title_text())
 
         self.current_font_size = int(self.config_data.get("font_size", DEFAULT_FONT_SIZE))
-        self._init_fonts(self.current_font_size)
-        self._init_styles()
-
-        self._build_header()
-        self._build_tabs()
-        self._build_statusbar()
+        with startup_trace.phase("_init_fonts"):
+            self._init_fonts(self.current_font_size)
+        with startup_trace.phase("_init_styles"):
+            self._init_styles()
+
+        # 介面狀態：元件綁定所讀取的 key，只在輸入值改變時重繪；背景執行緒的更新合併為每個 frame 一次
+        self.store = UiStore(
+            schedule=lambda fn: self.after(FRAME_MS, fn),
+            initial={
+                "lang": self.i18n.lang,
+                "font_size": self.current_font_size,
+                "devices": None,
+                "dm_ports": None,
+                "status_note": None,
+                "last_job": None,
+                **{f"job.{name}": None for name in self._JOB_WIDGETS},
+                **{f"current.{name}": None for name in self._JOB_WIDGETS},
+            },
+        )
+        # 裝置看板：各燒錄流程（本機與控制服務）回報每台裝置的步驟 / 進度 / 錯誤
+        self.board = DeviceBoard()
+        self.store.bind(("devices",), self.board.set_online)
+        self._ports_seen = False
+        self.device_watcher = None
+        self.watchdog = None
+        self.control_service = None
+        self.jobs = {}
+        self._job_tick = None
+        self._first_paint_ms = None
+        with startup_trace.phase("build header"):
+            self._build_header()
+        with startup_trace.phase("build tabs"):
+            self._build_tabs()
+        with startup_trace.phase("build statusbar"):
+            self._build_statusbar()
+        self.bind("<Map>", self._on_first_map, add="+")
 
         # Persist window size on resize/close
-        self._geom_save_after = None
         self.bind("<Configure>", self._on_configure)
         self.protocol("WM_DELETE_WINDOW", self._on_close)
 
+        # 背景列舉 COM 埠（清單按鈕直接顯示快取，DM 埠出現時更新狀態列）
+        self.port_monitor = PortMonitor(
+            interval=float(self.config_data.get("port_scan_interval", 2.0)),
+            on_change=lambda added, removed, snap: self._call_on_ui(self._on_ports_changed, added, removed, snap),
+        ).start()
+
     def _app_dir(self) -> str:
         try:
             base = sys._MEIPASS  # type: ignore[attr-defined]
@@ -62,21 +133,6 @@ class App(tk.Tk):
     def _config_path(self) -> str:
         return os.path.join(self._app_dir(), CONFIG_FILENAME)
 
-    def _load_config(self):
-        self.config_data = {}
-        try:
-            with open(self._config_path(), "r", encoding="utf-8") as f:
-                self.config_data = json.load(f)
-        except Exception:
-            self.config_data = {}
-
-    def _save_config(self):
-        try:
-            with open(self._config_path(), "w", encoding="utf-8") as f:
-                json.dump(self.config_data, f, ensure_ascii=False, indent=2)
-        except Exception:
-            pass
-
     def _init_fonts(self, size: int):
         try:
             self.tk_default_font = tkfont.nametofont("TkDefaultFont")
@@ -210,6 +266,10 @@ class App(tk.Tk):
         plus_btn = ttk.Button(font_box, text="+", width=3, command=self.on_font_increase, style="FontCtl.TButton")
         plus_btn.pack(side=tk.LEFT)
 
+        self.store.bind(("lang",), lambda _lang: self._apply_title_override())
+        self._bind_i18n((self.lang_label, "header.lang"), (self.help_btn, "header.help"), (self.font_label, "header.font"))
+        self.store.bind(("font_size",), lambda size: self.size_lbl.config(text=str(size)))
+
     def _build_tabs(self):
         self.container = ttk.Notebook(self, style="Custom.TNotebook")
         self.container.pack(fill=tk.BOTH, expand=True, padx=6, pady=6)
@@ -222,25 +282,98 @@ class App(tk.Tk):
         self.tab_adb = ttk.Frame(self.container)
         self.tab_fix = ttk.Frame(self.container)
         self.tab_upgrade = ttk.Frame(self.container)
+        self.tab_dashboard = ttk.Frame(self.container)
         self.tab_settings = ttk.Frame(self.container)
         # 移除 DM 檢查與 Help 分頁
 
         self.container.add(self.tab_adb, text=self.i18n.t("tab.adb"))
         self.container.add(self.tab_fix, text=self.i18n.t("tab.fix"))
         self.container.add(self.tab_upgrade, text=self.i18n.t("tab.upgrade"))
+        self.container.add(self.tab_dashboard, text=self.i18n.t("tab.dashboard"))
         self.container.add(self.tab_settings, text=self._s_text("tab"))
         # Help tab removed（僅保留按鈕開啟本機HTML）
+        self.store.bind(("lang",), self._render_tab_titles)
 
         # 建立 logger 實例，但不附加到特定標籤頁
         self.logger = GuiLogger(self, i18n=self.i18n)
-
-        self._build_tab_adb()
-        self._build_tab_fix()
-        self._build_tab_upgrade()
-        self._build_tab_settings()
+        if self.config_store.load_error:
+            self.logger.warning(self.config_store.load_error)
+
+        # 分頁內容於第一次選取時才建立；未建立分頁的日誌由 logger 暫存，建立時補上
+        t0 = time.perf_counter()
+        self._tab_builders = {
+            str(self.tab_adb): (self._build_tab_adb, "adb"),
+            str(self.tab_fix): (self._build_tab_fix, "fix"),
+            str(self.tab_upgrade): (self._build_tab_upgrade, "upgrade"),
+            str(self.tab_dashboard): (self._build_tab_dashboard, None),
+            str(self.tab_settings): (self._build_tab_settings, None),
+        }
+        self._tab_mode = self._startup_tab_mode()
+        if self._tab_mode == "eager":
+            for tab in list(self._tab_builders):
+                self._ensure_tab(tab)
+        else:
+            for _, log_tab in self._tab_builders.values():
+                if log_tab:
+                    self.logger.defer_tab(log_tab)
+            self._ensure_tab(self.container.select())
+        self.container.bind("<<NotebookTabChanged>>", self._on_tab_changed)
+        self._build_tabs_ms = (time.perf_counter() - t0) * 1000
         # self._build_tab_dm_check()  # 已移除
         # Help tab removed
 
+    def _startup_tab_mode(self) -> str:
+        mode = (os.environ.get(TAB_MODE_ENV) or self.config_data.get("tab_mode") or "lazy").strip().lower()
+        return "eager" if mode == "eager" else "lazy"
+
+    def _tab_built(self, tab) -> bool:
+        return str(tab) not in self._tab_builders
+
+    def _ensure_tab(self, tab):
+        """建立尚未建立的分頁內容（tab 為分頁 Frame 或其路徑名稱）"""
+        entry = self._tab_builders.pop(str(tab), None)
+        if entry is None:
+            return
+        name = entry[1] or entry[0].__name__[len("_build_tab_"):]
+        t0 = time.perf_counter()
+        with startup_trace.phase(f"tab {name}"):
+            entry[0]()
+        self.logger.debug(f"Tab {name} built in {(time.perf_counter() - t0) * 1000:.0f} ms")
+
+    def _on_tab_changed(self, event=None):
+        try:
+            self._ensure_tab(self.container.select())
+        except tk.TclError:
+            pass
+
+    def _on_first_map(self, event):
+        """主視窗第一次顯示；排在 idle 佇列末端，於已排入的重繪完成後計時"""
+        if event.widget is not self or self._first_paint_ms is not None:
+            return
+        self._first_paint_ms = 0.0
+        self.after_idle(self._report_first_paint)
+
+    def _report_first_paint(self):
+        self._first_paint_ms = (time.perf_counter() - _START_T0) * 1000
+        self.logger.record(
+            "startup",
+            tab_mode=self._tab_mode,
+            first_paint_ms=round(self._first_paint_ms, 1),
+            build_tabs_ms=round(self._build_tabs_ms, 1),
+        )
+        self.logger.debug(f"First paint {self._first_paint_ms:.0f} ms (tabs: {self._tab_mode}, build {self._build_tabs_ms:.0f} ms)")
+        startup_trace.mark("first paint")
+        self._start_device_watcher()
+        self._start_watchdog()
+        self._start_control_service()
+        trace_path = startup_trace.finish()
+        if trace_path:
+            self.logger.log(f"Startup trace written to {trace_path}", level="INFO", tab_name="adb")
+        if os.environ.get(STARTUP_REPORT_ENV) == "1":
+            print(json.dumps({"tab_mode": self._tab_mode, "first_paint_ms": self._first_paint_ms, "build_tabs_ms": self._build_tabs_ms}), flush=True)
+            self.port_monitor.stop()
+            self.destroy()
+
     def _clear_tab_hover(self):
         if getattr(self, "_last_hover_tab", None) is not None:
             try:
@@ -295,6 +428,20 @@ class App(tk.Tk):
         self.dmport_lbl = ttk.Label(status_frame, textvariable=self.dmport_var)
         self.version_lbl = ttk.Label(status_frame, textvariable=self.version_var)
 
+        self.store.bind(
+            ("lang", "devices"),
+            lambda _lang, devices: self.device_var.set(self.i18n.t("status.device", device=", ".join(devices) if devices else "N/A")),
+        )
+        self.store.bind(
+            ("lang", "dm_ports"),
+            lambda _lang, dm: self.dmport_var.set(self.i18n.t("status.dmport", dm=", ".join(dm) if dm else "N/A")),
+        )
+        self.store.bind(("lang",), lambda _lang: self.version_var.set(self.i18n.t("status.version", ver=f"v{__version__}-{__build__}")))
+        self.store.bind(
+            ("lang", "status_note", "last_job") + tuple(f"job.{name}" for name in self._JOB_WIDGETS),
+            self._render_status_bar,
+        )
+
         self.status_lbl.pack(side=tk.LEFT, padx=8)
         self.device_lbl.pack(side=tk.LEFT, padx=16)
         self.dmport_lbl.pack(side=tk.LEFT, padx=16)
@@ -344,6 +491,9 @@ class App(tk.Tk):
         )
         self.btn_clear_adb.pack(side=tk.LEFT)
         
+        self._bind_i18n((self.btn_adb_check, "adb.check_env"), (self.btn_list_com, "btn.list_com"), (self.btn_clear_adb, "btn.clear_logs"))
+        self._bind_job("adb", self.lbl_adb_bat)
+
         # 日誌面板
         self.logger.attach_log_panel(parent=frame, tab_name="adb")
 
@@ -382,6 +532,9 @@ class App(tk.Tk):
         )
         self.btn_clear_fix.pack(side=tk.LEFT)
         
+        self._bind_i18n((self.btn_auto_fix, "btn.auto_fix"), (self.btn_clear_fix, "btn.clear_logs"))
+        self._bind_job("fix", self.lbl_fix_bat)
+
         # 日誌面板
         self.logger.attach_log_panel(parent=frame, tab_name="fix")
 
@@ -412,6 +565,11 @@ class App(tk.Tk):
         
         self.firmware_entry = ttk.Entry(file_frame, textvariable=self.firmware_show)
         self.firmware_entry.grid(row=0, column=1, sticky="ew", padx=(0, 10))
+        # 路徑依 Entry 實際寬度省略；視窗縮放或字型 +/- 時重算
+        self._fw_font = self._entry_font(self.firmware_entry)
+        self._fw_fit_key = None
+        self.firmware_entry.bind("<Configure>", self._fit_firmware_path, add="+")
+        self.store.bind(("font_size",), lambda _size: self._fit_firmware_path())
         
         self.btn_browse_firmware = ttk.Button(
             file_frame, 
@@ -441,12 +599,33 @@ class App(tk.Tk):
         
         # 讓 Entry 自動撐滿
         file_frame.columnconfigure(1, weight=1)
+
+        # push 進度列（百分比、MB/s、ETA）
+        progress_frame = ttk.Frame(frame)
+        progress_frame.pack(fill=tk.X, pady=(0, 10))
+        self.push_progress_var = tk.DoubleVar(value=0.0)
+        self.push_progress = ttk.Progressbar(progress_frame, orient=tk.HORIZONTAL, mode="determinate", maximum=100.0, variable=self.push_progress_var)
+        self.push_progress.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 10))
+        self.lbl_push_rate = ttk.Label(progress_frame, text="", width=46)
+        self.lbl_push_rate.pack(side=tk.LEFT)
         
+        self._bind_i18n(
+            (self.lbl_fw_prompt, "upg.fw_file"),
+            (self.btn_browse_firmware, "upg.browse"),
+            (self.btn_upgrade, "btn.run_upgrade"),
+            (self.btn_clear_upgrade, "btn.clear_logs"),
+        )
+        self._bind_job("upgrade", self.lbl_upgrade_bat)
+
         # 日誌面板
         self.logger.attach_log_panel(parent=frame, tab_name="upgrade")
 
     # Help tab removed（僅保留按鈕開啟本機HTML）
 
+    def _build_tab_dashboard(self):
+        self.dashboard = DashboardView(self.tab_dashboard, self.board, self.i18n)
+        self.dashboard.frame.pack(fill=tk.BOTH, expand=True)
+
     def _build_tab_settings(self):
         frame = ttk.Frame(self.tab_settings)
         frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
@@ -496,9 +675,19 @@ class App(tk.Tk):
         )
         self.settings_btn_keywords.pack(pady=10)
 
+        # 診斷區域：Tk 事件迴圈停頓紀錄
+        self.settings_diag_frame = ttk.LabelFrame(frame, text=self._s_text("diag_group"), padding=(10, 5))
+        self.settings_diag_frame.grid(row=3, column=0, columnspan=2, sticky="ew", pady=(0, 20))
+        self.settings_btn_diag = ttk.Button(
+            self.settings_diag_frame,
+            text=self._s_text("diag_btn"),
+            command=self.on_open_diagnostics,
+        )
+        self.settings_btn_diag.pack(pady=10)
+
         # 操作按鈕區域 - 置中對齊
         button_frame = ttk.Frame(frame)
-        button_frame.grid(row=3, column=0, columnspan=2, sticky="ew", pady=(20, 0))
+        button_frame.grid(row=4, column=0, columnspan=2, sticky="ew", pady=(20, 0))
         
         # 儲存按鈕置中
         self.settings_btn_save = ttk.Button(
@@ -513,6 +702,51 @@ class App(tk.Tk):
         frame.columnconfigure(0, weight=1)
         frame.columnconfigure(1, weight=1)
 
+        self._bind_i18n(
+            (self.settings_title_label, lambda: self._s_text("title")),
+            (self.settings_lbl_en, lambda: self._s_text("label_en")),
+            (self.settings_lbl_zh, lambda: self._s_text("label_zh")),
+            (self.settings_btn_save, lambda: self._s_text("save_btn")),
+            (self.settings_diag_frame, lambda: self._s_text("diag_group")),
+            (self.settings_btn_diag, lambda: self._s_text("diag_btn")),
+        )
+
+    # =============== State bindings ===============
+    def _bind_i18n(self, *pairs):
+        """把 (元件, i18n key 或回傳文字的函式) 綁定到語言；切換語言時只更新這些元件"""
+        def render(_lang):
+            for widget, key in pairs:
+                widget.config(text=key() if callable(key) else self.i18n.t(key))
+
+        self.store.bind(("lang",), render)
+
+    def _bind_job(self, name: str, current_label):
+        """分頁狀態 Label、「目前執行」Label 與按鈕分別綁定到語言 / 工作狀態"""
+        _, label_attr, buttons = self._JOB_WIDGETS[name]
+        status_label = getattr(self, label_attr)
+
+        def render_status(_lang, snap):
+            status_label.config(text=self.i18n.t("status.label", status=self._job_text(snap)))
+
+        def render_buttons(snap):
+            state = tk.DISABLED if snap is not None and snap[0] == RUNNING else tk.NORMAL
+            for attr in buttons:
+                getattr(self, attr).config(state=state)
+
+        def render_current(_lang, current):
+            current_label.config(text=f"{self.i18n.t('ui.current')} {current or self.i18n.t('common.none')}")
+
+        self.store.bind(("lang", f"job.{name}"), render_status)
+        self.store.bind((f"job.{name}",), render_buttons)
+        self.store.bind(("lang", f"current.{name}"), render_current)
+
+    def _render_tab_titles(self, _lang):
+        self.container.tab(self.tab_adb, text=self.i18n.t("tab.adb"))
+        self.container.tab(self.tab_fix, text=self.i18n.t("tab.fix"))
+        self.container.tab(self.tab_upgrade, text=self.i18n.t("tab.upgrade"))
+        self.container.tab(self.tab_dashboard, text=self.i18n.t("tab.dashboard"))
+        self.container.tab(self.tab_settings, text=self._s_text("tab"))
+
     def _validate_title_input(self, proposed: str) -> bool:
         """限制標題輸入長度至 30 字元。"""
         try:
@@ -553,6 +787,8 @@ class App(tk.Tk):
             "label_zh": "中文標題",
             "save_btn": "儲存設定",
             "saved": "設定已儲存並立即生效",
+            "diag_group": "診斷",
+            "diag_btn": "介面停頓紀錄",
         }
         en = {
             "tab": "Settings",
@@ -561,6 +797,8 @@ class App(tk.Tk):
             "label_zh": "Title (ZH)",
             "save_btn": "Save Settings",
             "saved": "Settings saved and applied",
+            "diag_group": "Diagnostics",
+            "diag_btn": "UI Stall Log",
         }
         return (en if lang == "EN" else zh).get(key, key)
 
@@ -572,9 +810,8 @@ class App(tk.Tk):
                 f.configure(size=self.current_font_size)
             except Exception:
                 pass
-        self.size_lbl.config(text=str(self.current_font_size))
-        self.config_data["font_size"] = self.current_font_size
-        self._save_config()
+        self.store.set("font_size", self.current_font_size)
+        self.config_store.set("font_size", self.current_font_size)
 
     def on_font_decrease(self):
         self.current_font_size = max(self.current_font_size - 1, 8)
@@ -583,110 +820,124 @@ class App(tk.Tk):
                 f.configure(size=self.current_font_size)
             except Exception:
                 pass
-        self.size_lbl.config(text=str(self.current_font_size))
-        self.config_data["font_size"] = self.current_font_size
-        self._save_config()
+        self.store.set("font_size", self.current_font_size)
+        self.config_store.set("font_size", self.current_font_size)
 
     def on_lang_change(self, event=None):
         lang = self.lang_var.get()
         self.i18n.set_lang(lang)
-        self.config_data["lang"] = lang
-        self._save_config()
-        # 改為呼叫簡化且與現況相符的語言刷新
-        self._retranslate()
+        self.config_store.set("lang", lang)
+        self.logger.i18n = self.i18n
+        # 綁定語言的元件於下一個 frame 重繪
+        self.store.set("lang", lang)
 
     def on_save_settings(self):
         """儲存設定：自訂標題（EN/ZH），並立即生效。"""
         try:
-            self.config_data["title_en"] = self.title_en_var.get().strip()
-            self.config_data["title_zh"] = self.title_zh_var.get().strip()
-            self._save_config()
+            self.config_store.update(
+                title_en=self.title_en_var.get().strip(),
+                title_zh=self.title_zh_var.get().strip(),
+            )
             self._apply_title_override()
             # 狀態列提示
-            self.status_var.set(self._s_text("saved"))
+            self.store.set("status_note", "saved")
         except Exception as e:
             try:
                 messagebox.showerror("Error", f"Save settings failed: {e}")
             except Exception:
                 pass
 
-    def _retranslate(self):
-        """更新所有可見文字，避免參照不存在的元件。"""
-        self._update_lang()
-        self.status_var.set(self.i18n.t("status.label", status=self.i18n.t("common.idle")))
-        self.device_var.set(self.i18n.t("status.device", device="N/A"))
-        self.dmport_var.set(self.i18n.t("status.dmport", dm="N/A"))
-        self.version_var.set(self.i18n.t("status.version", ver=f"v{__version__}-{__build__}"))
-        self.logger.i18n = self.i18n
-        self.logger.refresh_texts()
+    # =============== Window events ===============
+    def _on_configure(self, event):
+        if event.widget is self and self.state() == "normal":
+            # 寫檔由 config_store 延遲合併；尺寸未變的事件不會寫入
+            size = (self.winfo_width(), self.winfo_height())
+            if size != (self.config_data.get("win_w"), self.config_data.get("win_h")):
+                self.config_store.update(win_w=size[0], win_h=size[1])
+
+    def _start_device_watcher(self):
+        """首次繪製後才開始追蹤 adb 裝置（device_monitor 於此時才載入）；清單直接寫入 store"""
+        from device_monitor import DeviceWatcher
+
+        self.device_watcher = DeviceWatcher(
+            on_change=lambda serials: self.store.set("devices", tuple(serials) if serials else None),
+        ).start()
+
+    def _start_watchdog(self):
+        """Tk 事件迴圈停頓監看：heartbeat 延遲超過門檻時取樣主執行緒堆疊（watchdog_enabled 可關閉）"""
+        if not self.config_data.get("watchdog_enabled", True):
+            return
+        self.watchdog = TkWatchdog(
+            self,
+            interval_ms=int(self.config_data.get("watchdog_interval_ms", 100)),
+            threshold_ms=int(self.config_data.get("watchdog_threshold_ms", 250)),
+            on_stall=self._on_stall,
+            context=lambda: [name for name, job in self.jobs.items() if job.running],
+        ).start()
+
+    def _on_stall(self, event):
+        self.logger.record("stall", **event.to_record())
+        self.logger.debug(
+            f"UI stalled for {event.duration_ms:.0f} ms (jobs: {', '.join(event.jobs) or 'none'}, {len(event.samples)} stack samples)"
+        )
 
-    def _update_lang(self):
-        """更新所有 UI 元素的語言"""
-        self._apply_title_override()
-        
-        # 更新標籤頁標題
-        self.container.tab(self.tab_adb, text=self.i18n.t("tab.adb"))
-        self.container.tab(self.tab_fix, text=self.i18n.t("tab.fix"))
-        self.container.tab(self.tab_upgrade, text=self.i18n.t("tab.upgrade"))
-        self.container.tab(self.tab_settings, text=self._s_text("tab"))
-        # DM 檢查分頁已移除
-        # Help tab removed
-        
-        # 更新按鈕文字
-        self.btn_adb_check.config(text=self.i18n.t("adb.check_env"))
-        self.btn_list_com.config(text=self.i18n.t("btn.list_com"))
-        self.btn_clear_adb.config(text=self.i18n.t("btn.clear_logs"))
-        self.btn_auto_fix.config(text=self.i18n.t("btn.auto_fix"))
-        self.btn_clear_fix.config(text=self.i18n.t("btn.clear_logs"))
-        self.btn_upgrade.config(text=self.i18n.t("btn.run_upgrade"))
-        self.btn_clear_upgrade.config(text=self.i18n.t("btn.clear_logs"))
-
-        # 設定分頁文案
+    def on_open_diagnostics(self):
+        if self.watchdog is None:
+            self.logger.warning("UI watchdog is disabled (watchdog_enabled: false)")
+            return
+        StallView(self, self.watchdog, self.i18n)
+
+    def _start_control_service(self):
+        """選用的本機控制服務（control_service_enabled）：產線控制器經 HTTP 提交 / 查詢 / 取消工作，日誌同樣顯示於各分頁"""
+        if not self.config_data.get("control_service_enabled", False):
+            return
+        from control_service import service_from_config
+
+        service = service_from_config(
+            self.logger,
+            self.config_data,
+            on_job_change=lambda sj: self._call_on_ui(self._on_service_job, sj.job),
+            is_busy=lambda name: name in self.jobs and not self.jobs[name].done,
+            board=self.board,
+        )
         try:
-            self.settings_title_label.config(text=self._s_text("title"))
-            self.settings_lbl_en.config(text=self._s_text("label_en"))
-            self.settings_lbl_zh.config(text=self._s_text("label_zh"))
-            self.settings_btn_save.config(text=self._s_text("save_btn"))
-        except Exception:
-            pass
+            service.start()
+        except OSError as e:
+            self.logger.warning(f"Control service not started: {e}")
+            return
+        self.control_service = service
+        self.logger.log(f"Control service listening on {service.url}", tab_name="adb")
 
-        # 升級分頁標籤與狀態文字
+    def _on_service_job(self, job: Job):
+        """遠端工作與本機工作共用狀態列、狀態 Label 與按鈕停用（Tk 執行緒）"""
+        if job.name not in self._JOB_WIDGETS:
+            return
+        if self.jobs.get(job.name) is not job:
+            self.jobs[job.name] = job
+            self.store.set(f"current.{job.name}", "Control service (HTTP)")
+        self._on_job_change(job)
+
+    def _call_on_ui(self, func, *args):
+        """由背景執行緒安排在 Tk 主執行緒執行（視窗關閉後忽略）"""
         try:
-            self.lbl_fw_prompt.config(text=self.i18n.t("upg.fw_file"))
-            self.btn_browse_firmware.config(text=self.i18n.t("upg.browse"))
-            self.lbl_upgrade_status.config(text=f"{self.i18n.t('status.label', status=self.i18n.t('common.idle'))}")
-            # 若目前未選擇檔案，顯示 None
-            current_text = self.firmware_full.get().strip()
-            if current_text:
-                self.lbl_upgrade_bat.config(text=f"{self.i18n.t('ui.current')} {os.path.basename(current_text)}")
-            else:
-                self.lbl_upgrade_bat.config(text=f"{self.i18n.t('ui.current')} {self.i18n.t('common.none')}")
-        except Exception:
+            self.after(0, func, *args)
+        except (RuntimeError, tk.TclError):
             pass
-        
-        # Help tab removed
-
-    # =============== Window events ===============
-    def _on_configure(self, event):
-        if event.widget is self and self.state() == "normal":
-            self.config_data["win_w"] = self.winfo_width()
-            self.config_data["win_h"] = self.winfo_height()
-            # Debounce saving to avoid excessive disk writes
-            if self._geom_save_after is not None:
-                try:
-                    self.after_cancel(self._geom_save_after)
-                except Exception:
-                    pass
-            self._geom_save_after = self.after(500, self._save_config)
 
     def _on_close(self):
-        # Save geometry immediately
+        self.port_monitor.stop()
+        if self.watchdog is not None:
+            self.watchdog.stop()
+        if self.device_watcher is not None:
+            self.device_watcher.stop()
+        if self.control_service is not None:
+            self.control_service.stop()
+        # Save geometry immediately（等待背景寫入完成）
         try:
-            self.config_data["win_w"] = self.winfo_width()
-            self.config_data["win_h"] = self.winfo_height()
-            self._save_config()
+            self.config_store.update(win_w=self.winfo_width(), win_h=self.winfo_height())
         except Exception:
             pass
+        self.config_store.close()
         self.destroy()
 
     def on_open_help(self):
@@ -704,160 +955,191 @@ class App(tk.Tk):
     # =============== Callbacks wired to BAT ===============
     def on_run_adb_check(self):
         """執行 ADB 環境檢查"""
+        job = self._start_job("adb")
+        if job is None:
+            return
         self.logger.log(self.i18n.t("adb.check_env") + "...", level="INFO", tab_name="adb")
         
         # 更新狀態 LABEL
-        self.lbl_adb_status.config(text=f"{self.i18n.t('status.label', status=self.i18n.t('common.running'))}")
-        self.lbl_adb_bat.config(text=f"{self.i18n.t('ui.current')} ADB Environment Check.bat")
+        self.store.set("current.adb", "ADB Environment Check.bat")
         
         bat = get_resource_path("BAT_FILES/ADB Environment Check.bat")
         if os.path.exists(bat):
-            run_bat_file(bat, logger=self.logger, cwd=os.path.dirname(bat), tab_name="adb")
-            # 執行完成後更新狀態
-            self.after(1000, lambda: self.lbl_adb_status.config(text=f"{self.i18n.t('status.label', status=self.i18n.t('common.idle'))}"))
+            from subprocess_runner import run_bat_file
+
+            # 狀態於批次檔真正結束時依返回碼更新
+            proc = run_bat_file(bat, logger=self.logger, cwd=os.path.dirname(bat), tab_name="adb", on_complete=self._job_done_callback(job))
+            if proc is not None:
+                job.set_canceller(proc.terminate)
         else:
             self.logger.error("ADB Environment Check.bat not found", tab_name="adb")
-            self.lbl_adb_status.config(text=f"{self.i18n.t('status.label', status=self.i18n.t('common.error'))}")
-            self.lbl_adb_bat.config(text=f"{self.i18n.t('ui.current')} {self.i18n.t('common.none')}")
+            self.store.set("current.adb", None)
+            job.finish(-1)
 
     def on_run_auto_fix(self):
         """執行自動修復"""
+        job = self._start_job("fix")
+        if job is None:
+            return
         self.logger.log(self.i18n.t("btn.auto_fix") + "...", level="INFO", tab_name="fix")
         
         # 更新狀態 LABEL
-        self.lbl_fix_status.config(text=f"{self.i18n.t('status.label', status=self.i18n.t('common.running'))}")
-        self.lbl_fix_bat.config(text=f"{self.i18n.t('ui.current')} auto_fix_adb_ENG.bat")
-        
-        bat = get_resource_path("BAT_FILES/auto_fix_adb_ENG.bat")
-        if os.path.exists(bat):
-            run_bat_file(bat, logger=self.logger, cwd=os.path.dirname(bat), tab_name="fix")
-            # 執行完成後更新狀態
-            self.after(1000, lambda: self.lbl_fix_status.config(text=f"{self.i18n.t('status.label', status=self.i18n.t('common.idle'))}"))
-        else:
-            self.logger.error("auto_fix_adb_ENG.bat not found", tab_name="fix")
-            self.lbl_fix_status.config(text=f"{self.i18n.t('status.label', status=self.i18n.t('common.error'))}")
-            self.lbl_fix_bat.config(text=f"{self.i18n.t('ui.current')} {self.i18n.t('common.none')}")
+        self.store.set("current.fix", "auto_fix_adb_ENG (Python)")
+
+        from fix_flow import options_from_config, run_auto_fix
+
+        flow = run_auto_fix(
+            logger=self.logger,
+            tab_name="fix",
+            on_complete=self._job_done_callback(job),
+            **options_from_config(self.config_data),
+        )
+        job.set_canceller(flow.cancel)
 
     def on_run_upgrade(self):
         """執行韌體升級（必須選擇檔案）"""
-        fw = self.firmware_full.get().strip()
-        if not fw:
-            self.logger.error("Please select firmware (*.bin) first", tab_name="upgrade")
-            self.lbl_upgrade_status.config(text=f"{self.i18n.t('status.label', status=self.i18n.t('common.error'))}")
-            self.lbl_upgrade_bat.config(text=f"{self.i18n.t('ui.current')} {self.i18n.t('common.none')}")
+        job = self._start_job("upgrade")
+        if job is None:
             return
-        if not os.path.exists(fw):
-            self.logger.error(f"Firmware file not found: {fw}", tab_name="upgrade")
-            self.lbl_upgrade_status.config(text=f"{self.i18n.t('status.label', status=self.i18n.t('common.error'))}")
-            self.lbl_upgrade_bat.config(text=f"{self.i18n.t('ui.current')} {self.i18n.t('common.none')}")
+        fw = self.firmware_full.get().strip()
+        if not fw or not os.path.exists(fw):
+            self.logger.error(f"Firmware file not found: {fw}" if fw else "Please select firmware (*.bin) first", tab_name="upgrade")
+            self.store.set("current.upgrade", None)
+            job.finish(-1)
             return
 
         fw_abs = os.path.abspath(fw)
-        bat = get_resource_path("BAT_FILES/Burn_in _611GT.bat")
-        if not os.path.exists(bat):
-            self.logger.error("Burn_in _611GT.bat not found", tab_name="upgrade")
-            self.lbl_upgrade_status.config(text=f"{self.i18n.t('status.label', status=self.i18n.t('common.error'))}")
-            self.lbl_upgrade_bat.config(text=f"{self.i18n.t('ui.current')} {self.i18n.t('common.none')}")
-            return
-
         self.logger.log(f"{self.i18n.t('btn.run_upgrade')} : {fw_abs}", tab_name="upgrade")
-        self.lbl_upgrade_status.config(text=f"{self.i18n.t('status.label', status=self.i18n.t('common.running'))}")
-        self.lbl_upgrade_bat.config(text=f"{self.i18n.t('ui.current')} Burn_in _611GT.bat")
+        self.store.set("current.upgrade", "Burn_in _611GT (adb sync)")
+        self.push_progress_var.set(0.0)
+        self.lbl_push_rate.config(text="")
+
+        # 燒錄流程改由 Python 直接透過 adb server 執行，push 可回報即時進度
+        from burn_in_flow import options_from_config, run_burn_in
 
-        cmd = f'cmd /c chcp 65001 > nul & call "{bat}" "{fw_abs}"'
-        run_command(
-            cmd,
+        flow = run_burn_in(
+            fw_abs,
             logger=self.logger,
-            cwd=os.path.dirname(bat),
-            shell=True,
             tab_name="upgrade",
+            **options_from_config(self.config_data),
+            board=self.board,
+            on_progress=lambda st: self.after(0, self._on_push_progress, st.sent, st.total, st.rate or st.average_rate, st.eta),
+            on_complete=self._job_done_callback(job),
         )
-        self.after(1000, lambda: self.lbl_upgrade_status.config(text=f"{self.i18n.t('status.label', status=self.i18n.t('common.idle'))}"))
+        job.set_canceller(flow.cancel)
+
+    # =============== Jobs ===============
+    def _start_job(self, name: str):
+        """建立並開始工作；同名工作仍在執行時記錄警告並回傳 None"""
+        current = self.jobs.get(name)
+        if current is not None and not current.done:
+            self.logger.warning(self.i18n.t("job.busy", job=self._job_title(name)), tab_name=name)
+            return None
+        job = Job(name, on_change=self._on_job_change)
+        self.jobs[name] = job
+        job.start()
+        return job
+
+    def _job_done_callback(self, job: Job):
+        """給工作執行緒的 on_complete：結束碼以 after() 轉回 Tk 執行緒再更新狀態"""
+        return lambda code: self._call_on_ui(job.finish, code)
+
+    def _job_title(self, name: str) -> str:
+        return self.i18n.t(self._JOB_WIDGETS[name][0])
+
+    def _job_text(self, snap) -> str:
+        """工作快照 (state, exit_code, 經過秒數) 轉為狀態文字；None 為待機"""
+        if snap is None:
+            return self.i18n.t("common.idle")
+        state, code, elapsed = snap
+        return self.i18n.t(f"job.{state}", elapsed=format_elapsed(elapsed), code=code)
+
+    def _job_snapshot(self, job: Job):
+        # 經過時間取整秒：同一秒內的更新不會觸發重繪
+        return (job.state, job.exit_code, int(job.elapsed))
+
+    def _on_job_change(self, job: Job):
+        if job.done:
+            self.logger.record("job", name=job.name, state=job.state, code=job.exit_code, seconds=round(job.elapsed, 1))
+        self.store.update({f"job.{job.name}": self._job_snapshot(job), "last_job": job.name, "status_note": None})
+        self._schedule_job_tick()
+
+    def _render_status_bar(self, _lang, note, last_job, *snaps):
+        """狀態列：列出執行中的工作；沒有時顯示提示訊息或最後一個完成的工作"""
+        jobs = dict(zip(self._JOB_WIDGETS, snaps))
+        running = [name for name, snap in jobs.items() if snap is not None and snap[0] == RUNNING]
+        if not running and note:
+            self.status_var.set(self._s_text(note))
+            return
+        shown = running or ([last_job] if last_job else [])
+        if shown:
+            status = " | ".join(f"{self._job_title(name)}: {self._job_text(jobs[name])}" for name in shown)
+        else:
+            status = self.i18n.t("common.idle")
+        self.status_var.set(self.i18n.t("status.label", status=status))
+
+    def _schedule_job_tick(self):
+        if self._job_tick is None and any(j.running for j in self.jobs.values()):
+            self._job_tick = self.after(JOB_TICK_MS, self._on_job_tick)
+
+    def _on_job_tick(self):
+        """執行中每秒更新經過時間（只有經過秒數改變的元件會重繪）"""
+        self._job_tick = None
+        self.store.update({f"job.{name}": self._job_snapshot(job) for name, job in self.jobs.items() if job.running})
+        self._schedule_job_tick()
+
+    def _on_push_progress(self, sent: int, total: int, rate: float, eta):
+        """更新 push 進度列（於 Tk 執行緒執行）"""
+        import adb_client
+
+        pct = 100.0 * sent / total if total else 100.0
+        self.push_progress_var.set(pct)
+        self.lbl_push_rate.config(text=self.i18n.t(
+            "upg.push_progress",
+            pct=f"{pct:.1f}",
+            sent=f"{sent / (1024 * 1024):.1f}",
+            total=f"{total / (1024 * 1024):.1f}",
+            rate=adb_client.format_rate(rate),
+            eta=adb_client.format_eta(eta),
+        ))
 
     # DM 檢查功能已移除
 
     def on_list_com_ports(self):
-        """列出所有 COM 埠"""
-        self.logger.log("Scan COM ports...", level="INFO", tab_name="adb")
-        
-        try:
-            import serial.tools.list_ports as list_ports
-            ports = list(list_ports.comports())
-            if not ports:
-                self.logger.warning("No COM ports found", tab_name="adb")
-                return
-            
-            self.logger.log(f"Found {len(ports)} COM ports:", level="INFO", tab_name="adb")
-            for p in ports:
-                line = self._format_port_line(p)
-                self.logger.log(f"  {line}", level="INFO", tab_name="adb")
-                
-        except Exception as e:
-            self.logger.error(f"Scan COM ports failed: {e}", tab_name="adb")
-
-    def _format_port_line(self, port_info):
-        """格式化並清洗單一 COM 埠資訊，避免名稱重複顯示。
-
-        Windows 上 pyserial 的 description 常見為「通訊連接埠 (COM3)」，
-        若再與 device=COM3 拼接，容易出現類似『COM3 - 通訊連接埠 (COM3)』的重複。
-        這裡統一規則：
-        - 主要顯示 device（如 COM3）
-        - 其次顯示描述（去除括號內重複的 device）
-        - 若可取得 VID:PID，附加於末端
-        """
-        try:
-            device = getattr(port_info, "device", "?") or "?"
-            desc = getattr(port_info, "description", "") or ""
-
-            # 去除描述中括號重複的 device，例："(COM3COM3" 或 "(COM3)" 只保留一次
-            if device:
-                desc = desc.replace(f"({device}{device}", f"({device}")
-                # 若有重覆 device 無括號的怪異情形，一併清理
-                while f"{device}{device}" in desc:
-                    desc = desc.replace(f"{device}{device}", device)
-
-            # 1) 以連續兩次出現的裝置名稱為界，保留到第二次裝置名稱結束
-            try:
-                lower_desc = desc.lower()
-                lower_dev = device.lower()
-                first_i = lower_desc.find(lower_dev)
-                if first_i != -1:
-                    second_i = lower_desc.find(lower_dev, first_i + len(device))
-                    if second_i != -1:
-                        desc = desc[: second_i + len(device)]
-            except Exception:
-                pass
-
-            # 2) 若描述中有多段以 " - " 分隔（重複片段），僅保留到第二段開始前
-            try:
-                first_sep = desc.find(" - ")
-                if first_sep != -1:
-                    second_sep = desc.find(" - ", first_sep + 3)
-                    if second_sep != -1:
-                        desc = desc[:second_sep]
-            except Exception:
-                pass
-
-            # 3) 若有右括號，僅保留第一個右括號前的內容（精簡顯示）
-            if ")" in desc:
-                desc = desc.split(")", 1)[0]
-
-            # 組合基本字串
-            parts = [device]
-            if desc and desc.strip().upper() != device.upper():
-                parts.append("- ")
-                parts.append(desc.strip())
-
-            # 附加 VID:PID（若有）
-            vid = getattr(port_info, "vid", None)
-            pid = getattr(port_info, "pid", None)
-            if vid is not None and pid is not None:
-                parts.append(f"  [VID:PID {vid:04X}:{pid:04X}]")
+        """列出所有 COM 埠（顯示背景監控的快取，不在 Tk 執行緒列舉）"""
+        snap = self.port_monitor.snapshot()
+        if snap is None:
+            self.logger.log("Scan COM ports...", level="INFO", tab_name="adb")
+            self.port_monitor.refresh(lambda s: self._call_on_ui(self._render_ports, s))
+            return
+        self._render_ports(snap)
+        # 同時在背景更新一次，下次點擊即為最新
+        self.port_monitor.refresh()
 
-            return "".join(parts)
-        except Exception:
-            # 保底：直接回傳 device 與描述
-            return f"{getattr(port_info, 'device', '?')} - {getattr(port_info, 'description', '')}"
+    def _render_ports(self, snap):
+        if snap is None:
+            self.logger.error(f"Scan COM ports failed: {self.port_monitor.error}", tab_name="adb")
+            return
+        if not snap.ports:
+            self.logger.warning("No COM ports found", tab_name="adb")
+            return
+        self.logger.log(
+            f"Found {len(snap.ports)} COM ports (scanned {snap.age:.1f}s ago in {snap.seconds * 1000:.0f} ms):",
+            level="INFO", tab_name="adb",
+        )
+        for p in snap.ports:
+            line = format_port_line(p)
+            self.logger.log(f"  {line}", level="INFO", tab_name="adb")
+
+    def _on_ports_changed(self, added, removed, snap):
+        """COM 埠增減（Tk 主執行緒）；第一次列舉只更新狀態列不逐一記錄"""
+        if self._ports_seen:
+            for p in removed:
+                self.logger.log(f"COM port removed: {format_port_line(p)}", level="INFO", tab_name="adb")
+            for p in added:
+                self.logger.log(f"COM port added: {format_port_line(p)}", level="INFO", tab_name="adb")
+        self._ports_seen = True
+        self.store.set("dm_ports", tuple(snap.dm_ports()))
 
     def on_clear_adb_logs(self):
         """清空 ADB 標籤頁日誌"""
@@ -887,346 +1169,111 @@ class App(tk.Tk):
         )
         if file_path:
             self.firmware_full.set(file_path)
-            self.firmware_show.set(self._shorten_middle(file_path))
+            self._fit_firmware_path()
+            self.store.set("current.upgrade", os.path.basename(file_path))
             self.logger.log(f"{self.i18n.t('upg.fw_file')} {file_path}", tab_name="upgrade")
+            # 選檔後立即於背景計算雜湊，按下升級時通常已完成
+            import fw_digest
 
-    def _shorten_middle(self, path: str, max_px: int = 520) -> str:
-        """以 Entry 的字體測寬，超出寬度時中間省略顯示。"""
-        try:
-            f = self.firmware_entry.cget("font")
-            font = tkfont.Font(font=f)
-        except Exception:
-            font = tkfont.Font(family="Segoe UI", size=12)
-        txt = path.replace("\\", "/")
-        if font.measure(txt) <= max_px:
-            return txt
-        import os
-        base = os.path.basename(txt)
-        dirn = os.path.dirname(txt)
-        left = dirn
-        right = base
-        sep = "…"
-        s = left + "/" + right
-        # 迭代縮短左側與右側直到寬度符合
-        while font.measure(s) > max_px and len(left) > 1:
-            left = left[: max(1, len(left) // 2)]
-            s = left + sep + "/" + right
-            if font.measure(s) > max_px and len(right) > 8:
-                right = right[-max(8, len(right) - 2) :]
-                s = left + sep + "/" + right
-        return s
-
-    def on_edit_keywords(self):
-        """開啟關鍵字顏色編輯視窗"""
-        KeywordsEditor(self)
+            try:
+                fw_digest.prefetch(
+                    file_path,
+                    on_done=lambda d, p=file_path: self.logger.debug(f"{fw_digest.DEFAULT_ALGO} {os.path.basename(p)} = {d}", tab_name="upgrade"),
+                )
+            except OSError as e:
+                self.logger.warning(f"Digest prefetch failed: {e}", tab_name="upgrade")
+            self._precheck_firmware(file_path)
+
+    def _precheck_firmware(self, file_path: str):
+        """選檔後的快速結構檢查；可選擇於背景做完整 CRC 檢查"""
+        if not self.config_data.get("fw_validate", True):
+            return
+        import fw_validate
 
+        res = fw_validate.validate_structure(file_path, self.config_data.get("fw_expected_members", []))
+        for w in res.warnings:
+            self.logger.warning(w, tab_name="upgrade")
+        if res.ok:
+            self.logger.success(f"Firmware package structure OK ({res.summary()})", tab_name="upgrade")
+        else:
+            for e in res.errors:
+                self.logger.error(e, tab_name="upgrade")
+            return
+        if self.config_data.get("fw_full_crc", False):
+            self.logger.log("Full CRC check started in background...", tab_name="upgrade")
 
-class KeywordsEditor:
-    def __init__(self, parent):
-        self.parent = parent
-        self.i18n = parent.i18n  # 從父視窗取得 i18n 實例
-        self.window = tk.Toplevel(parent)
-        self.window.title(self.i18n.t("keywords.window_title"))
-        self.window.geometry("800x700")  # 增加視窗大小，確保按鈕不被擋住
-        self.window.resizable(True, True)
-        
-        # 設定最小視窗大小，確保按鈕可見
-        self.window.minsize(700, 600)
-        
-        # 設定視窗置中
-        self.window.transient(parent)
-        self.window.grab_set()
-        
-        # 確保視窗不會被主視窗擋住
-        self.window.update_idletasks()
-        x = parent.winfo_x() + (parent.winfo_width() // 2) - (self.window.winfo_width() // 2)
-        y = parent.winfo_y() + (parent.winfo_height() // 2) - (self.window.winfo_height() // 2)
-        self.window.geometry(f"+{x}+{y}")
-        
-        self._build_ui()
-        self._load_keywords()
-        self._setup_shortcuts()
+            def _done(errors, seconds):
+                if errors:
+                    for e in errors:
+                        self.logger.error(f"CRC check: {e}", tab_name="upgrade")
+                else:
+                    self.logger.success(f"Full CRC check passed ({seconds:.1f}s)", tab_name="upgrade")
 
-    def _build_ui(self):
-        # 標題
-        self.title_label = ttk.Label(self.window, text=self.i18n.t("keywords.title"), font=("Segoe UI", 14, "bold"))
-        self.title_label.pack(pady=(20, 10))
+            fw_validate.verify_crc_async(file_path, on_done=_done)
 
-        # 說明文字
-        self.help_label = ttk.Label(self.window, text=self.i18n.t("keywords.help_text"), foreground="gray")
-        self.help_label.pack(pady=(0, 5))
-        
-        # 快捷鍵說明
-        self.shortcuts_label = ttk.Label(self.window, text=self.i18n.t("keywords.shortcuts"), foreground="darkgreen", font=("Segoe UI", 9))
-        self.shortcuts_label.pack(pady=(0, 10))
+    def _entry_font(self, entry) -> tkfont.Font:
+        """Entry 使用的字體物件（具名字體直接取用，字型 +/- 時跟著變）"""
+        name = str(entry.cget("font") or "TkTextFont")
+        try:
+            return tkfont.nametofont(name)
+        except tk.TclError:
+            return tkfont.Font(font=name)
+
+    def _fit_firmware_path(self, _event=None):
+        """依 Entry 目前寬度與字體中間省略顯示韌體路徑；寬度、字體與路徑都沒變時不重算"""
+        path = self.firmware_full.get().replace("\\", "/")
+        width = self.firmware_entry.winfo_width()
+        if width <= 1:
+            return  # 尚未配置版面，等 <Configure>
+        widths = glyph_widths(self._fw_font)
+        key = (path, width, widths)
+        if key == self._fw_fit_key:
+            return
+        self._fw_fit_key = key
+        self.firmware_show.set(elide_middle(path, width - ENTRY_TEXT_PAD_PX, widths) if path else "")
 
-        # 搜尋區域
-        search_frame = ttk.Frame(self.window)
-        search_frame.pack(fill=tk.X, padx=20, pady=(0, 15))  # 增加底部間距
-        
-        self.search_label = ttk.Label(search_frame, text=self.i18n.t("keywords.search_label"))
-        self.search_label.pack(side=tk.LEFT)
-        
-        self.search_var = tk.StringVar()
-        self.search_entry = ttk.Entry(search_frame, textvariable=self.search_var, width=25)  # 增加搜尋框寬度
-        self.search_entry.pack(side=tk.LEFT, padx=(5, 10))
-        self.search_entry.bind('<KeyRelease>', self._on_search_changed)
-        
-        self.search_btn = ttk.Button(search_frame, text=self.i18n.t("keywords.search_btn"), command=self._search_keywords)
-        self.search_btn.pack(side=tk.LEFT, padx=(0, 10))
-        
-        self.clear_btn = ttk.Button(search_frame, text=self.i18n.t("keywords.clear_btn"), command=self._clear_search)
-        self.clear_btn.pack(side=tk.LEFT, padx=(0, 10))
-        
-        # 搜尋結果狀態
-        self.search_status = ttk.Label(search_frame, text="", foreground="blue")
-        self.search_status.pack(side=tk.LEFT, padx=(10, 0))
-
-        # 文字編輯區域
-        text_frame = ttk.Frame(self.window)
-        text_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=(0, 20))
-
-        # 文字編輯器 - 增加最小高度確保可讀性
-        self.text_editor = tk.Text(text_frame, wrap=tk.WORD, font=("Consolas", 10), height=20)
-        self.text_editor.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-
-        # 捲軸
-        scrollbar = ttk.Scrollbar(text_frame, orient=tk.VERTICAL, command=self.text_editor.yview)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        self.text_editor.config(yscrollcommand=scrollbar.set)
-
-        # 按鈕區域 - 修正佈局問題
-        button_frame = ttk.Frame(self.window)
-        button_frame.pack(fill=tk.X, padx=20, pady=(0, 20))
-        
-        # 確保按鈕區域有固定高度，防止被擠壓
-        button_frame.configure(height=80)  # 增加按鈕區域高度
-        button_frame.pack_propagate(False)  # 防止子元件影響父元件大小
+    def on_edit_keywords(self):
+        """開啟關鍵字顏色編輯視窗（第一次使用時才載入）"""
+        from keywords_editor import KeywordsEditor
 
-        # 重新載入按鈕
-        self.reload_btn = ttk.Button(
-            button_frame,
-            text=self.i18n.t("keywords.reload_btn"),
-            command=self._reload_keywords
-        )
-        self.reload_btn.pack(side=tk.LEFT, pady=20)  # 增加垂直間距
+        KeywordsEditor(self)
 
-        # 儲存按鈕
-        self.save_btn = ttk.Button(
-            button_frame,
-            text=self.i18n.t("keywords.save_btn"),
-            style="Handover.TButton",
-            command=self._save_keywords
-        )
-        self.save_btn.pack(side=tk.RIGHT, padx=(10, 0), pady=20)  # 增加垂直間距
 
-        # 取消按鈕
-        self.cancel_btn = ttk.Button(
-            button_frame,
-            text=self.i18n.t("keywords.cancel_btn"),
-            command=self.window.destroy
+def startup_report(runs: int = 5) -> int:
+    """分別以 eager / lazy 分頁模式冷啟動 runs 次，列出首次繪製時間（ms）的中位數與範圍"""
+    import statistics
+    import subprocess
+
+    cmd = [sys.executable] if getattr(sys, "frozen", False) else [sys.executable, os.path.abspath(__file__)]
+    results = {}
+    for mode in ("eager", "lazy"):
+        env = dict(os.environ, **{TAB_MODE_ENV: mode, STARTUP_REPORT_ENV: "1"})
+        samples = []
+        for _ in range(runs):
+            out = subprocess.run(cmd, env=env, capture_output=True, text=True, timeout=60).stdout
+            for line in out.splitlines():
+                if line.startswith("{"):
+                    samples.append(json.loads(line))
+        if not samples:
+            print(f"{mode}: no result (is a display available?)")
+            return 1
+        results[mode] = samples
+        paint = [r["first_paint_ms"] for r in samples]
+        build = [r["build_tabs_ms"] for r in samples]
+        print(
+            f"{mode:5s}: first paint median {statistics.median(paint):7.1f} ms "
+            f"(min {min(paint):.1f}, max {max(paint):.1f}), build tabs median {statistics.median(build):6.1f} ms, runs={len(samples)}"
         )
-        self.cancel_btn.pack(side=tk.RIGHT, pady=20)  # 增加垂直間距
-
-    def _load_keywords(self):
-        """載入 keywords.txt 內容"""
-        try:
-            # 優先使用當前目錄的 keywords.txt
-            keywords_file = os.path.join(os.getcwd(), "keywords.txt")
-            if not os.path.exists(keywords_file):
-                # 如果當前目錄沒有，嘗試使用資源路徑
-                keywords_file = get_resource_path("keywords.txt")
-            
-            if os.path.exists(keywords_file):
-                with open(keywords_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    self.text_editor.delete(1.0, tk.END)
-                    self.text_editor.insert(1.0, content)
-            else:
-                # 如果檔案不存在，顯示預設內容
-                default_content = """# 關鍵字顏色設定檔
-# 格式：關鍵字=顏色代碼
-# 每行一個設定，以 # 開頭的是註解
-
-# 範例：
-adb device=#FF0000
-12345=#0000FF
-SUCCESS=#00FF00
-ERROR=#FF0000"""
-                self.text_editor.delete(1.0, tk.END)
-                self.text_editor.insert(1.0, default_content)
-        except Exception as e:
-            messagebox.showerror(
-                self.i18n.t("common.error"), 
-                self.i18n.t("keywords.load_error", error=str(e))
-            )
-
-    def _reload_keywords(self):
-        """重新載入關鍵字檔案"""
-        self._load_keywords()
-        self._clear_search()  # 清除搜尋結果
-
-    def _on_search_changed(self, event=None):
-        """搜尋框內容改變時的回調"""
-        # 延遲搜尋，避免每次按鍵都搜尋
-        if hasattr(self, '_search_after_id'):
-            self.window.after_cancel(self._search_after_id)
-        self._search_after_id = self.window.after(300, self._search_keywords)
-
-    def _search_keywords(self):
-        """搜尋關鍵字"""
-        search_text = self.search_var.get().strip()
-        if not search_text:
-            self._clear_search()
-            return
-        
-        # 清除之前的高亮
-        self.text_editor.tag_remove("search_highlight", "1.0", tk.END)
-        
-        # 搜尋並高亮
-        start_pos = "1.0"
-        matches = 0
-        
-        while True:
-            # 在文字中搜尋
-            pos = self.text_editor.search(search_text, start_pos, tk.END, nocase=True)
-            if not pos:
-                break
-            
-            # 計算結束位置
-            end_pos = f"{pos}+{len(search_text)}c"
-            
-            # 高亮搜尋結果
-            self.text_editor.tag_add("search_highlight", pos, end_pos)
-            matches += 1
-            
-            # 繼續搜尋下一個
-            start_pos = end_pos
-        
-        # 設定高亮樣式
-        self.text_editor.tag_config("search_highlight", background="yellow", foreground="black")
-        
-        # 更新狀態
-        if matches > 0:
-            self.search_status.config(text=f"找到 {matches} 個結果", foreground="blue")
-            # 滾動到第一個結果
-            first_match = self.text_editor.search(search_text, "1.0", tk.END, nocase=True)
-            if first_match:
-                self.text_editor.see(first_match)
-        else:
-            self.search_status.config(text="未找到結果", foreground="red")
-
-    def _clear_search(self):
-        """清除搜尋結果"""
-        self.search_var.set("")
-        self.text_editor.tag_remove("search_highlight", "1.0", tk.END)
-        self.search_status.config(text="")
-        
-        # 取消延遲搜尋
-        if hasattr(self, '_search_after_id'):
-            self.window.after_cancel(self._search_after_id)
-
-    def _setup_shortcuts(self):
-        """設定快捷鍵"""
-        # Ctrl+F 開啟搜尋
-        self.window.bind('<Control-f>', lambda e: self.search_entry.focus_set())
-        
-        # Ctrl+S 儲存
-        self.window.bind('<Control-s>', lambda e: self._save_keywords())
-        
-        # Escape 清除搜尋
-        self.window.bind('<Escape>', lambda e: self._clear_search())
-        
-        # F3 下一個搜尋結果
-        self.window.bind('<F3>', lambda e: self._find_next())
-        
-        # Shift+F3 上一個搜尋結果
-        self.window.bind('<Shift-F3>', lambda e: self._find_previous())
-
-    def _find_next(self):
-        """搜尋下一個結果"""
-        search_text = self.search_var.get().strip()
-        if not search_text:
-            return
-        
-        # 從當前游標位置搜尋
-        current_pos = self.text_editor.index(tk.INSERT)
-        pos = self.text_editor.search(search_text, current_pos, tk.END, nocase=True)
-        
-        if pos:
-            # 找到結果，移動游標並選中
-            end_pos = f"{pos}+{len(search_text)}c"
-            self.text_editor.mark_set(tk.INSERT, pos)
-            self.text_editor.tag_remove(tk.SEL, "1.0", tk.END)
-            self.text_editor.tag_add(tk.SEL, pos, end_pos)
-            self.text_editor.see(pos)
-        else:
-            # 沒找到，從頭開始搜尋
-            pos = self.text_editor.search(search_text, "1.0", tk.END, nocase=True)
-            if pos:
-                end_pos = f"{pos}+{len(search_text)}c"
-                self.text_editor.mark_set(tk.INSERT, pos)
-                self.text_editor.tag_remove(tk.SEL, "1.0", tk.END)
-                self.text_editor.tag_add(tk.SEL, pos, end_pos)
-                self.text_editor.see(pos)
-
-    def _find_previous(self):
-        """搜尋上一個結果"""
-        search_text = self.search_var.get().strip()
-        if not search_text:
-            return
-        
-        # 從當前游標位置向前搜尋
-        current_pos = self.text_editor.index(tk.INSERT)
-        pos = self.text_editor.search(search_text, current_pos, "1.0", backwards=True, nocase=True)
-        
-        if pos:
-            # 找到結果，移動游標並選中
-            end_pos = f"{pos}+{len(search_text)}c"
-            self.text_editor.mark_set(tk.INSERT, pos)
-            self.text_editor.tag_remove(tk.SEL, "1.0", tk.END)
-            self.text_editor.tag_add(tk.SEL, pos, end_pos)
-            self.text_editor.see(pos)
-        else:
-            # 沒找到，從尾部開始搜尋
-            pos = self.text_editor.search(search_text, tk.END, "1.0", backwards=True, nocase=True)
-            if pos:
-                end_pos = f"{pos}+{len(search_text)}c"
-                self.text_editor.mark_set(tk.INSERT, pos)
-                self.text_editor.tag_remove(tk.SEL, "1.0", tk.END)
-                self.text_editor.tag_add(tk.SEL, pos, end_pos)
-                self.text_editor.see(pos)
-
-    def _save_keywords(self):
-        """儲存關鍵字設定"""
-        try:
-            content = self.text_editor.get(1.0, tk.END)
-            
-            # 使用當前目錄的 keywords.txt，而不是打包後的資源路徑
-            keywords_file = os.path.join(os.getcwd(), "keywords.txt")
-            
-            # 確保目錄存在
-            os.makedirs(os.path.dirname(keywords_file), exist_ok=True)
-            
-            with open(keywords_file, 'w', encoding='utf-8') as f:
-                f.write(content)
-            
-            # 重新載入關鍵字到 logger
-            if hasattr(self.parent, 'logger'):
-                self.parent.logger._load_keywords_from_file()
-            
-            messagebox.showinfo(
-                self.i18n.t("common.info"), 
-                self.i18n.t("keywords.save_success", path=keywords_file)
-            )
-            
-        except Exception as e:
-            messagebox.showerror(
-                self.i18n.t("common.error"), 
-                self.i18n.t("keywords.save_error", error=str(e))
-            )
+    eager = statistics.median(r["first_paint_ms"] for r in results["eager"])
+    lazy = statistics.median(r["first_paint_ms"] for r in results["lazy"])
+    print(f"lazy vs eager: {eager - lazy:+.1f} ms ({(eager - lazy) / eager * 100 if eager else 0:.0f}% faster)")
+    return 0
 
 
 if __name__ == "__main__":
+    if "--startup-report" in sys.argv:
+        i = sys.argv.index("--startup-report")
+        n = int(sys.argv[i + 1]) if len(sys.argv) > i + 1 and sys.argv[i + 1].isdigit() else 5
+        sys.exit(startup_report(n))
     app = App()
     app.mainloop() 
\ No newline at end of file
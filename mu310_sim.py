@@ -0,0 +1,769 @@
+"""
+mu310_sim.py - Virtual MU310 device simulator.
+Purpose: Pretend to be an adb server with N virtual MU310 units (shell, interactive shell, sync push, systemctl/fuser, a /dev/smd7 AT responder) plus pty-backed virtual AT serial ports, with configurable reboot timing and failure injection, so the GUI flows, subprocess_runner and fix_usbcfg can be run and load-tested without hardware on a plain Linux box.
+
+Usage:
+    python mu310_sim.py --devices 100 --port 15037
+    (then export the printed ANDROID_ADB_SERVER_PORT / MU310_EXTRA_PORTS and start main.py)
+    python mu310_sim.py --devices 100 --run upgrade --firmware FW_IMAGE/xxx.bin
+"""
+
+import argparse
+import hashlib
+import os
+import random
+import shlex
+import socket
+import socketserver
+import struct
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+TARGET_QCFG = "0x2c7c,0x0801,2,1,1,0,0,1,0"
+BAD_QCFG = "0x2c7c,0x0801,1,1,1,1,1,0,0"
+SERVICES = ("pega-5GNR-init", "pega-framework-init", "pega-atcmder-init")
+BASE_VERSION = "MU310GLBAR01A01M4G"
+SMALL_FILE_MAX = 64 * 1024
+
+
+class SimConfig:
+    def __init__(self, **kw):
+        self.devices = 4
+        self.port = 15037
+        self.host = "127.0.0.1"
+        self.reboot_s = 5.0  # AT+CFUN=1,1 後離線時間
+        self.fota_delay_s = 2.0  # 送出 AT+QFOTADL 到裝置離線
+        self.fota_s = 20.0  # 刷寫時間（離線）
+        self.bad_usbcfg = 0.0  # 初始 usbcfg 錯誤（adb 不可見）的比例
+        self.push_fail_rate = 0.0  # push 於 DONE 時回 FAIL 的機率
+        self.fota_fail_rate = 0.0  # AT+QFOTADL 不觸發重啟的機率
+        self.at_no_answer_rate = 0.0  # AT 埠完全不回應的裝置比例
+        self.at_latency_s = 0.02  # AT 回應延遲
+        self.usb_mbps = 0.0  # 單台 push 速率上限（MB/s，0=不限）
+        self.with_ptys = True
+        self.seed = None
+        for k, v in kw.items():
+            setattr(self, k, v)
+
+
+# =============== virtual device ===============
+class SimFile:
+    def __init__(self, size: int, md5: str, data: Optional[bytes] = None):
+        self.size = size
+        self.md5 = md5
+        self.data = data
+
+
+class VirtualDevice:
+    def __init__(self, sim: "Simulator", index: int):
+        cfg = sim.cfg
+        self.sim = sim
+        self.index = index
+        self.serial = f"MU310SIM{index:04d}"
+        self.transport_id = index + 1
+        self.usbcfg = BAD_QCFG if sim.rng.random() < cfg.bad_usbcfg else TARGET_QCFG
+        self.pending_usbcfg: Optional[str] = None
+        self.version = BASE_VERSION
+        self.rebooting = False
+        self.files: Dict[str, SimFile] = {}
+        self.running = set(SERVICES)
+        self.at_silent = sim.rng.random() < cfg.at_no_answer_rate
+        self.smd7_readers: List[socket.socket] = []  # 以 adb shell 開著 /dev/smd7 讀取的連線
+        self.stale_smd7_readers = 0  # 連線已關閉但仍留在裝置上的背景 `cat /dev/smd7`
+        self.conns: List[socket.socket] = []
+        self.lock = threading.Lock()
+        self.modem = None  # at_modem_emulator.ScriptedModem
+
+    @property
+    def adb_visible(self) -> bool:
+        fields = self.usbcfg.split(",")
+        adb_on = len(fields) > 7 and fields[7] == "1"
+        return adb_on and not self.rebooting
+
+    def attach(self, conn: socket.socket):
+        with self.lock:
+            self.conns.append(conn)
+
+    def detach(self, conn: socket.socket):
+        with self.lock:
+            if conn in self.conns:
+                self.conns.remove(conn)
+
+    def reboot(self, offline_s: float, delay_s: float = 0.0, on_back=None):
+        """模擬重啟：delay_s 後離線（中斷所有連線），offline_s 後重新列舉"""
+
+        def _down():
+            with self.lock:
+                self.rebooting = True
+                conns, self.conns = self.conns, []
+            for c in conns:
+                try:
+                    c.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+            self.sim.notify()
+            threading.Timer(offline_s, _up).start()
+
+        def _up():
+            if self.pending_usbcfg:
+                self.usbcfg, self.pending_usbcfg = self.pending_usbcfg, None
+            if on_back:
+                on_back()
+            self.running = set(SERVICES)
+            self.stale_smd7_readers = 0
+            self.rebooting = False
+            self.sim.notify()
+
+        threading.Timer(delay_s, _down).start()
+
+    # ---- AT 指令（/dev/smd7 與 pty 共用） ----
+    def at_command(self, line: str) -> Optional[str]:
+        """處理單一 AT 指令並回傳完整回應（含最終結果碼）；不回應時回傳 None"""
+        cmd = line.strip()
+        up = cmd.upper()
+        if not up.startswith("AT"):
+            return None
+        if up in ("AT", "ATE0", "ATE1"):
+            return "\r\nOK\r\n"
+        if up == "ATI":
+            return f"\r\nQuectel\r\nMU310\r\nRevision: {self.version}\r\n\r\nOK\r\n"
+        if up in ("AT+QGMR", "AT+GMR", "AT+CGMR"):
+            return f"\r\n{self.version}\r\n\r\nOK\r\n"
+        if up == 'AT+QCFG="USBCFG"':
+            return f'\r\n+QCFG: "usbcfg",{self.usbcfg}\r\n\r\nOK\r\n'
+        if up.startswith('AT+QCFG="USBCFG",'):
+            self.pending_usbcfg = cmd.split(",", 1)[1]
+            return "\r\nOK\r\n"
+        if up == "AT+CFUN=1,1":
+            self.reboot(self.sim.cfg.reboot_s, delay_s=0.2)
+            return "\r\nOK\r\n"
+        if up.startswith("AT+QFOTADL="):
+            path = cmd.split("=", 1)[1].strip().strip('"')
+            f = self.files.get(path)
+            if f is None or "pega-atcmder-init" in self.running:
+                return "\r\n+CME ERROR: 601\r\n"
+            if self.sim.rng.random() < self.sim.cfg.fota_fail_rate:
+                return "\r\nOK\r\n"  # 回 OK 但不重啟（模擬 FOTA 未啟動）
+            new_version = f"{BASE_VERSION}_{f.md5[:6].upper()}"
+
+            def _flashed():
+                self.version = new_version
+
+            self.reboot(self.sim.cfg.fota_s, delay_s=self.sim.cfg.fota_delay_s, on_back=_flashed)
+            return '\r\nOK\r\n\r\n+QIND: "FOTA","START"\r\n'
+        return "\r\nERROR\r\n"
+
+    def smd7_write(self, data: bytes):
+        # pega-atcmder-init 執行中時通道由服務佔用：寫入的指令被服務讀走，讀取端收不到回應
+        if "pega-atcmder-init" in self.running:
+            return
+        for line in data.decode(errors="ignore").replace("\n", "\r").split("\r"):
+            if not line.strip():
+                continue
+            resp = self.at_command(line)
+            if resp:
+                with self.lock:
+                    stale = self.stale_smd7_readers > 0
+                    if stale:
+                        self.stale_smd7_readers -= 1
+                if stale:
+                    # 殘留的 cat 先讀走回應，寫回已關閉的連線時失敗（SIGPIPE）才結束
+                    continue
+                # 沒有人讀取 /dev/smd7 時回應直接丟棄（與 printf 盲寫相同）
+                for conn in list(self.smd7_readers):
+                    try:
+                        conn.sendall(resp.encode())
+                    except OSError:
+                        pass
+
+
+# =============== virtual AT serial port (pty) ===============
+def _make_modem(device: VirtualDevice):
+    """裝置的 pty AT 埠：回應由 VirtualDevice 處理（與 /dev/smd7 共用狀態）"""
+    from at_modem_emulator import ModemBehavior, ScriptedModem
+
+    def _handler(line: str) -> Optional[str]:
+        if device.rebooting or device.at_silent:
+            return None
+        return device.at_command(line)
+
+    return ScriptedModem(behavior=ModemBehavior(latency_s=device.sim.cfg.at_latency_s), handler=_handler)
+
+
+# =============== mini shell ===============
+def _split_statements(line: str) -> List[str]:
+    out, cur, quote = [], [], None
+    for ch in line:
+        if quote:
+            cur.append(ch)
+            if ch == quote:
+                quote = None
+        elif ch in ("'", '"'):
+            quote = ch
+            cur.append(ch)
+        elif ch in (";", "\n"):
+            out.append("".join(cur))
+            cur = []
+        else:
+            cur.append(ch)
+    out.append("".join(cur))
+    return [s.strip() for s in out if s.strip()]
+
+
+def _split_redirect(stmt: str) -> Tuple[str, Optional[str]]:
+    stmt = stmt.replace("2>/dev/null", "").replace("2>&1", "")
+    quote = None
+    for i, ch in enumerate(stmt):
+        if quote:
+            if ch == quote:
+                quote = None
+        elif ch in ("'", '"'):
+            quote = ch
+        elif ch == ">":
+            target = stmt[i + 1:].lstrip(">").strip()
+            return stmt[:i].strip(), target
+    return stmt.strip(), None
+
+
+def _unescape(s: str) -> str:
+    return s.replace("\\r", "\r").replace("\\n", "\n").replace('\\"', '"').replace("\\\\", "\\")
+
+
+def _printf(fmt: str, args: List[str]) -> str:
+    fmt = _unescape(fmt)
+    out, i, ai = [], 0, 0
+    while i < len(fmt):
+        ch = fmt[i]
+        if ch == "%" and i + 1 < len(fmt):
+            spec = fmt[i + 1]
+            if spec == "%":
+                out.append("%")
+            else:
+                arg = args[ai] if ai < len(args) else ""
+                ai += 1
+                out.append(str(int(arg or 0)) if spec == "d" else arg)
+            i += 2
+            continue
+        out.append(ch)
+        i += 1
+    return "".join(out)
+
+
+class MiniShell:
+    """足以執行燒錄流程指令的極簡 sh"""
+
+    def __init__(self, device: VirtualDevice):
+        self.dev = device
+        self.rc = 0
+        self.echo = True  # pty 模式的互動 shell 預設會回顯，stty -echo 後關閉
+        self.prompt = "/ # "
+
+    def run_line(self, line: str) -> str:
+        out = []
+        for stmt in _split_statements(line):
+            out.append(self._run_stmt(stmt))
+        return "".join(out)
+
+    def _run_stmt(self, stmt: str) -> str:
+        cmd, target = _split_redirect(stmt)
+        cmd = cmd.replace("$?", str(self.rc))
+        if "=" in cmd.split(" ", 1)[0] and not cmd.startswith("="):
+            name, _, value = cmd.partition("=")
+            if name in ("PS1",):
+                self.prompt = value.strip("'\"")
+            self.rc = 0
+            return ""
+        try:
+            argv = shlex.split(cmd)
+        except ValueError:
+            self.rc = 2
+            return "sh: syntax error\n"
+        if not argv:
+            return ""
+        rc, out = self._exec(argv)
+        self.rc = rc
+        if target is not None:
+            if target == "/dev/null":
+                return ""
+            if target == "/dev/smd7":
+                self.dev.smd7_write(out.encode())
+                return ""
+            if not target.startswith("/usrdata/"):
+                self.rc = 1
+                return f"sh: can't create {target}: Read-only file system\n"
+            data = out.encode()
+            self.dev.files[target] = SimFile(len(data), hashlib.md5(data).hexdigest(), data)
+            return ""
+        return out
+
+    def _exec(self, argv: List[str]) -> Tuple[int, str]:
+        name, args = argv[0], argv[1:]
+        dev = self.dev
+        if name == "echo":
+            return 0, " ".join(args) + "\n"
+        if name == "printf":
+            return 0, _printf(args[0], args[1:]) if args else ""
+        if name in ("sync", "true", "export", "stty", ":"):
+            return 0, ""
+        if name == "false":
+            return 1, ""
+        if name == "sleep":
+            time.sleep(min(float(args[0]) if args else 0, 5.0))
+            return 0, ""
+        if name == "systemctl" and len(args) >= 2:
+            action, svc = args[0], args[1]
+            if svc not in SERVICES:
+                return 5, f"Failed to {action} {svc}.service: Unit {svc}.service not loaded.\n"
+            if action == "stop":
+                dev.running.discard(svc)
+            elif action in ("start", "restart"):
+                dev.running.add(svc)
+            elif action == "is-active":
+                return (0, "active\n") if svc in dev.running else (3, "inactive\n")
+            return 0, ""
+        if name == "fuser":
+            if args and args[0] == "/dev/smd7" and "pega-atcmder-init" in dev.running:
+                return 0, "/dev/smd7:  1234\n"
+            return 1, ""
+        if name in ("md5sum", "sha256sum"):
+            if not args or args[0] not in dev.files:
+                return 1, f"{name}: {args[0] if args else ''}: No such file or directory\n"
+            if name == "sha256sum":
+                return 1, "sha256sum: not supported by simulator\n"
+            return 0, f"{dev.files[args[0]].md5}  {args[0]}\n"
+        if name == "rm":
+            for p in args:
+                if not p.startswith("-"):
+                    dev.files.pop(p, None)
+            return 0, ""
+        if name == "cat" and args:
+            f = dev.files.get(args[0])
+            if f is None or f.data is None:
+                return 1, f"cat: {args[0]}: No such file or directory\n"
+            return 0, f.data.decode(errors="ignore")
+        if name == "ls":
+            return 0, "".join(p + "\n" for p in sorted(dev.files))
+        return 127, f"sh: {name}: not found\n"
+
+
+# =============== adb server ===============
+def _rx(conn: socket.socket, n: int) -> bytes:
+    buf = bytearray()
+    while len(buf) < n:
+        chunk = conn.recv(n - len(buf))
+        if not chunk:
+            raise EOFError
+        buf += chunk
+    return bytes(buf)
+
+
+def _okay_payload(text: str) -> bytes:
+    data = text.encode()
+    return b"OKAY" + b"%04x" % len(data) + data
+
+
+def _fail(msg: str) -> bytes:
+    data = msg.encode()
+    return b"FAIL" + b"%04x" % len(data) + data
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    def handle(self):
+        sim: Simulator = self.server.sim  # type: ignore[attr-defined]
+        conn: socket.socket = self.request
+        conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        device: Optional[VirtualDevice] = None
+        try:
+            while True:
+                size = int(_rx(conn, 4), 16)
+                service = _rx(conn, size).decode(errors="ignore")
+                if device is None:
+                    if service == "host:version":
+                        conn.sendall(_okay_payload("0029"))
+                        return
+                    if service in ("host:devices", "host:devices-l"):
+                        conn.sendall(_okay_payload(sim.device_list(service.endswith("-l"))))
+                        return
+                    if service in ("host:track-devices", "host:track-devices-l"):
+                        conn.sendall(b"OKAY")
+                        sim.track(conn, service.endswith("-l"))
+                        return
+                    if service == "host:kill":
+                        conn.sendall(b"OKAY")
+                        return
+                    if service.endswith(":features") or service == "host:host-features":
+                        conn.sendall(_okay_payload(""))
+                        return
+                    target, with_id = sim.resolve_transport(service)
+                    if target is None:
+                        conn.sendall(_fail(with_id or f"unknown host service '{service}'"))
+                        return
+                    device = target
+                    conn.sendall(b"OKAY" + (struct.pack("<Q", device.transport_id) if with_id else b""))
+                    continue
+                device.attach(conn)
+                try:
+                    self._device_service(device, service, conn)
+                finally:
+                    device.detach(conn)
+                return
+        except (EOFError, OSError, ValueError):
+            return
+
+    def _device_service(self, dev: VirtualDevice, service: str, conn: socket.socket):
+        if service.startswith("shell:") and "cat /dev/smd7 &" in service and "cat > /dev/smd7" in service:
+            conn.sendall(b"OKAY")
+            self._smd7_bridge(dev, conn, service)
+            return
+        if service.startswith("shell:") and service != "shell:":
+            conn.sendall(b"OKAY")
+            conn.sendall(MiniShell(dev).run_line(service[len("shell:"):]).encode())
+            return
+        if service == "shell:":
+            conn.sendall(b"OKAY")
+            self._interactive(dev, conn)
+            return
+        if service == "sync:":
+            conn.sendall(b"OKAY")
+            self._sync(dev, conn)
+            return
+        if service.startswith("exec:"):
+            conn.sendall(b"OKAY")
+            conn.sendall(MiniShell(dev).run_line(service[len("exec:"):]).encode())
+            return
+        conn.sendall(_fail(f"unsupported service '{service}'"))
+
+    def _smd7_bridge(self, dev: VirtualDevice, conn: socket.socket, service: str):
+        """`cat /dev/smd7 & ... cat > /dev/smd7`：socket 輸入寫入 AT 通道，回應送回 socket
+
+        指令沒有在結束時 kill 背景 cat 時，連線關閉後該 cat 仍留在裝置上，會讀走下一個回應。
+        """
+        cleans_up = "kill $" in service
+        dev.smd7_readers.append(conn)
+        try:
+            while True:
+                try:
+                    chunk = conn.recv(4096)
+                except OSError:
+                    chunk = b""
+                if not chunk:
+                    return
+                dev.smd7_write(chunk)
+        finally:
+            if conn in dev.smd7_readers:
+                dev.smd7_readers.remove(conn)
+            if not cleans_up and not dev.rebooting:
+                with dev.lock:
+                    dev.stale_smd7_readers += 1
+
+    def _interactive(self, dev: VirtualDevice, conn: socket.socket):
+        sh = MiniShell(dev)
+        conn.sendall(sh.prompt.encode())
+        buf = b""
+        while True:
+            chunk = conn.recv(65536)
+            if not chunk:
+                return
+            buf += chunk
+            while b"\n" in buf:
+                raw, buf = buf.split(b"\n", 1)
+                line = raw.decode(errors="ignore").rstrip("\r")
+                out = ""
+                if sh.echo:
+                    out += line + "\r\n"
+                if line.strip() == "exit":
+                    conn.sendall(out.encode())
+                    return
+                if "stty -echo" in line:
+                    sh.echo = False
+                result = sh.run_line(line)
+                out += result.replace("\n", "\r\n") + sh.prompt
+                conn.sendall(out.encode())
+
+    def _sync(self, dev: VirtualDevice, conn: socket.socket):
+        cfg = dev.sim.cfg
+        while True:
+            tag = _rx(conn, 4)
+            size = struct.unpack("<I", _rx(conn, 4))[0]
+            if tag == b"QUIT":
+                return
+            if tag == b"STAT":
+                path = _rx(conn, size).decode(errors="ignore")
+                f = dev.files.get(path)
+                conn.sendall(b"STAT" + struct.pack("<III", 0o100644 if f else 0, f.size if f else 0, int(time.time()) if f else 0))
+                continue
+            if tag != b"SEND":
+                conn.sendall(b"FAIL" + struct.pack("<I", 14) + b"bad sync id!!!")
+                return
+            spec = _rx(conn, size).decode(errors="ignore")
+            path = spec.rsplit(",", 1)[0]
+            md5 = hashlib.md5()
+            total = 0
+            small = bytearray()
+            t0 = time.perf_counter()
+            while True:
+                tag = _rx(conn, 4)
+                size = struct.unpack("<I", _rx(conn, 4))[0]
+                if tag == b"DATA":
+                    data = _rx(conn, size)
+                    md5.update(data)
+                    if total < SMALL_FILE_MAX:
+                        small += data[:SMALL_FILE_MAX - total]
+                    total += size
+                    if cfg.usb_mbps > 0:
+                        # 限速：以累計位元組對應的理想時間為基準
+                        ahead = total / (cfg.usb_mbps * 1024 * 1024) - (time.perf_counter() - t0)
+                        if ahead > 0:
+                            time.sleep(ahead)
+                    continue
+                if tag == b"DONE":
+                    if dev.sim.rng.random() < cfg.push_fail_rate:
+                        msg = b"simulated write failure"
+                        conn.sendall(b"FAIL" + struct.pack("<I", len(msg)) + msg)
+                        break
+                    dev.files[path] = SimFile(total, md5.hexdigest(), bytes(small) if total <= SMALL_FILE_MAX else None)
+                    conn.sendall(b"OKAY" + struct.pack("<I", 0))
+                    break
+                return
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 256
+
+
+class Simulator:
+    def __init__(self, cfg: SimConfig):
+        self.cfg = cfg
+        self.rng = random.Random(cfg.seed)
+        self.devices = [VirtualDevice(self, i) for i in range(cfg.devices)]
+        self._by_serial = {d.serial: d for d in self.devices}
+        self._cond = threading.Condition()
+        self._generation = 0
+        self.server: Optional[_Server] = None
+        self.modems = None  # at_modem_emulator.ModemBank
+        self._stop = threading.Event()
+
+    # ---- 裝置清單 ----
+    def device_list(self, long: bool = False) -> str:
+        lines = []
+        for d in self.devices:
+            if d.adb_visible:
+                extra = f" product:mu310 model:MU310 device:mu310 transport_id:{d.transport_id}" if long else ""
+                lines.append(f"{d.serial}\tdevice{extra}\n")
+        return "".join(lines)
+
+    def notify(self):
+        with self._cond:
+            self._generation += 1
+            self._cond.notify_all()
+
+    def track(self, conn: socket.socket, long: bool):
+        """track-devices：清單變化時推送完整清單，直到對方斷線"""
+        last = None
+        gen = -1
+        while not self._stop.is_set():
+            with self._cond:
+                if gen == self._generation:
+                    self._cond.wait(timeout=1.0)
+                gen = self._generation
+            text = self.device_list(long)
+            if text != last:
+                last = text
+                data = text.encode()
+                conn.sendall(b"%04x" % len(data) + data)
+
+    def resolve_transport(self, service: str) -> Tuple[Optional[VirtualDevice], Optional[str]]:
+        """回傳 (裝置, 是否回傳 transport id)；找不到時回傳 (None, 錯誤訊息)"""
+        with_id = service.startswith("host:tport:")
+        if service.startswith("host:tport:"):
+            service = "host:transport" + service[len("host:tport"):].replace("serial:", ":", 1).replace("any", "-any", 1)
+        visible = [d for d in self.devices if d.adb_visible]
+        if service in ("host:transport-any", "host:transport-usb", "host:transport:-any"):
+            if not visible:
+                return None, "no devices/emulators found"
+            if len(visible) > 1:
+                return None, "more than one device/emulator"
+            return visible[0], "id" if with_id else None
+        if service.startswith("host:transport-id:"):
+            tid = int(service.rsplit(":", 1)[1])
+            dev = next((d for d in visible if d.transport_id == tid), None)
+        elif service.startswith("host:transport:"):
+            dev = self._by_serial.get(service[len("host:transport:"):])
+            dev = dev if dev is not None and dev.adb_visible else None
+        else:
+            return None, None
+        if dev is None:
+            return None, "device not found"
+        return dev, "id" if with_id else None
+
+    # ---- 啟動/停止 ----
+    def start(self):
+        self.server = _Server((self.cfg.host, self.cfg.port), _Handler)
+        self.server.sim = self  # type: ignore[attr-defined]
+        self.cfg.port = self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        if self.cfg.with_ptys and hasattr(os, "openpty"):
+            from at_modem_emulator import ModemBank
+
+            self.modems = ModemBank()
+            for d in self.devices:
+                d.modem = self.modems.add(_make_modem(d))
+            self.modems.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self.notify()
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+        if self.modems is not None:
+            self.modems.stop()
+
+    def env(self) -> Dict[str, str]:
+        env = {"ANDROID_ADB_SERVER_PORT": str(self.cfg.port)}
+        ports = [d.modem.path for d in self.devices if d.modem is not None]
+        if ports:
+            env["MU310_EXTRA_PORTS"] = os.pathsep.join(ports)
+        return env
+
+
+# =============== load driver ===============
+class _PrintLogger:
+    """與 GuiLogger 介面相容的簡易 logger（終端輸出 + 收集 RECORD）"""
+
+    def __init__(self, verbose: bool = False):
+        self.debug_enabled = False
+        self.verbose = verbose
+        self.records: List[Tuple[str, dict]] = []
+        self._lock = threading.Lock()
+
+    def log(self, message, *, level="INFO", tab_name: str = "all"):
+        if self.verbose or level in ("ERROR", "WARNING"):
+            with self._lock:
+                print(f"[{time.strftime('%H:%M:%S')}] {level}: [{tab_name}] {message}", flush=True)
+
+    def debug(self, message, tab_name: str = "all"):
+        pass
+
+    def error(self, message, tab_name: str = "all"):
+        self.log(message, level="ERROR", tab_name=tab_name)
+
+    def warning(self, message, tab_name: str = "all"):
+        self.log(message, level="WARNING", tab_name=tab_name)
+
+    def success(self, message, tab_name: str = "all"):
+        self.log(message, level="SUCCESS", tab_name=tab_name)
+
+    def record(self, event: str, **fields):
+        with self._lock:
+            self.records.append((event, fields))
+
+
+def run_upgrade_load(sim: Simulator, firmware: str, verbose: bool = False) -> int:
+    """對所有可見裝置平行執行燒錄流程，輸出每台 push 速率與總耗時"""
+    os.environ["ANDROID_ADB_SERVER_PORT"] = str(sim.cfg.port)
+    from burn_in_flow import BurnInFlow
+
+    logger = _PrintLogger(verbose)
+    targets = [d for d in sim.devices if d.adb_visible]
+    codes: Dict[str, int] = {}
+
+    def _one(dev: VirtualDevice):
+        # 版本查詢經由該序號的 /dev/smd7 adb shell 通道，與實機相同
+        flow = BurnInFlow(firmware, logger, tab_name=dev.serial, serial=dev.serial, restart_server=False,
+                          drop_timeout=sim.cfg.fota_delay_s + 30, return_timeout=sim.cfg.fota_s + 60)
+        codes[dev.serial] = flow.run()
+
+    serials = [d.serial for d in targets]
+    t0 = time.perf_counter()
+    threads = [threading.Thread(target=_one, args=(d,), daemon=True) for d in targets]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+    pushes = [f for e, f in logger.records if e == "push" and not f.get("skipped")]
+    ok = sum(1 for c in codes.values() if c == 0)
+    flashed = sum(1 for d in targets if d.version != BASE_VERSION)
+    print(f"devices={len(serials)} pass={ok} fail={len(serials) - ok} flashed={flashed} wall={elapsed:.1f}s")
+    if pushes:
+        rates = sorted(p["mb_per_s"] for p in pushes)
+        print(f"push MB/s: min={rates[0]:.2f} median={rates[len(rates) // 2]:.2f} max={rates[-1]:.2f}")
+    return 0 if ok == len(serials) else 1
+
+
+def run_usbcfg_load(sim: Simulator) -> int:
+    """對每個虛擬 AT 埠平行執行 fix_usbcfg 偵測與修正"""
+    import fix_usbcfg
+
+    ports = [fix_usbcfg.PathPort(d.modem.path) for d in sim.devices if d.modem is not None]
+    results: Dict[str, bool] = {}
+
+    def _one(port):
+        results[port.device] = fix_usbcfg.is_at_port(port)
+        if results[port.device]:
+            fix_usbcfg.fix_usbcfg(port)
+
+    t0 = time.perf_counter()
+    threads = [threading.Thread(target=_one, args=(p,), daemon=True) for p in ports]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    print(f"ports={len(ports)} at_ok={sum(results.values())} wall={time.perf_counter() - t0:.1f}s")
+    return 0
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="MU310 virtual device simulator (fake adb server + pty AT ports)")
+    ap.add_argument("--devices", type=int, default=4)
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=15037, help="adb server port (0 = any free port)")
+    ap.add_argument("--reboot", type=float, default=5.0, help="seconds offline after AT+CFUN=1,1")
+    ap.add_argument("--fota-delay", type=float, default=2.0)
+    ap.add_argument("--fota", type=float, default=20.0, help="seconds offline while flashing")
+    ap.add_argument("--bad-usbcfg", type=float, default=0.0, help="fraction of units starting with adb disabled")
+    ap.add_argument("--push-fail", type=float, default=0.0)
+    ap.add_argument("--fota-fail", type=float, default=0.0)
+    ap.add_argument("--at-silent", type=float, default=0.0, help="fraction of AT ports that never answer")
+    ap.add_argument("--at-latency", type=float, default=0.02)
+    ap.add_argument("--usb-mbps", type=float, default=0.0)
+    ap.add_argument("--no-pty", action="store_true")
+    ap.add_argument("--seed", type=int)
+    ap.add_argument("--run", choices=("upgrade", "usbcfg"), help="run a load test against the simulator and exit")
+    ap.add_argument("--firmware")
+    ap.add_argument("-v", "--verbose", action="store_true")
+    a = ap.parse_args(argv)
+
+    cfg = SimConfig(
+        devices=a.devices, host=a.host, port=a.port, reboot_s=a.reboot, fota_delay_s=a.fota_delay, fota_s=a.fota,
+        bad_usbcfg=a.bad_usbcfg, push_fail_rate=a.push_fail, fota_fail_rate=a.fota_fail,
+        at_no_answer_rate=a.at_silent, at_latency_s=a.at_latency, usb_mbps=a.usb_mbps,
+        with_ptys=not a.no_pty, seed=a.seed,
+    )
+    sim = Simulator(cfg).start()
+    try:
+        if a.run == "upgrade":
+            if not a.firmware:
+                ap.error("--run upgrade requires --firmware")
+            return run_upgrade_load(sim, a.firmware, a.verbose)
+        if a.run == "usbcfg":
+            return run_usbcfg_load(sim)
+        for k, v in sim.env().items():
+            print(f"export {k}={shlex.quote(v)}")
+        print(f"# {cfg.devices} virtual MU310 units on {cfg.host}:{cfg.port}, Ctrl+C to stop", file=sys.stderr)
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        sim.stop()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
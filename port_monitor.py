@@ -0,0 +1,192 @@
+"""
+port_monitor.py - Background serial port monitor.
+Purpose: Enumerate COM ports on a worker thread at a fixed interval (or on demand), cache the latest port table and report added/removed ports, so the GUI can render the port list instantly and follow DM/AT ports appearing and disappearing without blocking the Tk thread.
+"""
+
+import re
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+DEFAULT_INTERVAL = 2.0
+QUECTEL_VID = 0x2C7C
+# Quectel 模組的 USB 介面 0 為 DM（診斷）埠
+DM_INTERFACE = 0
+_DM_DESC_RE = re.compile(r"\bDM\b|Diagnostics", re.IGNORECASE)
+
+
+def _default_enumerate():
+    from fix_usbcfg import candidate_ports
+
+    return candidate_ports()
+
+
+def port_key(port) -> Tuple[str, str]:
+    return (port.device, getattr(port, "hwid", "") or "")
+
+
+def is_dm_port(port) -> bool:
+    """以描述（"Quectel USB DM Port"）或 Quectel VID + 介面 0 判定 DM 埠"""
+    if _DM_DESC_RE.search(getattr(port, "description", "") or ""):
+        return True
+    if getattr(port, "vid", None) == QUECTEL_VID:
+        m = re.search(r":[^:]*\.(\d+)$", getattr(port, "location", None) or "")
+        return bool(m) and int(m.group(1)) == DM_INTERFACE
+    return False
+
+
+def format_port_line(port_info) -> str:
+    """格式化並清洗單一 COM 埠資訊，避免名稱重複顯示。
+
+    Windows 上 pyserial 的 description 常見為「通訊連接埠 (COM3)」，
+    若再與 device=COM3 拼接，容易出現類似『COM3 - 通訊連接埠 (COM3)』的重複。
+    這裡統一規則：
+    - 主要顯示 device（如 COM3）
+    - 其次顯示描述（去除括號內重複的 device）
+    - 若可取得 VID:PID，附加於末端
+    """
+    try:
+        device = getattr(port_info, "device", "?") or "?"
+        desc = getattr(port_info, "description", "") or ""
+
+        # 去除描述中括號重複的 device，例："(COM3COM3" 或 "(COM3)" 只保留一次
+        if device:
+            desc = desc.replace(f"({device}{device}", f"({device}")
+            # 若有重覆 device 無括號的怪異情形，一併清理
+            while f"{device}{device}" in desc:
+                desc = desc.replace(f"{device}{device}", device)
+
+        # 1) 以連續兩次出現的裝置名稱為界，保留到第二次裝置名稱結束
+        try:
+            lower_desc = desc.lower()
+            lower_dev = device.lower()
+            first_i = lower_desc.find(lower_dev)
+            if first_i != -1:
+                second_i = lower_desc.find(lower_dev, first_i + len(device))
+                if second_i != -1:
+                    desc = desc[: second_i + len(device)]
+        except Exception:
+            pass
+
+        # 2) 若描述中有多段以 " - " 分隔（重複片段），僅保留到第二段開始前
+        try:
+            first_sep = desc.find(" - ")
+            if first_sep != -1:
+                second_sep = desc.find(" - ", first_sep + 3)
+                if second_sep != -1:
+                    desc = desc[:second_sep]
+        except Exception:
+            pass
+
+        # 3) 若有右括號，僅保留第一個右括號前的內容（精簡顯示）
+        if ")" in desc:
+            desc = desc.split(")", 1)[0]
+
+        # 組合基本字串
+        parts = [device]
+        if desc and desc.strip().upper() != device.upper():
+            parts.append("- ")
+            parts.append(desc.strip())
+
+        # 附加 VID:PID（若有）
+        vid = getattr(port_info, "vid", None)
+        pid = getattr(port_info, "pid", None)
+        if vid is not None and pid is not None:
+            parts.append(f"  [VID:PID {vid:04X}:{pid:04X}]")
+
+        return "".join(parts)
+    except Exception:
+        # 保底：直接回傳 device 與描述
+        return f"{getattr(port_info, 'device', '?')} - {getattr(port_info, 'description', '')}"
+
+
+class PortSnapshot:
+    def __init__(self, ports: list, seconds: float):
+        self.ports = ports
+        self.seconds = seconds  # 本次列舉耗時
+        self.taken_at = time.monotonic()
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.taken_at
+
+    def dm_ports(self) -> List[str]:
+        return [p.device for p in self.ports if is_dm_port(p)]
+
+
+class PortMonitor:
+    """背景列舉 COM 埠並快取；有增減時呼叫 on_change(added, removed, snapshot)
+
+    第一次列舉時 added 為全部埠。回呼在監控執行緒上執行，GUI 需自行以 after() 轉回主執行緒。
+    """
+
+    def __init__(
+        self,
+        interval: float = DEFAULT_INTERVAL,
+        on_change: Optional[Callable[[list, list, PortSnapshot], None]] = None,
+        enumerate_ports: Callable[[], list] = _default_enumerate,
+    ):
+        self.interval = interval
+        self.on_change = on_change
+        self.enumerate_ports = enumerate_ports
+        self.error: Optional[str] = None
+        self._snapshot: Optional[PortSnapshot] = None
+        self._waiters: List[Callable[[PortSnapshot], None]] = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="port-monitor", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def snapshot(self) -> Optional[PortSnapshot]:
+        """最近一次列舉結果（尚未完成第一次列舉時為 None）"""
+        return self._snapshot
+
+    def refresh(self, callback: Optional[Callable[[PortSnapshot], None]] = None):
+        """立即重新列舉；callback 於下一次列舉完成後呼叫一次（列舉失敗且無快取時參數為 None）"""
+        if callback is not None:
+            with self._lock:
+                self._waiters.append(callback)
+        self._wake.set()
+
+    def _scan(self):
+        t0 = time.perf_counter()
+        try:
+            ports = list(self.enumerate_ports())
+            self.error = None
+        except Exception as e:
+            # pyserial 缺少或列舉失敗：保留上一份快取
+            self.error = str(e)
+            ports = None
+        with self._lock:
+            waiters, self._waiters = self._waiters, []
+        if ports is None:
+            for cb in waiters:
+                cb(self._snapshot)
+            return
+        snap = PortSnapshot(ports, time.perf_counter() - t0)
+        prev = self._snapshot
+        self._snapshot = snap
+        before: Dict[Tuple[str, str], object] = {port_key(p): p for p in prev.ports} if prev else {}
+        after = {port_key(p): p for p in ports}
+        added = [p for k, p in after.items() if k not in before]
+        removed = [p for k, p in before.items() if k not in after]
+        if (added or removed or prev is None) and self.on_change is not None:
+            self.on_change(added, removed, snap)
+        for cb in waiters:
+            cb(snap)
+
+    def _loop(self):
+        while not self._stop.is_set():
+            self._scan()
+            self._wake.wait(self.interval)
+            self._wake.clear()
@@ -0,0 +1,147 @@
+"""
+startup_trace.py - Opt-in startup profiler.
+Purpose: When enabled (MU310_STARTUP_TRACE=1 or "startup_trace": true in config.json), time every module import and the named startup phases (config load, font/style init, keyword loading, widget construction) and write a per-launch report to logs/startup_YYYYMMDD_HHMMSS.trace once the window has first painted.
+"""
+
+import builtins
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import List, Optional, Tuple
+
+TRACE_ENV = "MU310_STARTUP_TRACE"
+CONFIG_KEY = "startup_trace"
+TOP_IMPORTS = 25
+
+_t0: Optional[float] = None
+_orig_import = None
+_local = threading.local()
+_lock = threading.Lock()
+# (起點 ms, 耗時 ms, 深度, 名稱, 執行緒)
+_imports: List[Tuple[float, float, int, str, str]] = []
+_phases: List[Tuple[float, float, int, str]] = []
+_marks: List[Tuple[float, str]] = []
+_phase_depth = 0
+_done = False
+
+
+def enabled() -> bool:
+    return _t0 is not None and not _done
+
+
+def _now_ms() -> float:
+    return (time.perf_counter() - _t0) * 1000
+
+
+def _traced_import(name, globals=None, locals=None, fromlist=(), level=0):
+    # 已載入的模組直接返回；只記錄確實載入新模組的 import
+    if level == 0 and not fromlist and name in sys.modules:
+        return _orig_import(name, globals, locals, fromlist, level)
+    depth = getattr(_local, "depth", 0)
+    _local.depth = depth + 1
+    before = len(sys.modules)
+    start = _now_ms()
+    try:
+        return _orig_import(name, globals, locals, fromlist, level)
+    finally:
+        _local.depth = depth
+        if len(sys.modules) > before:
+            label = ("." * level) + name
+            if fromlist:
+                names = list(fromlist)
+                label += f" ({', '.join(names[:3])}{', ...' if len(names) > 3 else ''})"
+            with _lock:
+                _imports.append((start, _now_ms() - start, depth, label, threading.current_thread().name))
+
+
+def _requested(config_path: Optional[str]) -> bool:
+    if os.environ.get(TRACE_ENV) == "1":
+        return True
+    if not config_path:
+        return False
+    try:
+        with open(config_path, "r", encoding="utf-8") as f:
+            return bool(json.load(f).get(CONFIG_KEY, False))
+    except Exception:
+        return False
+
+
+def start_if_requested(config_path: Optional[str] = None, t0: Optional[float] = None) -> bool:
+    """環境變數或設定檔開啟時開始記錄；t0 為計時起點（預設為現在）"""
+    global _t0, _orig_import
+    if _t0 is not None or not _requested(config_path):
+        return _t0 is not None
+    _t0 = t0 if t0 is not None else time.perf_counter()
+    _orig_import = builtins.__import__
+    builtins.__import__ = _traced_import
+    return True
+
+
+@contextmanager
+def phase(name: str):
+    """記錄一段啟動步驟的耗時；未開啟時不做任何事"""
+    global _phase_depth
+    if not enabled():
+        yield
+        return
+    depth = _phase_depth
+    _phase_depth += 1
+    start = _now_ms()
+    try:
+        yield
+    finally:
+        _phase_depth = depth
+        _phases.append((start, _now_ms() - start, depth, name))
+
+
+def mark(name: str):
+    if enabled():
+        _marks.append((_now_ms(), name))
+
+
+def _report() -> str:
+    lines = [
+        f"MU310 startup trace {time.strftime('%Y-%m-%d %H:%M:%S')} "
+        f"(python {sys.version.split()[0]}, frozen={bool(getattr(sys, 'frozen', False))})",
+        "",
+        "== phases (start, duration) ==",
+    ]
+    events = [(s, 0, f"{'  ' * d}{n:<{34 - 2 * d}s} {ms:8.1f} ms") for s, ms, d, n in _phases]
+    events += [(s, 1, f"** {n}") for s, n in _marks]
+    for start, _, text in sorted(events):
+        lines.append(f"  +{start:8.1f} ms  {text}")
+
+    with _lock:
+        imports = list(_imports)
+    total = sum(ms for _, ms, d, _, _ in imports if d == 0)
+    lines += ["", f"== imports: {len(imports)} recorded, top-level total {total:.1f} ms =="]
+    lines.append("  top-level (in order):")
+    for start, ms, d, name, thread in imports:
+        if d == 0:
+            where = "" if thread == "MainThread" else f"  [{thread}]"
+            lines.append(f"    +{start:8.1f} ms  {ms:8.1f} ms  {name}{where}")
+    lines.append(f"  slowest (inclusive, top {TOP_IMPORTS}):")
+    for start, ms, d, name, thread in sorted(imports, key=lambda r: -r[1])[:TOP_IMPORTS]:
+        lines.append(f"    {ms:8.1f} ms  {'  ' * d}{name}")
+    return "\n".join(lines) + "\n"
+
+
+def finish(log_dir: str = "logs") -> Optional[str]:
+    """停止記錄 import 並寫出報告；回傳檔案路徑（未開啟時為 None）"""
+    global _done
+    if not enabled():
+        return None
+    _done = True
+    if _orig_import is not None and builtins.__import__ is _traced_import:
+        builtins.__import__ = _orig_import
+    try:
+        os.makedirs(log_dir, exist_ok=True)
+        path = os.path.join(log_dir, f"startup_{time.strftime('%Y%m%d_%H%M%S')}.trace")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(_report())
+        return path
+    except OSError:
+        return None
@@ -6,12 +6,14 @@ Purpose: Provide utilities to run commands/BAT files in background threads and s
 import os
 import subprocess
 import threading
-from typing import List, Optional, Callable, Union
+from typing import TYPE_CHECKING, List, Optional, Callable, Union
 
-from logger_util import GuiLogger
+if TYPE_CHECKING:
+    # 只用於型別標註；CLI 模式不載入 tkinter
+    from logger_util import GuiLogger
 
 
-def _reader_thread(proc: subprocess.Popen, logger: GuiLogger, prefix: str = "", tab_name: str = "all"):
+def _reader_thread(proc: subprocess.Popen, logger: "GuiLogger", prefix: str = "", tab_name: str = "all"):
     def _emit(line: str, level: str = "INFO"):
         text = f"{prefix}{line.rstrip()}"
         if level == "ERROR":
@@ -51,13 +53,14 @@ def _reader_thread(proc: subprocess.Popen, logger: GuiLogger, prefix: str = "",
 
 def run_command(
     command: Union[str, List[str]],
-    logger: GuiLogger,
+    logger: "GuiLogger",
     cwd: Optional[str] = None,
     env: Optional[dict] = None,
     shell: bool = False,
     on_complete: Optional[Callable[[int], None]] = None,
     tab_name: str = "all",
-):
+) -> Optional[subprocess.Popen]:
+    """於背景執行命令並串流輸出；回傳 Popen（啟動失敗為 None），結束時以返回碼呼叫 on_complete"""
     try:
         if logger.debug_enabled:
             logger.debug(f"[DEBUG] 執行命令: {command}", tab_name=tab_name)
@@ -79,7 +82,7 @@ def run_command(
         logger.error(f"啟動命令失敗: {e}", tab_name=tab_name)
         if on_complete:
             on_complete(-1)
-        return
+        return None
 
     t = threading.Thread(target=_reader_thread, args=(proc, logger, "", tab_name), daemon=True)
     t.start()
@@ -93,9 +96,16 @@ def run_command(
             on_complete(code)
 
     threading.Thread(target=_waiter, daemon=True).start()
+    return proc
 
 
-def run_bat_file(bat_filename: str, logger: GuiLogger, cwd: Optional[str] = None, tab_name: str = "all"):
+def run_bat_file(
+    bat_filename: str,
+    logger: "GuiLogger",
+    cwd: Optional[str] = None,
+    tab_name: str = "all",
+    on_complete: Optional[Callable[[int], None]] = None,
+) -> Optional[subprocess.Popen]:
     # Ensure correct invocation with cmd /c and codepage
     if logger.debug_enabled:
         logger.debug(f"[DEBUG] 執行批次檔: {bat_filename}", tab_name=tab_name)
@@ -108,4 +118,4 @@ def run_bat_file(bat_filename: str, logger: GuiLogger, cwd: Optional[str] = None
     # logger.update_progress(25, tab_name)
     
     cmd = f'cmd /c chcp 65001 > nul & call "{bat_filename}"'
-    run_command(cmd, logger=logger, cwd=cwd, shell=True, tab_name=tab_name) 
\ No newline at end of file
+    return run_command(cmd, logger=logger, cwd=cwd, shell=True, on_complete=on_complete, tab_name=tab_name) 
\ No newline at end of file
@@ -0,0 +1,72 @@
+"""
+text_fit.py - Fit long text into a pixel width by eliding the middle.
+Purpose: Cache per-font glyph widths (each character is measured once per font configuration) and find the longest middle-elided form of a path that fits a width by binary search over prefix sums, so labels can follow window resizes without a font.measure() round trip per attempt.
+"""
+
+from typing import Callable, Dict, List, Tuple
+
+ELLIPSIS = "…"
+
+
+class GlyphWidths:
+    """單一字體設定的字元寬度表；字寬以逐字相加估算（Tk 不做字距調整）"""
+
+    def __init__(self, measure: Callable[[str], int]):
+        self._measure = measure
+        self._widths: Dict[str, int] = {}
+
+    def width(self, ch: str) -> int:
+        w = self._widths.get(ch)
+        if w is None:
+            w = self._widths[ch] = self._measure(ch)
+        return w
+
+    def prefix(self, text: str) -> List[int]:
+        """prefix[i] = text[:i] 的寬度"""
+        sums = [0]
+        total = 0
+        for ch in text:
+            total += self.width(ch)
+            sums.append(total)
+        return sums
+
+
+_TABLES: Dict[Tuple, GlyphWidths] = {}
+
+
+def glyph_widths(font) -> GlyphWidths:
+    """依字體目前的實際設定（family / size / weight / slant …）取得共用的字寬表；字體改大小後自動換表"""
+    key = tuple(sorted(font.actual().items()))
+    table = _TABLES.get(key)
+    if table is None:
+        table = _TABLES[key] = GlyphWidths(font.measure)
+    return table
+
+
+def elide_middle(text: str, max_px: int, widths: GlyphWidths) -> str:
+    """超出 max_px 時以「開頭…結尾」顯示，結尾優先保留檔名（最後一個 / 之後）；二分搜尋保留的字元數"""
+    prefix = widths.prefix(text)
+    n = len(text)
+    if prefix[n] <= max_px:
+        return text
+    ell = widths.width(ELLIPSIS)
+    # 結尾保留 "/檔名"，剩餘的字元數才分給開頭
+    tail_len = n - max(0, text.rfind("/"))
+
+    def split(keep: int) -> Tuple[int, int]:
+        right = min(tail_len, keep)
+        return keep - right, right
+
+    def fits(keep: int) -> bool:
+        left, right = split(keep)
+        return prefix[left] + ell + prefix[n] - prefix[n - right] <= max_px
+
+    lo, hi = 0, n - 1
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if fits(mid):
+            lo = mid
+        else:
+            hi = mid - 1
+    left, right = split(lo)
+    return text[:left] + ELLIPSIS + text[n - right:]
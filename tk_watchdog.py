@@ -0,0 +1,224 @@
+"""
+tk_watchdog.py - Tk event-loop responsiveness watchdog.
+Purpose: Schedule a heartbeat with after() and measure how late each one fires; a helper thread notices when the heartbeat stops, samples the main thread's Python stack via sys._current_frames(), and when the loop resumes the stall (duration, stacks, active jobs) is reported to a callback and kept for the diagnostics window.
+"""
+
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Callable, Deque, List, Optional
+
+import tkinter as tk
+from tkinter import ttk
+
+DEFAULT_INTERVAL_MS = 100
+DEFAULT_THRESHOLD_MS = 250
+MAX_SAMPLES = 5
+MAX_EVENTS = 50
+
+
+class StallEvent:
+    def __init__(self, started: float, duration_ms: float, samples: List[str], jobs: List[str]):
+        self.started = started  # time.time()
+        self.duration_ms = duration_ms
+        self.samples = samples  # 停頓期間取樣到的主執行緒堆疊（去除連續重複）
+        self.jobs = jobs
+
+    @property
+    def stack(self) -> str:
+        return self.samples[-1] if self.samples else ""
+
+    def summary(self) -> str:
+        when = time.strftime("%H:%M:%S", time.localtime(self.started))
+        jobs = ", ".join(self.jobs) if self.jobs else "none"
+        return f"{when}  {self.duration_ms:7.0f} ms  jobs: {jobs}"
+
+    def to_record(self) -> dict:
+        return {
+            "duration_ms": round(self.duration_ms),
+            "jobs": self.jobs,
+            "samples": len(self.samples),
+            "stack": self.stack,
+        }
+
+
+class TkWatchdog:
+    """量測 after() 排程延遲；超過 threshold_ms 視為停頓
+
+    on_stall(event) 在 Tk 執行緒呼叫（停頓結束後的第一次 heartbeat），context() 回傳目前執行中的工作名稱。
+    """
+
+    def __init__(
+        self,
+        root,
+        interval_ms: int = DEFAULT_INTERVAL_MS,
+        threshold_ms: int = DEFAULT_THRESHOLD_MS,
+        on_stall: Optional[Callable[[StallEvent], None]] = None,
+        context: Optional[Callable[[], List[str]]] = None,
+    ):
+        self.root = root
+        self.interval_ms = interval_ms
+        self.threshold_ms = threshold_ms
+        self.on_stall = on_stall
+        self.context = context
+        self.events: Deque[StallEvent] = deque(maxlen=MAX_EVENTS)
+        self.lags: Deque[float] = deque(maxlen=600)  # 最近的 heartbeat 延遲（ms）
+        self.max_lag_ms = 0.0
+        self.beats = 0
+        self._main_ident = threading.get_ident()
+        self._expected = 0.0
+        self._last_beat = 0.0
+        self._samples: List[str] = []
+        self._stall_wall: Optional[float] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._after_id = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """於 Tk 執行緒呼叫"""
+        now = time.perf_counter()
+        self._last_beat = now
+        self._expected = now + self.interval_ms / 1000
+        self._after_id = self.root.after(self.interval_ms, self._beat)
+        self._thread = threading.Thread(target=self._watch, name="tk-watchdog", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except tk.TclError:
+                pass
+            self._after_id = None
+
+    def stats(self) -> dict:
+        lags = sorted(self.lags)
+        p99 = lags[min(len(lags) - 1, int(len(lags) * 0.99))] if lags else 0.0
+        return {
+            "beats": self.beats,
+            "stalls": len(self.events),
+            "max_lag_ms": round(self.max_lag_ms, 1),
+            "p99_lag_ms": round(p99, 1),
+        }
+
+    # ---- Tk 執行緒 ----
+    def _beat(self):
+        now = time.perf_counter()
+        lag_ms = max(0.0, (now - self._expected) * 1000)
+        self.beats += 1
+        self.lags.append(lag_ms)
+        self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+        with self._lock:
+            self._last_beat = now
+            samples, self._samples = self._samples, []
+            started, self._stall_wall = self._stall_wall, None
+        if lag_ms >= self.threshold_ms:
+            jobs = []
+            if self.context is not None:
+                try:
+                    jobs = list(self.context())
+                except Exception:
+                    pass
+            event = StallEvent(started or time.time() - lag_ms / 1000, lag_ms, samples, jobs)
+            self.events.append(event)
+            if self.on_stall is not None:
+                try:
+                    self.on_stall(event)
+                except Exception as e:
+                    print(f"watchdog on_stall failed: {e}")
+        if self._stop.is_set():
+            return
+        self._expected = time.perf_counter() + self.interval_ms / 1000
+        self._after_id = self.root.after(self.interval_ms, self._beat)
+
+    # ---- 監看執行緒 ----
+    def _sample_main_stack(self) -> Optional[str]:
+        frame = sys._current_frames().get(self._main_ident)
+        if frame is None:
+            return None
+        return "".join(traceback.format_stack(frame))
+
+    def _watch(self):
+        # heartbeat 超過 interval + threshold 未到即取樣主執行緒堆疊；長時間停頓每 threshold 再取樣一次
+        poll = max(0.02, self.threshold_ms / 4000)
+        next_sample = 0.0
+        while not self._stop.wait(poll):
+            now = time.perf_counter()
+            with self._lock:
+                silent_ms = (now - self._last_beat) * 1000 - self.interval_ms
+                if silent_ms < self.threshold_ms:
+                    next_sample = 0.0
+                    continue
+                if now < next_sample or len(self._samples) >= MAX_SAMPLES:
+                    continue
+                if self._stall_wall is None:
+                    self._stall_wall = time.time() - silent_ms / 1000
+            stack = self._sample_main_stack()
+            next_sample = now + self.threshold_ms / 1000
+            if stack:
+                with self._lock:
+                    if not self._samples or self._samples[-1] != stack:
+                        self._samples.append(stack)
+
+
+class StallView:
+    """診斷視窗：heartbeat 延遲統計與停頓事件列表，選取事件顯示主執行緒堆疊"""
+
+    REFRESH_MS = 1000
+
+    def __init__(self, parent, watchdog: TkWatchdog, i18n):
+        self.watchdog = watchdog
+        self.i18n = i18n
+        self.window = tk.Toplevel(parent)
+        self.window.title(i18n.t("diag.title"))
+        self.window.geometry("820x560")
+        self.window.transient(parent)
+
+        self.stats_var = tk.StringVar()
+        ttk.Label(self.window, textvariable=self.stats_var).pack(fill=tk.X, padx=10, pady=(10, 6))
+
+        pane = ttk.PanedWindow(self.window, orient=tk.VERTICAL)
+        pane.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
+        self.listbox = tk.Listbox(pane, height=8, font=("Consolas", 10))
+        self.listbox.bind("<<ListboxSelect>>", self._on_select)
+        pane.add(self.listbox, weight=1)
+        self.stack_text = tk.Text(pane, wrap=tk.NONE, height=16, font=("Consolas", 9))
+        pane.add(self.stack_text, weight=3)
+
+        self._last_event = None
+        self._refresh()
+
+    def _refresh(self):
+        if not self.window.winfo_exists():
+            return
+        st = self.watchdog.stats()
+        self.stats_var.set(self.i18n.t(
+            "diag.stats",
+            beats=st["beats"], stalls=st["stalls"], max=st["max_lag_ms"], p99=st["p99_lag_ms"],
+            threshold=self.watchdog.threshold_ms,
+        ))
+        events = list(self.watchdog.events)
+        last = events[-1] if events else None
+        if last is not self._last_event:
+            self.listbox.delete(0, tk.END)
+            for ev in reversed(events):
+                self.listbox.insert(tk.END, ev.summary())
+            self._last_event = last
+        self.window.after(self.REFRESH_MS, self._refresh)
+
+    def _on_select(self, event=None):
+        sel = self.listbox.curselection()
+        if not sel:
+            return
+        events = list(self.watchdog.events)
+        ev = events[len(events) - 1 - sel[0]]
+        self.stack_text.delete("1.0", tk.END)
+        if not ev.samples:
+            self.stack_text.insert(tk.END, self.i18n.t("diag.no_stack"))
+        for i, stack in enumerate(ev.samples, 1):
+            self.stack_text.insert(tk.END, f"--- sample {i}/{len(ev.samples)} ---\n{stack}\n")
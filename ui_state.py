@@ -0,0 +1,100 @@
+"""
+ui_state.py - Observable UI state store.
+Purpose: Hold the GUI state (language, font size, job states, device and DM port lists, status text inputs) as plain key/values, let widgets bind a render function to the keys they read, and re-render only the bindings whose input values actually changed. Changes from any thread are coalesced into a single flush per frame on the Tk thread.
+"""
+
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+FRAME_MS = 16
+_MISSING = object()
+
+
+class Binding:
+    __slots__ = ("keys", "render", "last", "active")
+
+    def __init__(self, keys: Tuple[str, ...], render: Callable[..., None]):
+        self.keys = keys
+        self.render = render
+        self.last: Optional[tuple] = None
+        self.active = True
+
+
+class UiStore:
+    """可觀察的狀態表
+
+    - set()/update() 可在任何執行緒呼叫：值沒變就忽略，有變則標記為 dirty，並只排一次 flush
+    - flush() 於 Tk 執行緒執行：只呼叫「讀取的 key 有變、且輸入值與上次繪製不同」的 binding，每個 binding 最多一次
+    - schedule(fn) 由 GUI 提供，例如 lambda fn: root.after(FRAME_MS, fn)
+    """
+
+    def __init__(self, schedule: Callable[[Callable[[], None]], Any], initial: Optional[Dict[str, Any]] = None):
+        self._schedule = schedule
+        self._state: Dict[str, Any] = dict(initial or {})
+        self._dirty: set = set()
+        self._bindings: List[Binding] = []
+        self._lock = threading.Lock()
+        self._scheduled = False
+        self.flushes = 0
+        self.renders = 0
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self._state.get(key, default)
+
+    def set(self, key: str, value: Any):
+        self.update({key: value})
+
+    def update(self, values: Optional[Dict[str, Any]] = None, **kwargs):
+        values = dict(values or {}, **kwargs)
+        with self._lock:
+            for key, value in values.items():
+                if self._state.get(key, _MISSING) != value:
+                    self._state[key] = value
+                    self._dirty.add(key)
+            need = bool(self._dirty) and not self._scheduled
+            if need:
+                self._scheduled = True
+        if need:
+            try:
+                self._schedule(self.flush)
+            except Exception:
+                # 視窗已關閉：不再繪製
+                with self._lock:
+                    self._scheduled = False
+
+    def bind(self, keys: Iterable[str], render: Callable[..., None]) -> Binding:
+        """綁定 render(*values)；立即以目前的值繪製一次（於 Tk 執行緒呼叫）"""
+        binding = Binding(tuple(keys), render)
+        self._bindings.append(binding)
+        self._render(binding)
+        return binding
+
+    def unbind(self, binding: Binding):
+        binding.active = False
+        try:
+            self._bindings.remove(binding)
+        except ValueError:
+            pass
+
+    def flush(self):
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+            self._scheduled = False
+        if not dirty:
+            return
+        self.flushes += 1
+        for binding in list(self._bindings):
+            if binding.active and not dirty.isdisjoint(binding.keys):
+                self._render(binding)
+
+    def _render(self, binding: Binding):
+        values = tuple(self._state.get(k) for k in binding.keys)
+        if values == binding.last:
+            return
+        binding.last = values
+        self.renders += 1
+        try:
+            binding.render(*values)
+        except Exception as e:
+            # 單一元件繪製失敗不影響其他元件
+            print(f"UI render failed for {binding.keys}: {e}")
@@ -12,4 +12,8 @@ def get_resource_path(relative_path: str) -> str:
         base_path = sys._MEIPASS  # type: ignore[attr-defined]
     except Exception:
         base_path = os.path.abspath(".")
-    return os.path.join(base_path, relative_path) 
\ No newline at end of file
+    return os.path.join(base_path, relative_path) 
+
+def get_data_path(filename: str) -> str:
+    """可寫入的資料檔路徑（與 logs/、keywords.txt 相同，位於目前工作目錄）"""
+    return os.path.join(os.path.abspath("."), filename)